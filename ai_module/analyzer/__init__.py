@@ -0,0 +1,34 @@
+# analyzer 패키지: 수신 스크립트들(FSRC_*, analyzer_server*, server_receiver, ai_pusher)이 각자 구현하던
+# MQTT 수신 → 게이트 → 검출 → 판단 → 명령/결과 전송 → 저장 흐름을 stage로 나눈 공용 분석 서비스
+#
+#   stage    모듈        스레드/큐 정책
+#   ingest   ingest.py   MQTT 콜백 스레드, 디코딩 없음
+#                        conveyor: 디바이스별 최신 1장 슬롯 + 디바이스 워커 스레드
+#                        request : DeviceReadyQueue (프레임 + 분석 요청) + 처리 스레드 1개
+#   gate     gate.py     워커 스레드 안. 거리/이동/간격으로 분석 생략, MotionGate로 직전 결과 재사용
+#   detect   detect.py   DeviceBatchScheduler (batched predict) 또는 ShardedAnalyzer worker 프로세스
+#   decide   decide.py   워커 스레드 안. detect/proximity 모드, 디바이스별 target → 명령/결과
+#   actuate  actuate.py  워커 스레드 안. 명령 중복 제거/cooldown, 액추에이터 매핑, latency trace
+#   persist  persist.py  ImageWriter 백그라운드 풀 (원본 JPEG 한 번 쓰고 나머지 폴더는 hard link)
+#
+# 예전 스크립트별 동작은 config.PRESETS (스크립트들은 run(preset)만 호출)
+#   cd ai_module && python -m analyzer --preset fsrc_server
+#   MQTT_BROKER=local MQTT_LOCAL_PORT=1883 python -m analyzer --preset fsrc_server --detector cpu:20 --headless
+#   python load_generator.py --devices 1 2 4      # 다른 터미널에서 부하 생성
+from .config import CONVEYOR, MODE_DETECT, MODE_PROXIMITY, PRESETS, REQUEST, AnalyzerConfig, from_preset
+from .service import AnalyzerService
+
+
+def run(preset, **overrides):
+    """preset으로 서비스 시작 → 모니터링 루프 (종료 시 정리)"""
+    from .monitor import run_monitor
+    config = from_preset(preset, **overrides)
+    service = AnalyzerService(config).start()
+    try:
+        run_monitor(service, headless=config.headless)
+    finally:
+        service.stop()
+
+
+__all__ = ["AnalyzerConfig", "AnalyzerService", "CONVEYOR", "MODE_DETECT", "MODE_PROXIMITY", "PRESETS",
+           "REQUEST", "from_preset", "run"]
@@ -0,0 +1,21 @@
+# python -m analyzer --preset <이름> (ai_module 디렉터리에서 실행)
+import argparse
+
+from . import PRESETS, run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Unified FSRC analyzer service")
+    parser.add_argument("--preset", default="fsrc_server", choices=sorted(PRESETS))
+    parser.add_argument("--broker", help="기본 브로커 주소 (MQTT_BROKER 환경 변수가 우선, local이면 프로세스 안 브로커)")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--detector", help='"yolo" 또는 "cpu:<ms>" (모델 없이 벤치마크)')
+    parser.add_argument("--model", dest="model_path")
+    parser.add_argument("--workers", type=int, help="0: 이 프로세스, N: worker 프로세스 N개 (기본 ANALYZER_WORKERS)")
+    parser.add_argument("--headless", action="store_true", default=None, help="화면 표시 없이 실행")
+    args = parser.parse_args()
+    run(args.preset, **{k: v for k, v in vars(args).items() if k != "preset"})
+
+
+if __name__ == "__main__":
+    main()
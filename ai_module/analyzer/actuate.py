@@ -0,0 +1,69 @@
+# actuate.py
+# 명령/결과 전송 stage (paho publish는 네트워크 스레드 큐에 넣기만 하므로 워커 스레드에서 바로 호출)
+# - 디바이스별 마지막 명령과 같으면 보내지 않음 (+ config.cooldown_modes 모드에서는 command_cooldown)
+# - 카메라 파이 id → 명령을 받을 액추에이터 파이 id (config.control_ids)
+# - latency trace가 있으면 명령에 user property로 실어 보내고 액추에이터 ack를 기다림
+import json
+import threading
+import time
+
+from latency_trace import command_properties
+
+
+class Actuator:
+    def __init__(self, config, latency=None):
+        self.config = config
+        self.latency = latency
+        self.client = None
+        self._last = {}         # device_id -> (command, 보낸 시각)
+        self._lock = threading.Lock()
+        self.sent = 0
+        self.suppressed = 0
+        self.results = 0
+
+    def bind(self, client):
+        self.client = client
+
+    def command(self, device_id, command, trace=None, mode=None):
+        """실제로 보냈으면 True. mode가 config.cooldown_modes에 없으면 cooldown 없이 바로 보냄"""
+        if command is None:
+            return False
+        now = time.time()
+        cooldown = mode is None or mode in self.config.cooldown_modes
+        with self._lock:
+            last, last_time = self._last.get(device_id, (None, 0.0))
+            if command == last or (cooldown and now - last_time < self.config.command_cooldown):
+                self.suppressed += 1
+                return False
+            # cooldown 기준 시각은 cooldown을 적용하는 명령을 보낼 때만 갱신
+            self._last[device_id] = (command, now if cooldown else last_time)
+            self.sent += 1
+
+        topic = f"{self.config.command_prefix}{self.config.control_id(device_id)}"
+        props = None
+        if trace is not None and self.latency is not None:
+            trace.mark("command")
+            props = command_properties(trace)
+            self.latency.expect_ack(trace)
+        self.client.publish(topic, command, properties=props)
+        print(f"[📤 명령 전송] → {topic}: {command}")
+        return True
+
+    def result(self, device_id, result, action=None):
+        if result is None:
+            print(f"⚠️ 감지 없음 ({device_id})")
+            return
+        topic = f"{self.config.result_prefix}{device_id}"
+        self.client.publish(topic, json.dumps(result))
+        self.results += 1
+        print(f"📤 결과 전송 → {topic}: {result['category']} ({result['score']:.2f})")
+        if action is not None:
+            action_topic = f"{self.config.action_prefix}{device_id}"
+            self.client.publish(action_topic, action)
+            print(f"✅ '{result['category']}' 감지됨 → 동작 트리거 전송: {action_topic}")
+
+    def last_command(self, device_id):
+        return self._last.get(device_id, (None, 0.0))[0]
+
+    def stats(self):
+        return {"sent": self.sent, "suppressed": self.suppressed, "results": self.results}
@@ -0,0 +1,166 @@
+# config.py
+# 분석 서비스 설정 + 예전 수신 스크립트별 preset
+# 스크립트마다 조금씩 달랐던 부분(토픽, 모델, 모드/target, 명령 cooldown, 저장 방식 등)을 여기서만 바꿈
+import os
+
+MODE_DETECT = "detect"
+MODE_PROXIMITY = "proximity"
+
+CONVEYOR = "conveyor"   # camera/frame/<device>: frame_codec 패킷 (JPEG + 거리/이동 상태) → on/off 명령
+REQUEST = "request"     # 프레임 + image/command/<device> 분석 요청 → image/result/<device> 결과 JSON
+
+# 컨베이어 쪽 기본값 (카메라 파이 → 액추에이터 파이)
+FSRC_MODES = {
+    "raspi-01": MODE_DETECT,
+    "raspi-02": MODE_PROXIMITY,
+    "raspi-03": MODE_DETECT,
+}
+FSRC_TARGETS = {
+    "raspi-01": "cell phone",
+    "raspi-02": "청바지",
+    "raspi-03": "치마",
+}
+FSRC_CONTROL_IDS = {
+    "raspi-cam-01": "raspi-01",
+    "raspi-cam-02": "raspi-02",
+    "raspi-cam-03": "raspi-03",
+}
+CLOTHES_MODEL_PATH = "model_files/yolov8n_clothes.pt"
+
+
+class AnalyzerConfig:
+    def __init__(self, name="analyzer", ingest=CONVEYOR, broker="172.30.1.88", port=None,
+                 frame_topic="camera/frame/#", request_topic="image/command/#", request_payload=None,
+                 model_path="yolov8n.pt", detector="yolo", conf=0.5, workers=0,
+                 max_batch_size=8, max_wait_ms=10.0, deadline_ms=500.0, frame_shape=(480, 640, 3),
+                 motion_gate=True, gate_warmup=10, gate_report_every=300,
+                 modes=None, targets=None, default_mode=MODE_DETECT, alias_cam_ids=True, cam_only=True,
+                 near_cm=30, target_score=0.8, detection_interval=0.0, off_when_moving=True,
+                 control_ids=None, command_prefix="image/command/", command_cooldown=0.0,
+                 cooldown_modes=(MODE_DETECT,), result_prefix="image/result/", action_prefix="image/action/",
+                 actions=None, result_box=True,
+                 save_root="saved_images", save_layout="device", save_interval=1.5,
+                 classified_score=0.9, unclassified_label="미분류",
+                 latency_trace=True, headless=False):
+        """
+        ingest              : CONVEYOR 또는 REQUEST
+        broker / port       : 기본 브로커 주소 (MQTT_BROKER/MQTT_PORT 환경 변수가 있으면 그쪽 우선)
+        frame_topic         : REQUEST에서 '#'/'+'가 없으면 모든 요청이 이 토픽 하나의 최신 프레임을 공유
+        request_payload     : REQUEST 분석 요청으로 인정할 payload (None이면 아무 payload)
+        detector / workers  : "yolo" 또는 "cpu:<ms>" (벤치마크용), workers>0이면 worker 프로세스로 샤딩
+        modes / targets     : 디바이스별 detect/proximity 모드, detect 모드에서 찾을 라벨
+        alias_cam_ids       : True면 "raspi-cam-01"의 모드/target을 "raspi-01" 항목에서 찾음
+        cam_only            : True면 id에 "cam"이 없는 디바이스는 상태 표시만 (모터/센서 파이)
+        detection_interval  : target을 찾은 뒤 이 시간(초) 동안 분석 생략
+        off_when_moving     : 컨베이어가 움직이는 중이면 "off" 전송
+        command_cooldown    : 명령이 바뀌어도 이 시간(초) 안에는 다시 보내지 않음
+        cooldown_modes      : command_cooldown을 적용할 모드 (proximity 명령은 예전처럼 바로 보냄)
+        actions             : REQUEST에서 최고 점수 라벨 → image/action/<device>로 보낼 payload
+        result_box          : REQUEST 결과 JSON에 "box"를 넣을지 (analyzer_server_v2는 category/score만)
+        save_layout         : "device" = <root>/<label>/<device>_<시각>_<점수>.jpg (save_interval 간격)
+                              "label"  = 모든 검출을 <root>/<label 또는 미분류>/<label>_<점수>_<시각>.jpg
+        """
+        if ingest not in (CONVEYOR, REQUEST):
+            raise ValueError(f"ingest must be {CONVEYOR!r} or {REQUEST!r}, got {ingest!r}")
+        if save_layout not in ("device", "label"):
+            raise ValueError(f"save_layout must be 'device' or 'label', got {save_layout!r}")
+        self.name = name
+        self.ingest = ingest
+        self.broker = broker
+        self.port = port
+        self.frame_topic = frame_topic
+        self.request_topic = request_topic
+        self.request_payload = request_payload
+        self.model_path = model_path
+        self.detector = detector
+        self.conf = conf
+        self.workers = workers
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.deadline_ms = deadline_ms
+        self.frame_shape = tuple(frame_shape)
+        self.motion_gate = motion_gate
+        self.gate_warmup = gate_warmup
+        self.gate_report_every = gate_report_every
+        self.modes = dict(FSRC_MODES if modes is None else modes)
+        self.targets = dict(FSRC_TARGETS if targets is None else targets)
+        self.default_mode = default_mode
+        self.alias_cam_ids = alias_cam_ids
+        self.cam_only = cam_only
+        self.near_cm = near_cm
+        self.target_score = target_score
+        self.detection_interval = detection_interval
+        self.off_when_moving = off_when_moving
+        self.control_ids = dict(control_ids or {})
+        self.command_prefix = command_prefix
+        self.command_cooldown = command_cooldown
+        self.cooldown_modes = tuple(cooldown_modes)
+        self.result_prefix = result_prefix
+        self.action_prefix = action_prefix
+        self.actions = dict(actions or {})
+        self.result_box = result_box
+        self.save_root = save_root
+        self.save_layout = save_layout
+        self.save_interval = save_interval
+        self.classified_score = classified_score
+        self.unclassified_label = unclassified_label
+        self.latency_trace = latency_trace
+        self.headless = headless
+
+    def device_key(self, device_id):
+        """모드/target 조회용 id"""
+        return device_id.replace("cam-", "") if self.alias_cam_ids else device_id
+
+    def target_of(self, device_id):
+        return self.targets.get(self.device_key(device_id))
+
+    def is_cam(self, device_id):
+        return "cam" in device_id or not self.cam_only
+
+    def control_id(self, device_id):
+        """명령을 받을 액추에이터 id"""
+        return self.control_ids.get(device_id, device_id)
+
+    def replace(self, **overrides):
+        kwargs = dict(vars(self), **overrides)
+        return AnalyzerConfig(**kwargs)
+
+    def __repr__(self):
+        return f"AnalyzerConfig({self.name!r}, ingest={self.ingest!r}, detector={self.detector!r}, workers={self.workers})"
+
+
+# 예전 스크립트 → 설정 (스크립트들은 이제 이 preset으로 run()만 호출)
+PRESETS = {
+    # FSRC_server_0529_3.py: 카메라 파이별 detect/proximity, 명령은 짝이 되는 액추에이터 파이로
+    "fsrc_server": dict(control_ids=FSRC_CONTROL_IDS),
+    # FSRC_receiver_0529.py: 같은 흐름 + detect 명령 cooldown 0.5초, 모터가 움직이는 중에는 명령 보류
+    "receiver_0529": dict(control_ids=FSRC_CONTROL_IDS, command_cooldown=0.5, off_when_moving=False),
+    # FSRC_reciver_0529_2.py
+    "receiver_0529_2": dict(control_ids=FSRC_CONTROL_IDS),
+    # FSRC_realtime_receiver.py: 디바이스 id 그대로 (카메라/액추에이터가 한 파이)
+    "realtime": dict(broker="172.30.1.21", alias_cam_ids=False, cam_only=False),
+    # ai_pusher/main_server.py: detect 전용, target을 찾으면 3초 동안 분석 생략, motion gate 없음
+    "pusher": dict(broker="172.30.1.21", alias_cam_ids=False, cam_only=False, modes={}, motion_gate=False,
+                   detection_interval=3.0, off_when_moving=False, save_interval=0.0),
+    # analyzer_server.py / server_receiver.py: image/request/<device> 프레임 + image/command/<device> 요청
+    # (요청 때마다 항상 검출: 드문드문 들어오는 요청 프레임에는 motion gate를 쓰지 않음)
+    "analyzer_server": dict(ingest=REQUEST, broker="172.30.1.21", frame_topic="image/request/#",
+                            model_path=CLOTHES_MODEL_PATH, motion_gate=False,
+                            actions={"상의": "start"}, save_root="results", save_layout="label",
+                            save_interval=0.0, latency_trace=False, headless=True),
+    # analyzer_server_v2.py: 카메라 프레임은 camera/frame 하나, "capture" 요청한 디바이스로 결과 전송
+    "analyzer_server_v2": dict(ingest=REQUEST, broker="172.30.1.21", frame_topic="camera/frame",
+                               request_payload="capture", model_path=CLOTHES_MODEL_PATH, motion_gate=False,
+                               result_box=False, save_root="results", save_layout="label",
+                               save_interval=0.0, latency_trace=False, headless=True),
+}
+PRESETS["server_receiver"] = PRESETS["analyzer_server"]
+
+
+def from_preset(name, **overrides):
+    """preset 설정 + overrides. ANALYZER_WORKERS 환경 변수가 있으면 workers 기본값으로 사용"""
+    if name not in PRESETS:
+        raise ValueError(f"unknown preset {name!r} (choose from {', '.join(sorted(PRESETS))})")
+    kwargs = dict(PRESETS[name], name=name, workers=int(os.environ.get("ANALYZER_WORKERS", "0")))
+    kwargs.update({k: v for k, v in overrides.items() if v is not None})
+    return AnalyzerConfig(**kwargs)
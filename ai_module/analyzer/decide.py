@@ -0,0 +1,57 @@
+# decide.py
+# 판단 stage: 검출 결과(Detections)/센서값 → 명령, 저장할 항목, 결과 JSON (부수 효과 없음, 워커 스레드 안에서 실행)
+# target/점수 조건은 검출 배열에 한 번에 적용, dict는 결과 JSON으로 보낼 최고 점수 검출 하나만 만듦
+import numpy as np
+
+from .config import MODE_PROXIMITY
+
+
+class Decision:
+    __slots__ = ("command", "saves", "result", "action")
+
+    def __init__(self, command=None, saves=(), result=None, action=None):
+        self.command = command    # "on" / "off" / None(보내지 않음)
+        self.saves = list(saves)  # [(폴더, 라벨 또는 None, 점수 또는 None)]
+        self.result = result      # REQUEST: 결과 토픽으로 보낼 dict
+        self.action = action      # REQUEST: 액션 토픽으로 보낼 payload
+
+    def __repr__(self):
+        return f"Decision(command={self.command!r}, saves={len(self.saves)}, result={self.result!r})"
+
+
+class Decider:
+    def __init__(self, config):
+        self.config = config
+
+    def conveyor(self, device_id, mode, data, detections):
+        """detections가 None이면 gate에서 분석을 생략한 프레임"""
+        cfg = self.config
+        if mode == MODE_PROXIMITY:
+            distance = data.get("distance")
+            if distance is None:
+                return Decision()   # 거리값 없는 프레임은 건너뜀 (명령 없음)
+            if int(distance) < cfg.near_cm:
+                return Decision("on", [("proximity", None, None)])
+            return Decision("off")
+
+        if detections is None:
+            return Decision("off" if data.get("move_state") and cfg.off_when_moving else None)
+
+        target = cfg.target_of(device_id)
+        hits = detections.filter(min_score=cfg.target_score, labels=(target,))
+        if hits:
+            return Decision("on", [(target, target, float(hits.scores[hits.best()]))])
+        return Decision("off")
+
+    def request(self, detections):
+        """모든 검출 저장 (점수가 낮으면 미분류), 최고 점수 검출을 결과로"""
+        cfg = self.config
+        folders = np.where(detections.scores > cfg.classified_score, detections.labels, cfg.unclassified_label)
+        saves = list(zip(folders.tolist(), detections.labels.tolist(), detections.scores.tolist()))
+        best = detections.best()
+        if best is None:
+            return Decision(saves=saves)
+        result = detections.to_dict(best, label_key="category")
+        if not cfg.result_box:
+            del result["box"]
+        return Decision(saves=saves, result=result, action=cfg.actions.get(result["category"]))
@@ -0,0 +1,32 @@
+# detect.py
+# 검출 stage: 디바이스 워커들이 각자 predict하지 않고 공용 analyzer에 최신 프레임을 넘김
+# - workers 0: 이 프로세스에서 DeviceBatchScheduler (디바이스당 최신 1장, 라운드로빈으로 batched predict)
+# - workers N: ShardedAnalyzer (device_id를 consistent hash로 worker 프로세스에 배정, 프레임은 공유 메모리)
+# predict() 결과가 None이면 더 새 프레임으로 대체됐거나 deadline 초과 → 호출한 쪽은 그 프레임을 버림
+from batch_scheduler import DeviceBatchScheduler
+from sharded_analyzer import _detect_batch, _to_image, make_analyzer
+
+
+class Detector:
+    def __init__(self, config, detect=None):
+        """detect(frames) -> 프레임별 detections를 넘기면 모델 대신 사용 (테스트/벤치마크)"""
+        self.config = config
+        if detect is not None:
+            self._analyzer = DeviceBatchScheduler(
+                lambda frames: _detect_batch(detect, [_to_image(f) for f in frames]),
+                max_batch_size=config.max_batch_size, max_wait_ms=config.max_wait_ms,
+                deadline_ms=config.deadline_ms)
+        else:
+            self._analyzer = make_analyzer(
+                config.workers, model_path=config.model_path, detector=config.detector, conf=config.conf,
+                max_batch_size=config.max_batch_size, max_wait_ms=config.max_wait_ms,
+                deadline_ms=config.deadline_ms, transport="shm", frame_shape=config.frame_shape)
+
+    def predict(self, device_id, frame):
+        return self._analyzer.predict(device_id, frame)
+
+    def stats(self):
+        return self._analyzer.stats()
+
+    def close(self):
+        self._analyzer.close()
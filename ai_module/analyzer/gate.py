@@ -0,0 +1,65 @@
+# gate.py
+# 분석 여부를 정하는 stage (디바이스 워커 스레드 안에서 실행, 디코딩 전에 판단할 수 있는 것부터)
+# - admit(): proximity 모드 / 물체가 멀거나 컨베이어가 움직이는 중 / target을 찾은 직후(detection_interval)면 분석 생략
+# - reuse()/remember(): 장면 변화가 없으면 검출기 대신 직전 결과 재사용 (디바이스별 MotionGate)
+# - 컨베이어가 움직이거나 물체가 멀어지면 직전 결과와 MotionGate를 버림
+#   (다음에 멈춘 옷은 비슷해 보여도 새 물체로 보고 처음부터 검출)
+import threading
+
+from motion_gate import MotionGate
+
+from .config import MODE_PROXIMITY
+
+
+class Gate:
+    def __init__(self, config):
+        self.config = config
+        self._gates = {}       # device_id -> MotionGate
+        self._last = {}        # device_id -> 직전 검출 결과 (Detections)
+        self._last_hit = {}    # device_id -> target을 마지막으로 찾은 시각
+        self._lock = threading.Lock()
+        self.skipped = 0
+
+    def admit(self, device_id, data, mode, now):
+        """True면 이 프레임을 분석 (디코딩 + 검출)"""
+        cfg = self.config
+        distance = data.get("distance")
+        if distance is None or int(distance) >= cfg.near_cm or data.get("move_state"):
+            self.reset(device_id)
+            self.skipped += 1
+            return False
+        if (mode == MODE_PROXIMITY
+                or (cfg.detection_interval and now - self._last_hit.get(device_id, 0) < cfg.detection_interval)):
+            self.skipped += 1
+            return False
+        return True
+
+    def hit(self, device_id, now):
+        self._last_hit[device_id] = now
+
+    def reset(self, device_id):
+        with self._lock:
+            self._gates.pop(device_id, None)
+            self._last.pop(device_id, None)
+
+    def reuse(self, device_id, frame):
+        """장면 변화가 없으면 직전 검출 결과, 검출기를 돌려야 하면 None"""
+        moved = self.motion(device_id, frame)
+        return None if moved else self._last.get(device_id)
+
+    def remember(self, device_id, detections):
+        self._last[device_id] = detections
+
+    def motion(self, device_id, frame):
+        """True면 검출기 실행, False면 직전 결과 재사용"""
+        if not self.config.motion_gate:
+            return True
+        gate = self._gates.get(device_id)
+        if gate is None:
+            with self._lock:
+                gate = self._gates.setdefault(device_id, MotionGate(
+                    warmup=self.config.gate_warmup, name=device_id, report_every=self.config.gate_report_every))
+        return gate.check(frame)
+
+    def stats(self):
+        return {"skipped": self.skipped, "motion": {d: g.stats() for d, g in list(self._gates.items())}}
@@ -0,0 +1,148 @@
+# ingest.py
+# MQTT 수신 stage: 콜백(네트워크 스레드)에서는 디코딩하지 않고 JPEG bytes + 센서값만 만들어서 넘김
+# - ConveyorIngest: camera/frame/<device> → 디바이스별 최신 1장 슬롯 + 디바이스 전용 워커 스레드
+#                   (처리가 밀리면 오래된 프레임은 덮어씀, 같은 디바이스는 순서대로, 디바이스끼리는 병렬)
+# - RequestIngest : 프레임 + 분석 요청 → DeviceReadyQueue → 처리 스레드 1개 (요청 하나당 분석 한 번)
+import threading
+
+from paho.mqtt.client import topic_matches_sub
+
+from encoded_frame import EncodedFrame
+from frame_buffer import LatestFrameBuffer
+from frame_codec import decode_frame
+from latency_trace import trace_from_message
+from ready_queue import DeviceReadyQueue
+
+
+class DeviceWorkers:
+    """디바이스마다 LatestFrameBuffer 하나 + 처리 스레드 하나 (처음 보는 디바이스면 생성)"""
+    def __init__(self, handle, name="device"):
+        self._handle = handle
+        self._name = name
+        self._slots = {}
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def put(self, device_id, item):
+        slot = self._slots.get(device_id)
+        if slot is None:
+            with self._lock:
+                slot = self._slots.get(device_id)
+                if slot is None:
+                    slot = self._slots[device_id] = LatestFrameBuffer()
+                    t = threading.Thread(target=self._run, args=(device_id, slot),
+                                         name=f"{self._name}-{device_id}", daemon=True)
+                    t.start()
+                    self._threads.append(t)
+        slot.put(item)
+
+    def _run(self, device_id, slot):
+        seq = 0
+        while True:
+            seq, item = slot.get(seq)
+            if item is None:
+                return
+            try:
+                self._handle(device_id, item)
+            except Exception as e:
+                print(f"[❌ 워커 에러] {device_id}: {e}")
+
+    def dropped(self):
+        return {device_id: slot.dropped for device_id, slot in self._slots.items()}
+
+    def close(self, timeout=2.0):
+        for slot in list(self._slots.values()):
+            slot.close()
+        for t in self._threads:
+            t.join(timeout)
+
+
+class ConveyorIngest:
+    def __init__(self, config, handle):
+        self.config = config
+        self.topics = [config.frame_topic]
+        self.workers = DeviceWorkers(handle)
+        self.received = 0
+        self.errors = 0
+
+    def on_message(self, client, userdata, msg):
+        topic_parts = msg.topic.split("/")
+        if len(topic_parts) != 3:
+            return
+        device_id = topic_parts[2]
+        is_cam = self.config.is_cam(device_id)
+        # receive 시각 (user property 없으면 None)
+        trace = trace_from_message(msg, device_id) if is_cam and self.config.latency_trace else None
+        try:
+            packet = decode_frame(msg.payload, device_id)   # binary 포맷 + 예전 JSON 모두
+            if is_cam:
+                if not packet.has_frame:
+                    return
+                data = {
+                    "encoded": EncodedFrame(packet.jpeg),   # 저장은 원본 JPEG bytes로 (payload 복사 없음)
+                    "seq": packet.seq,
+                    "capture_ts": packet.capture_ts,
+                    "distance": packet.distance,
+                    "current_speed": packet.current_speed,
+                    "move_state": packet.move_state,
+                    "trace": trace,
+                }
+            else:
+                data = {"move_state": packet.move_state, "current_speed": packet.current_speed}
+            self.received += 1
+            self.workers.put(device_id, data)
+        except Exception as e:
+            self.errors += 1
+            print(f"[❌ MQTT 메시지 에러] {device_id}: {e}")
+
+    def stats(self):
+        return {"received": self.received, "errors": self.errors, "dropped": self.workers.dropped()}
+
+    def close(self):
+        self.workers.close()
+
+
+class RequestIngest:
+    def __init__(self, config, handle):
+        self.config = config
+        self.topics = [config.frame_topic, config.request_topic]
+        # frame_topic에 와일드카드가 없으면 카메라 하나를 모든 요청 디바이스가 공유
+        self.shared_frames = "#" not in config.frame_topic and "+" not in config.frame_topic
+        self.ready = DeviceReadyQueue()
+        self.requests = 0
+        self._handle = handle
+        self._thread = threading.Thread(target=self._run, name="analyzer-requests", daemon=True)
+        self._thread.start()
+
+    def on_message(self, client, userdata, msg):
+        topic = msg.topic
+        if topic_matches_sub(self.config.frame_topic, topic):
+            key = self.config.frame_topic if self.shared_frames else topic.split("/")[-1]
+            self.ready.put_frame(key, msg.payload)
+        elif topic_matches_sub(self.config.request_topic, topic):
+            payload = self.config.request_payload
+            if payload is not None and msg.payload.decode(errors="replace") != payload:
+                return
+            requester = topic.split("/")[-1]
+            self.requests += 1
+            self.ready.request(self.config.frame_topic if self.shared_frames else requester, requester)
+            print(f"📥 분석 요청 수신 → {topic}")
+
+    def _run(self):
+        while True:
+            # 최신 프레임과 분석 요청이 모두 있을 때만 깨어남 (idle 시 CPU 사용 없음)
+            item = self.ready.get()
+            if item is None:
+                return
+            key, payload, requester = item
+            try:
+                self._handle(key, payload, requester)
+            except Exception as e:
+                print(f"[❌ 분석 에러] {requester}: {e}")
+
+    def stats(self):
+        return {"requests": self.requests, "pending": len(self.ready.pending()), "dropped": self.ready.dropped}
+
+    def close(self):
+        self.ready.close()
+        self._thread.join(2.0)
@@ -0,0 +1,78 @@
+# monitor.py
+# 실행 루프: 카메라 디바이스별 최신 프레임 + 검출 박스를 격자로 표시 (headless면 대기만)
+#   q: 종료 / s: stage 통계 / t: 구간별 지연 / 1~9: raspi-0N 모드 전환 (detect ↔ proximity)
+import math
+import time
+
+import cv2
+import numpy as np
+
+from detections import Detections
+
+FRAME_WIDTH, FRAME_HEIGHT = 640, 480
+NO_DETECTIONS = Detections()
+
+
+def draw_boxes(frame, detections):
+    boxes = detections.xyxy.astype(np.int32).tolist()
+    for (x1, y1, x2, y2), label, score in zip(boxes, detections.labels.tolist(), detections.scores.tolist()):
+        color = (0, 255, 0) if score > 0.8 else (0, 0, 255)
+        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+        cv2.putText(frame, f"{label} ({score:.2f})", (x1, y1 - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
+    return frame
+
+
+def _handle_key(service, key):
+    if key == ord('s'):
+        print(f"[📊 analyzer] {service.stats()}")
+    elif key == ord('t') and service.latency is not None:
+        print(f"[⏱ latency]\n{service.latency.report()}")
+    elif ord('1') <= key <= ord('9'):
+        service.toggle_mode(f"raspi-0{chr(key)}")
+
+
+def render(service):
+    """표시할 카메라가 없으면 None"""
+    cams = {d: s for d, s in service.snapshot().items() if "encoded" in s}
+    if not cams:
+        return None
+    cols = math.ceil(math.sqrt(len(cams)))
+    rows = math.ceil(len(cams) / cols)
+    canvas = np.zeros((rows * FRAME_HEIGHT, cols * FRAME_WIDTH, 3), dtype=np.uint8)
+    for idx, (device_id, info) in enumerate(cams.items()):
+        image = info["encoded"].image   # 화면에 올리는 프레임만 디코딩 (캐시됨)
+        if image is None:
+            continue
+        frame = draw_boxes(image.copy(), info.get("detections", NO_DETECTIONS))
+        label = (f"{device_id} | {info.get('distance')}cm | speed:{info.get('current_speed')} | "
+                 f"state:{info.get('move_state')} | mode:{service.mode_of(device_id)}")
+        cv2.putText(frame, label, (10, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 2)
+        r, c = divmod(idx, cols)
+        canvas[r * FRAME_HEIGHT:(r + 1) * FRAME_HEIGHT, c * FRAME_WIDTH:(c + 1) * FRAME_WIDTH] = \
+            cv2.resize(frame, (FRAME_WIDTH, FRAME_HEIGHT))
+    return canvas
+
+
+def run_monitor(service, headless=False):
+    if headless:
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("🛑 종료됨")
+        return
+
+    print("📺 실시간 모니터링 시작")
+    try:
+        while True:
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            _handle_key(service, key)
+            canvas = render(service)
+            if canvas is None:
+                time.sleep(0.1)
+                continue
+            cv2.imshow("📡 디바이스 모니터링", canvas)
+    finally:
+        cv2.destroyAllWindows()
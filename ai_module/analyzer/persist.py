@@ -0,0 +1,52 @@
+# persist.py
+# 저장 stage: 원본 JPEG bytes를 ImageWriter 백그라운드 풀로 (재인코딩 X, 검출/명령 루프를 막지 않음)
+# 한 프레임을 여러 라벨 폴더에 저장하면 한 번만 쓰고 나머지는 hard link
+#   save_layout "device": <root>/<label>/<device>_<시각>_<번호>[_<점수>].jpg, 디바이스별 save_interval 간격
+#   save_layout "label" : <root>/<label 또는 미분류>/<label>_<점수>_<시각>_<번호>.jpg, 프레임의 모든 검출
+# 시각은 ms까지, 번호는 저장할 때마다 1씩 증가 → 같은 시각/라벨/점수라도 이전 저장(과 그 link)을 덮어쓰지 않음
+import itertools
+from datetime import datetime
+from pathlib import Path
+
+from image_writer import get_image_writer
+
+
+class Persister:
+    def __init__(self, config, writer=None):
+        self.config = config
+        self.root = Path(config.save_root)
+        self.writer = writer or get_image_writer()
+        self._last_saved = {}   # device_id -> 마지막 저장 시각
+        self._seq = itertools.count(1)
+        self.saved = 0
+
+    def paths(self, device_id, saves, when=None):
+        when = when or datetime.now()
+        timestamp = f"{when:%Y%m%d_%H%M%S}_{when.microsecond // 1000:03d}_{next(self._seq)}"
+        paths = []
+        for folder, label, score in saves:
+            if self.config.save_layout == "label":
+                name = f"{label}_{int(score * 100)}_{timestamp}.jpg"
+            elif score is None:
+                name = f"{device_id}_{timestamp}.jpg"
+            else:
+                name = f"{device_id}_{timestamp}_{int(score * 100)}.jpg"
+            paths.append(self.root / folder / name)
+        return paths
+
+    def save(self, device_id, encoded, saves, now):
+        """저장 요청을 넣었으면 True (save_interval 안이면 건너뜀)"""
+        if not saves:
+            return False
+        interval = self.config.save_interval
+        if interval and now - self._last_saved.get(device_id, 0) < interval:
+            return False
+        paths = self.paths(device_id, saves)
+        encoded.save(self.writer, paths)
+        self._last_saved[device_id] = now
+        self.saved += 1
+        print(f"💾 저장됨: {paths[0]}" + (f" (+{len(paths) - 1} link)" if len(paths) > 1 else ""))
+        return True
+
+    def stats(self):
+        return {"saved": self.saved, "writer": self.writer.stats()}
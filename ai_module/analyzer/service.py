@@ -0,0 +1,154 @@
+# service.py
+# stage 연결: ingest → gate → detect → decide → persist / actuate
+# stage는 생성자 인자로 바꿔 끼울 수 있음 (예: detector=Detector(config, detect=fake_detect))
+import threading
+import time
+
+from detections import Detections
+from encoded_frame import EncodedFrame
+from latency_trace import LatencyRecorder, mark
+from settings import make_mqtt_client, mqtt_broker, mqtt_port
+
+from .actuate import Actuator
+from .config import CONVEYOR, MODE_DETECT, MODE_PROXIMITY
+from .decide import Decider
+from .detect import Detector
+from .gate import Gate
+from .ingest import ConveyorIngest, RequestIngest
+from .persist import Persister
+
+
+class AnalyzerService:
+    def __init__(self, config, gate=None, detector=None, decider=None, actuator=None, persister=None):
+        self.config = config
+        self.latency = LatencyRecorder() if config.latency_trace else None
+        self.gate = gate or Gate(config)
+        self.detector = detector or Detector(config)
+        self.decider = decider or Decider(config)
+        self.actuator = actuator or Actuator(config, self.latency)
+        self.persister = persister or Persister(config)
+        if config.ingest == CONVEYOR:
+            self.ingest = ConveyorIngest(config, self.process_frame)
+        else:
+            self.ingest = RequestIngest(config, self.process_request)
+        self.client = None
+        self.modes = dict(config.modes)      # 실행 중 toggle_mode로 바뀜
+        self.states = {}                     # device_id -> 화면 표시용 최신 상태
+        self._lock = threading.Lock()
+
+    # ---------- MQTT ----------
+    def start(self, client=None):
+        """client를 넘기면 (이미 connect된) 그 클라이언트 사용, 아니면 settings로 만들어 연결"""
+        if client is None:
+            broker = mqtt_broker(self.config.broker)
+            client = make_mqtt_client(broker)
+            client.connect(broker, self.config.port or mqtt_port(), 60)
+        self.client = client
+        self.actuator.bind(client)
+        client.on_message = self.ingest.on_message
+        for topic in self.ingest.topics:
+            client.subscribe(topic)
+        if self.latency is not None:
+            self.latency.attach(client)   # trace/pong, trace/ack 수신
+            self.latency.start_pinging(client, lambda: list(self.states))
+        client.loop_start()
+        print(f"✅ {self.config.name} 분석 서비스 실행 중 ({', '.join(self.ingest.topics)})")
+        return self
+
+    def stop(self):
+        if self.client is not None:
+            self.client.loop_stop()
+            self.client.disconnect()
+        self.ingest.close()
+        self.detector.close()
+
+    # ---------- 모드 ----------
+    def mode_of(self, device_id):
+        return self.modes.get(self.config.device_key(device_id), self.config.default_mode)
+
+    def toggle_mode(self, key):
+        with self._lock:
+            before = self.modes.get(key, self.config.default_mode)
+            after = MODE_PROXIMITY if before == MODE_DETECT else MODE_DETECT
+            self.modes[key] = after
+        print(f"[🔄 모드 변경] {key}: {before} → {after}")
+
+    # ---------- 처리 ----------
+    def _set_state(self, device_id, state):
+        with self._lock:
+            self.states[device_id] = state
+
+    def _detect(self, key, frame):
+        """motion gate 통과면 검출, 아니면 직전 결과. 스케줄러에서 버려진 프레임이면 None"""
+        detections = self.gate.reuse(key, frame)
+        if detections is None:
+            detections = self.detector.predict(key, frame)
+            if detections is None:   # 더 새 프레임으로 대체됐거나 deadline 초과
+                return None
+            self.gate.remember(key, detections)
+        return detections
+
+    def process_frame(self, device_id, data):
+        """CONVEYOR: 디바이스 워커 스레드에서 호출"""
+        if not self.config.is_cam(device_id):
+            self._set_state(device_id, data)   # 모터/센서 전용
+            return
+        encoded = data.get("encoded")
+        if encoded is None:
+            return
+        now = time.time()
+        trace = data.get("trace")
+        mode = self.mode_of(device_id)
+
+        detections = None
+        if self.gate.admit(device_id, data, mode, now):
+            # 실제로 분석하는 프레임만 디코딩 (버려지거나 건너뛰는 프레임은 bytes 그대로)
+            frame = encoded.image
+            if frame is None:
+                return
+            mark(trace, "decode")
+            detections = self._detect(device_id, frame)
+            if detections is None:
+                return
+            mark(trace, "infer")
+        else:
+            trace = None   # 분석하지 않은 프레임은 지연 측정 대상이 아님
+
+        decision = self.decider.conveyor(device_id, mode, data, detections)
+        self._set_state(device_id, {**data, "detections": detections if detections is not None else Detections()})
+        if decision.command == "on":
+            self.gate.hit(device_id, now)
+        self.persister.save(device_id, encoded, decision.saves, now)
+        mark(trace, "decide")
+        self.actuator.command(device_id, decision.command, trace, mode)
+        if trace is not None and self.latency is not None:
+            self.latency.observe(trace, device_id)
+
+    def process_request(self, key, payload, requester):
+        """REQUEST: 요청 처리 스레드에서 호출. key는 프레임 슬롯, requester는 결과를 받을 디바이스"""
+        encoded = EncodedFrame(payload)   # 저장은 원본 JPEG bytes로
+        frame = encoded.image
+        if frame is None:
+            return
+        # 명시적 요청은 항상 검출 (motion gate가 직전 옷의 결과를 다시 보내지 않도록)
+        detections = self.detector.predict(key, frame)
+        if detections is None:
+            return
+        decision = self.decider.request(detections)
+        self._set_state(requester, {"encoded": encoded, "detections": detections})
+        self.persister.save(requester, encoded, decision.saves, time.time())
+        self.actuator.result(requester, decision.result, decision.action)
+
+    # ---------- 조회 ----------
+    def snapshot(self):
+        with self._lock:
+            return dict(self.states)
+
+    def stats(self):
+        return {
+            "ingest": self.ingest.stats(),
+            "gate": self.gate.stats(),
+            "detect": self.detector.stats(),
+            "actuate": self.actuator.stats(),
+            "persist": self.persister.stats(),
+        }
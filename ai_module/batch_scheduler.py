@@ -0,0 +1,143 @@
+# batch_scheduler.py
+# 여러 라즈베리파이(디바이스)의 프레임을 모아서 공용 YOLO 모델을 한 번의 batched predict로 돌리는 스케줄러
+# - 디바이스마다 슬롯 1개: 같은 디바이스가 새 프레임을 넣으면 이전 대기 프레임은 대체됨 (최신 프레임만 처리)
+# - 배치는 디바이스당 최대 1장, 라운드로빈 순서로 채움 → 프레임을 많이 보내는 카메라가 다른 카메라를 굶기지 않음
+# - 가장 오래된 대기 프레임이 max_wait_ms 지나거나, 대기 중인 디바이스 수가 max_batch_size면 바로 실행
+# - 배치를 만들 때 deadline_ms보다 오래 기다린 프레임은 버림 (결과 None)
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+
+from batching import BatchMetrics
+
+
+class DeviceBatchScheduler:
+    """
+    submit(device_id, frame) -> Future
+      결과: predict_batch가 돌려준 해당 프레임의 결과.
+            더 새로운 프레임으로 대체됐거나 deadline을 넘겨 버려졌으면 None
+    predict_batch(frames) -> frames와 같은 길이/순서의 결과 리스트
+    """
+    def __init__(self, predict_batch, max_batch_size=8, max_wait_ms=10.0, deadline_ms=500.0,
+                 name="device-batch-scheduler"):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.deadline = deadline_ms / 1000.0
+        self.name = name
+        self.metrics = BatchMetrics(max_batch_size)
+
+        self._slots = OrderedDict()   # device_id -> (frame, future, enqueue_time)
+        self._order = deque()         # 라운드로빈 순서 (처리된 디바이스는 뒤로)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+        self.superseded = 0
+        self.expired = 0
+        self.served = {}              # device_id -> 처리된 프레임 수
+
+    def submit(self, device_id, frame):
+        fut = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"{self.name} is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            old = self._slots.pop(device_id, None)
+            if old is not None:
+                old[1].set_result(None)
+                self.superseded += 1
+            if device_id not in self.served:
+                self.served[device_id] = 0
+                self._order.append(device_id)
+            self._slots[device_id] = (frame, fut, time.perf_counter())
+            self._cond.notify()
+        return fut
+
+    def predict(self, device_id, frame, timeout=None):
+        """submit 후 결과까지 대기 (디바이스 워커에서 사용)"""
+        return self.submit(device_id, frame).result(timeout)
+
+    def close(self, timeout=None):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._slots:
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+            oldest = min(t for _, _, t in self._slots.values())
+            wait_until = oldest + self.max_wait
+            while len(self._slots) < min(self.max_batch_size, len(self._order)) and not self._closed:
+                remaining = wait_until - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            now = time.perf_counter()
+            batch = []
+            for device_id in list(self._order):
+                if len(batch) >= self.max_batch_size:
+                    break
+                slot = self._slots.pop(device_id, None)
+                if slot is None:
+                    continue
+                frame, fut, t = slot
+                if now - t > self.deadline:
+                    fut.set_result(None)
+                    self.expired += 1
+                    continue
+                batch.append((device_id, frame, fut, t))
+                # 이번에 처리된 디바이스는 라운드로빈 순서 맨 뒤로
+                self._order.remove(device_id)
+                self._order.append(device_id)
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            waits_ms = [(start - t) * 1000 for _, _, _, t in batch]
+            try:
+                results = self.predict_batch([frame for _, frame, _, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(f"predict_batch returned {len(results)} results for {len(batch)} frames")
+            except Exception as e:
+                for _, _, fut, _ in batch:
+                    fut.set_exception(e)
+                continue
+            finally:
+                self.metrics.record(len(batch), waits_ms, (time.perf_counter() - start) * 1000)
+
+            with self._cond:
+                for device_id, _, _, _ in batch:
+                    self.served[device_id] += 1
+            for (_, _, fut, _), res in zip(batch, results):
+                fut.set_result(res)
+
+    def stats(self):
+        snap = self.metrics.snapshot()
+        with self._cond:
+            snap.update({
+                "superseded": self.superseded,
+                "expired": self.expired,
+                "served": dict(self.served),
+                "pending": len(self._slots),
+            })
+        return snap
@@ -0,0 +1,141 @@
+# batching.py
+# 동시에 들어온 추론 요청을 모아서 한 번의 forward로 처리하는 마이크로 배칭 스케줄러
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, int(round(q / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class BatchMetrics:
+    """
+    배치 크기 분포와 큐 대기 시간(요청 도착 → forward 시작)을 집계.
+    최근 window개의 대기 시간만 보관해서 p50/p95/p99를 계산한다.
+    """
+    def __init__(self, max_batch_size, window=2000):
+        self._lock = threading.Lock()
+        self.batch_size_hist = [0] * (max_batch_size + 1)
+        self.queue_waits_ms = deque(maxlen=window)
+        self.batch_times_ms = deque(maxlen=window)
+        self.batches = 0
+        self.items = 0
+
+    def record(self, batch_size, waits_ms, batch_time_ms):
+        with self._lock:
+            self.batch_size_hist[batch_size] += 1
+            self.queue_waits_ms.extend(waits_ms)
+            self.batch_times_ms.append(batch_time_ms)
+            self.batches += 1
+            self.items += batch_size
+
+    def snapshot(self):
+        with self._lock:
+            waits = sorted(self.queue_waits_ms)
+            times = sorted(self.batch_times_ms)
+            hist = {size: cnt for size, cnt in enumerate(self.batch_size_hist) if cnt}
+            batches, items = self.batches, self.items
+        return {
+            "batches": batches,
+            "items": items,
+            "avg_batch_size": round(items / batches, 3) if batches else 0.0,
+            "batch_size_hist": hist,
+            "queue_wait_ms": {
+                "p50": round(_percentile(waits, 50), 3),
+                "p95": round(_percentile(waits, 95), 3),
+                "p99": round(_percentile(waits, 99), 3),
+                "max": round(waits[-1], 3) if waits else 0.0,
+            },
+            "batch_time_ms": {
+                "p50": round(_percentile(times, 50), 3),
+                "p95": round(_percentile(times, 95), 3),
+            },
+        }
+
+
+class MicroBatcher:
+    """
+    submit(item) -> Future
+    - 워커 스레드 하나가 요청을 모아서 batch_fn(items) 한 번으로 처리
+    - 가장 오래된 요청이 max_wait_ms 만큼 기다렸거나 max_batch_size개가 모이면 바로 실행
+    - batch_fn은 items와 같은 길이/순서의 결과 리스트를 반환해야 함
+    """
+    def __init__(self, batch_fn, max_batch_size=8, max_wait_ms=5.0, name="micro-batcher"):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self.metrics = BatchMetrics(max_batch_size)
+
+        self._pending = deque()  # (item, future, enqueue_time)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def submit(self, item):
+        fut = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError(f"{self.name} is closed")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._pending.append((item, fut, time.perf_counter()))
+            self._cond.notify()
+        return fut
+
+    def close(self, timeout=None):
+        """남은 요청을 모두 처리한 뒤 워커 종료"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending:
+                if self._closed:
+                    return None
+                self._cond.wait()
+
+            # 가장 오래된 요청 기준으로 마감 시각 계산
+            deadline = self._pending[0][2] + self.max_wait
+            while len(self._pending) < self.max_batch_size and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            n = min(self.max_batch_size, len(self._pending))
+            return [self._pending.popleft() for _ in range(n)]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            start = time.perf_counter()
+            waits_ms = [(start - t) * 1000 for _, _, t in batch]
+            items = [item for item, _, _ in batch]
+            try:
+                results = self.batch_fn(items)
+                if len(results) != len(items):
+                    raise RuntimeError(f"batch_fn returned {len(results)} results for {len(items)} items")
+            except Exception as e:
+                for _, fut, _ in batch:
+                    fut.set_exception(e)
+                continue
+            finally:
+                self.metrics.record(len(batch), waits_ms, (time.perf_counter() - start) * 1000)
+
+            for (_, fut, _), res in zip(batch, results):
+                fut.set_result(res)
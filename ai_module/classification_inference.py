@@ -5,36 +5,102 @@ import torchvision
 import torch.nn as nn
 from PIL import Image
 import os
+from model_registry import ModelRegistry
+from multihead import MULTIHEAD_FORMAT, build_multihead_from_checkpoint
+from preprocess import CropPreprocessor
 
 device = torch.device("mps" if torch.backends.mps.is_available() else "cpu")
 
-tops_model, bottoms_model, outer_model, skirt_model = None, None, None, None
-tops_classes, bottoms_classes, outer_classes, skirt_classes = [],[],[],[]
+test_path ="/Users/songseungho/Desktop/making program/Project_ai_clothes/ai-clothes-sorter/model_files/model_effb3.pth"
+# 대분류별 세분류 체크포인트
+# 예) model_files/effb3_tops.pth, effb3_bottoms.pth, effb3_outer.pth, effb3_skirt.pth
+CLF_CKPT_PATHS = {
+    "상의": test_path,
+    "하의": test_path,
+    "아우터": test_path,
+    "치마": test_path,
+    #"치마": "model_files/effb3_skirt.pth",
+}
+# backbone 공유 multi-head 체크포인트 (train_clf_tops.train_clf_multihead 결과). 설정 시 위 경로 대신 사용
+CLF_MULTIHEAD_PATH = None  # 예) "model_files/effb3_multihead.pth"
+# "torch" | "onnx" (onnx는 각 체크포인트 옆의 같은 이름 .onnx 사용, export_onnx.py로 생성)
+CLF_BACKEND = os.environ.get("CLF_BACKEND", "torch")
+# 세분류 모델이 차지할 수 있는 최대 메모리 (MB). None이면 제한 없음
+CLF_MEMORY_BUDGET_MB = None
+
+
+def load_model(path):
+    if path.endswith(".onnx"):
+        from onnx_backend import OnnxClassifier
+        net = OnnxClassifier(path)
+        return net, net.classes
+
+    checkpoint = torch.load(path, map_location=device)
+    if checkpoint.get("format") == MULTIHEAD_FORMAT:
+        net = build_multihead_from_checkpoint(checkpoint, device)
+        return net, net.head_classes
+
+    classes = checkpoint["classes"]
+    net = torchvision.models.efficientnet_b3(weights=None)
+    in_features = net.classifier[1].in_features
+    net.classifier[1] = nn.Linear(in_features, len(classes))
+    net.load_state_dict(checkpoint["model_state"])
+    net.eval()
+    net.to(device)
+    return net, classes
+
+
+# 같은 체크포인트는 한 번만 로드해서 대분류 슬롯끼리 공유
+clf_registry = ModelRegistry(
+    load_model,
+    memory_budget_bytes=None if CLF_MEMORY_BUDGET_MB is None else int(CLF_MEMORY_BUDGET_MB * 1e6),
+)
+
+
+def get_multihead_model():
+    if CLF_MULTIHEAD_PATH is None:
+        return None
+    model, _ = clf_registry.get(CLF_MULTIHEAD_PATH)
+    return model
+
+
+def get_clf_model(big_cat):
+    path = CLF_CKPT_PATHS.get(big_cat)
+    if path is None:
+        return None, None
+    if CLF_BACKEND == "onnx":
+        path = os.path.splitext(path)[0] + ".onnx"
+    return clf_registry.get(path)
+
 
 def load_all_clf_models_once():
-    global tops_model, bottoms_model, outer_model, skirt_model
-    global tops_classes, bottoms_classes, outer_classes, skirt_classes
-    if tops_model is not None:
-        return  # already loaded
-
-    def load_model(path):
-        checkpoint = torch.load(path, map_location=device)
-        classes = checkpoint["classes"]
-        net = torchvision.models.efficientnet_b3(weights=None)
-        in_features = net.classifier[1].in_features
-        net.classifier[1] = nn.Linear(in_features, len(classes))
-        net.load_state_dict(checkpoint["model_state"])
-        net.eval()
-        net.to(device)
-        return net, classes
-
-    test_path ="/Users/songseungho/Desktop/making program/Project_ai_clothes/ai-clothes-sorter/model_files/model_effb3.pth"
-    # 예) model_files/effb3_tops.pth, effb3_bottoms.pth, effb3_outer.pth, effb3_skirt.pth
-    tops_model, tops_classes   = load_model(test_path)
-    bottoms_model, bottoms_classes = load_model(test_path)
-    outer_model, outer_classes = load_model(test_path)
-    skirt_model, skirt_classes = load_model(test_path)
-    #skirt_model, skirt_classes = load_model("model_files/effb3_skirt.pth")
+    # 메모리 제한이 있으면 첫 사용 시점에 lazy 로드 (preload하면 바로 evict될 수 있음)
+    if clf_registry.memory_budget_bytes is not None:
+        return
+    if CLF_MULTIHEAD_PATH is not None:
+        clf_registry.preload([CLF_MULTIHEAD_PATH])
+    else:
+        for big_cat in CLF_CKPT_PATHS:
+            get_clf_model(big_cat)
+
+clf_transform = T.Compose([
+    T.Resize((300,300)),
+    T.ToTensor(),
+    T.Normalize([0.485,0.456,0.406],[0.229,0.224,0.225])
+])
+
+# BGR numpy crop 전처리 (PIL 변환 없음, 버퍼 재사용)
+crop_preprocessor = CropPreprocessor(size=300)
+
+
+def _top1(model, classes, x):
+    """x: [N,3,300,300] → [(label, conf), ...]"""
+    with torch.no_grad():
+        outs = model(x.to(device))
+        probs = torch.softmax(outs, dim=1)
+        top_prob, top_idx = probs.max(dim=1)
+    return [(classes[idx], prob) for idx, prob in zip(top_idx.tolist(), top_prob.tolist())]
+
 
 def classify_fine(image_pil, big_cat):
     """
@@ -42,37 +108,79 @@ def classify_fine(image_pil, big_cat):
     big_cat: one of ["상의","하의","아우터","치마"]
     return: (fine_label, confidence)
     """
-    load_all_clf_models_once()
-
-    if big_cat == "상의":
-        model = tops_model
-        classes = tops_classes
-    elif big_cat == "하의":
-        model = bottoms_model
-        classes = bottoms_classes
-    elif big_cat == "아우터":
-        model = outer_model
-        classes = outer_classes
-    elif big_cat == "치마":
-        model = skirt_model
-        classes = skirt_classes
-    else:
+    if CLF_MULTIHEAD_PATH is not None:
+        return classify_fine_batch([image_pil], [big_cat])[0]
+
+    model, classes = get_clf_model(big_cat)
+    if model is None:
         # default fallback
         return (big_cat, 1.0)
 
-    transform = T.Compose([
-        T.Resize((300,300)),
-        T.ToTensor(),
-        T.Normalize([0.485,0.456,0.406],[0.229,0.224,0.225])
-    ])
+    x = clf_transform(image_pil).unsqueeze(0)
+    return _top1(model, classes, x)[0]
 
-    x = transform(image_pil).unsqueeze(0).to(device)
-    with torch.no_grad():
-        outs = model(x)
-        probs = torch.softmax(outs, dim=1)
-        top_prob, top_idx = probs.max(dim=1)
 
-    conf = top_prob.item()
-    label_idx = top_idx.item()
-    fine_label = classes[label_idx]
-    return (fine_label, conf)
+def classify_fine_bgr(crop_bgr, big_cat):
+    """
+    crop_bgr: YOLO 박스에서 자른 BGR numpy 배열 (frame[y1:y2, x1:x2])
+    return: (fine_label, confidence)
+    """
+    multihead = get_multihead_model()
+    if multihead is not None:
+        return multihead.classify(crop_preprocessor([crop_bgr]).to(device), [big_cat])[0]
+
+    model, classes = get_clf_model(big_cat)
+    if model is None:
+        return (big_cat, 1.0)
+    return _top1(model, classes, crop_preprocessor([crop_bgr]))[0]
+
+
+def classify_fine_bgr_batch(crops_bgr, big_cats):
+    """
+    한 프레임의 BGR crop들을 대분류별로 묶어서 묶음마다 forward 한 번
+    (같은 체크포인트를 쓰는 대분류끼리는 registry가 모델을 공유하므로 하나의 묶음으로 처리)
+    return: [(fine_label, confidence), ...] (입력 순서 = 검출 순서)
+    """
+    if not crops_bgr:
+        return []
+
+    multihead = get_multihead_model()
+    if multihead is not None:
+        return multihead.classify(crop_preprocessor(crops_bgr).to(device), list(big_cats))
+
+    results = [(cat, 1.0) for cat in big_cats]
+    groups = {}  # id(model) -> (model, [(idx, big_cat)])
+    for i, cat in enumerate(big_cats):
+        model, classes = get_clf_model(cat)
+        if model is None:
+            continue
+        groups.setdefault(id(model), (model, []))[1].append(i)
+
+    if not groups:
+        return results
+
+    x = crop_preprocessor(crops_bgr)
+    for model, members in groups.values():
+        classes = get_clf_model(big_cats[members[0]])[1]
+        batch = x[members] if len(members) < len(crops_bgr) else x
+        for i, res in zip(members, _top1(model, classes, batch)):
+            results[i] = res
+    return results
+
+
+def classify_fine_batch(images_pil, big_cats):
+    """
+    한 프레임의 crop 여러 개를 한 번에 세분류
+    images_pil: PIL Image 리스트, big_cats: 같은 길이의 대분류 리스트
+    return: [(fine_label, confidence), ...] (입력 순서 유지)
+    """
+    if not images_pil:
+        return []
+
+    multihead = get_multihead_model()
+    if multihead is None:
+        return [classify_fine(img, cat) for img, cat in zip(images_pil, big_cats)]
+
+    # 대분류가 섞여 있어도 backbone은 한 번만 통과
+    x = torch.stack([clf_transform(img) for img in images_pil]).to(device)
+    return multihead.classify(x, list(big_cats))
@@ -2,6 +2,7 @@
 import torch
 import cv2
 from ultralytics import YOLO
+from detections import Detections
 
 yolo_model = None
 detection_class_names = []  # ["상의","하의","아우터","치마"]
@@ -17,22 +18,14 @@ def load_yolo_model_once():
     # model.names => dict or list
     detection_class_names = yolo_model.names
 
-def detect_with_yolo(frame_bgr, conf_thres=0.5):
+def detect(frame_bgr, conf_thres=0.5):
+    """YOLO 대분류 검출 → Detections (박스/점수/클래스를 프레임당 한 번에 numpy로)"""
     load_yolo_model_once()
-    # predict
     results = yolo_model.predict(source=frame_bgr, conf=conf_thres, verbose=False)
-    dets = []
-    if len(results) > 0:
-        boxes_data = results[0].boxes
-        for box in boxes_data:
-            xyxy = box.xyxy[0].cpu().numpy()  # [x1,y1,x2,y2]
-            cls_idx = int(box.cls[0].item())
-            conf    = float(box.conf[0].item())
-            x1,y1,x2,y2 = xyxy
-            cat = detection_class_names[cls_idx]
-            dets.append({
-                "box": (x1,y1,x2,y2),
-                "category": cat,
-                "score": conf
-            })
-    return dets
+    if len(results) == 0:
+        return Detections()
+    return Detections.from_ultralytics(results[0], detection_class_names)
+
+def detect_with_yolo(frame_bgr, conf_thres=0.5):
+    """[{"box": (x1,y1,x2,y2), "category", "score"}, ...] 형태가 필요한 쪽용"""
+    return detect(frame_bgr, conf_thres).to_dicts(label_key="category", as_int=False)
@@ -0,0 +1,103 @@
+# detections.py
+# 프레임 하나의 검출 결과를 struct-of-arrays로 들고 다니는 타입
+# - from_ultralytics(): results[i].boxes.data (N x 6: x1,y1,x2,y2,conf,cls)를 프레임당 한 번만 numpy로 가져옴
+#   (예전처럼 박스마다 box.xyxy[0].cpu() / box.cls[0].item() / box.conf[0].item() → 박스당 device sync 3번 X)
+# - 점수/라벨 필터, 최고 점수, 면적 등은 numpy 벡터 연산
+# - dict 리스트({"label", "score", "box"})는 JSON/화면 경계에서만 to_dicts()로 만듦
+# - __slots__ + 배열 3~4개라 프로세스 간 전송(pickle)도 작음 (클래스 이름 표는 들고 다니지 않음)
+import numpy as np
+
+_EMPTY_BOXES = np.zeros((0, 4), dtype=np.float32)
+_name_tables = {}   # id(names) -> (names, np.array(이름, dtype=object)) : 모델마다 한 번만 만듦
+
+
+def _name_table(names):
+    cached = _name_tables.get(id(names))
+    if cached is None or cached[0] is not names:
+        keys = names.keys() if isinstance(names, dict) else range(len(names))
+        table = np.empty(max(keys, default=-1) + 1, dtype=object)
+        for k in keys:
+            table[k] = names[k]
+        cached = _name_tables[id(names)] = (names, table)
+    return cached[1]
+
+
+class Detections:
+    __slots__ = ("xyxy", "scores", "class_ids", "labels")
+
+    def __init__(self, xyxy=None, scores=None, class_ids=None, labels=None):
+        """xyxy (N, 4) float32, scores (N,) float32, class_ids (N,) int32, labels (N,) object(str)"""
+        self.xyxy = _EMPTY_BOXES if xyxy is None else np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        n = len(self.xyxy)
+        self.scores = np.zeros(n, np.float32) if scores is None else np.asarray(scores, dtype=np.float32)
+        self.class_ids = np.full(n, -1, np.int32) if class_ids is None else np.asarray(class_ids, dtype=np.int32)
+        if labels is None:
+            labels = np.empty(n, dtype=object)
+        self.labels = np.asarray(labels, dtype=object)
+
+    # ---------- 생성 ----------
+    @classmethod
+    def from_ultralytics(cls, result, names=None):
+        """ultralytics Results 하나 → Detections (tensor → numpy 변환은 여기서 한 번)"""
+        boxes = result.boxes
+        names = result.names if names is None else names
+        if boxes is None or len(boxes) == 0:
+            return cls()
+        data = boxes.data
+        data = data.cpu().numpy() if hasattr(data, "cpu") else np.asarray(data)
+        class_ids = data[:, -1].astype(np.int32)   # tracking 결과면 (N x 7: id 열 추가), conf/cls는 항상 마지막 두 열
+        return cls(data[:, :4], data[:, -2], class_ids, _name_table(names)[class_ids])
+
+    @classmethod
+    def from_dicts(cls, dets, label_key="label"):
+        """예전 dict 리스트 → Detections (테스트/다른 검출기 연결용)"""
+        if not dets:
+            return cls()
+        return cls([d["box"] for d in dets], [d["score"] for d in dets], [d.get("class_id", -1) for d in dets],
+                   [d[label_key] for d in dets])
+
+    # ---------- 조회 ----------
+    def __len__(self):
+        return len(self.scores)
+
+    def __bool__(self):
+        return len(self.scores) > 0
+
+    def __getitem__(self, index):
+        """boolean mask / 인덱스 배열 / slice → 부분 Detections"""
+        if isinstance(index, (int, np.integer)):
+            index = [index]
+        return Detections(self.xyxy[index], self.scores[index], self.class_ids[index], self.labels[index])
+
+    def __repr__(self):
+        return f"Detections({len(self)}: {', '.join(f'{l}:{s:.2f}' for l, s in zip(self.labels, self.scores))})"
+
+    def mask(self, min_score=None, labels=None):
+        keep = np.ones(len(self), dtype=bool)
+        if min_score is not None:
+            keep &= self.scores > min_score
+        if labels is not None:
+            keep &= np.isin(self.labels, list(labels))
+        return keep
+
+    def filter(self, min_score=None, labels=None):
+        """score > min_score 이고 label이 labels 안에 있는 검출만"""
+        return self[self.mask(min_score, labels)]
+
+    def best(self):
+        """최고 점수 검출의 인덱스 (없으면 None)"""
+        return int(np.argmax(self.scores)) if len(self) else None
+
+    def areas(self):
+        return (self.xyxy[:, 2] - self.xyxy[:, 0]) * (self.xyxy[:, 3] - self.xyxy[:, 1])
+
+    # ---------- 경계 (JSON / 화면) ----------
+    def to_dicts(self, label_key="label", as_int=True):
+        """[{label_key, "score", "box"}, ...] (box는 정수 리스트, as_int=False면 float)"""
+        boxes = self.xyxy.astype(np.int32) if as_int else self.xyxy
+        return [{label_key: label, "score": score, "box": box}
+                for label, score, box in zip(self.labels.tolist(), self.scores.tolist(), boxes.tolist())]
+
+    def to_dict(self, i, label_key="label"):
+        return {label_key: self.labels[i], "score": float(self.scores[i]),
+                "box": self.xyxy[i].astype(np.int32).tolist()}
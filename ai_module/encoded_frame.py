@@ -0,0 +1,31 @@
+# encoded_frame.py
+# 라즈베리파이에서 받은 JPEG 원본 bytes를 디코딩한 프레임과 같이 들고 다니는 객체
+# - 저장할 때는 원본 bytes를 그대로 씀 (재인코딩 X, 화질 손실 X)
+# - 한 프레임을 여러 라벨 폴더에 저장하면 한 번만 쓰고 나머지는 hard link
+# - 박스 등을 그린 annotated 이미지를 저장할 때만 재인코딩
+import cv2
+import numpy as np
+
+
+class EncodedFrame:
+    __slots__ = ("jpeg", "_image")
+
+    def __init__(self, jpeg, image=None):
+        self.jpeg = jpeg
+        self._image = image
+
+    @property
+    def image(self):
+        """BGR ndarray (처음 접근할 때 한 번만 디코딩, 실패하면 None)"""
+        if self._image is None:
+            self._image = cv2.imdecode(np.frombuffer(self.jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return self._image
+
+    def save(self, writer, paths, annotated=None):
+        """paths[0]에 한 번 쓰고 나머지 경로는 link. annotated(BGR)가 있으면 그걸 인코딩해서 저장"""
+        paths = [str(p) for p in paths]
+        if not paths:
+            return False
+        if annotated is not None:
+            return writer.submit(paths[0], annotated, links=paths[1:])
+        return writer.submit(paths[0], data=self.jpeg, links=paths[1:])
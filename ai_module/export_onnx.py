@@ -0,0 +1,64 @@
+# export_onnx.py
+# model_effb3.pth (model_state + classes) → ONNX (batch 축 dynamic)
+# 사용: python export_onnx.py model_files/model_effb3.pth [-o model_files/model_effb3.onnx]
+import argparse
+import json
+import os
+
+import torch
+import torch.nn as nn
+import torchvision
+
+INPUT_SIZE = 300
+
+
+def build_effb3(checkpoint):
+    classes = checkpoint["classes"]
+    net = torchvision.models.efficientnet_b3(weights=None)
+    in_features = net.classifier[1].in_features
+    net.classifier[1] = nn.Linear(in_features, len(classes))
+    net.load_state_dict(checkpoint["model_state"])
+    net.eval()
+    return net, classes
+
+
+def onnx_path_for(ckpt_path):
+    return os.path.splitext(ckpt_path)[0] + ".onnx"
+
+
+def export_checkpoint(ckpt_path, out_path=None, opset=17):
+    checkpoint = torch.load(ckpt_path, map_location="cpu")
+    if not checkpoint.get("classes"):
+        raise ValueError(f"{ckpt_path}: single-head checkpoint (model_state + classes) required")
+    net, classes = build_effb3(checkpoint)
+    out_path = out_path or onnx_path_for(ckpt_path)
+
+    dummy = torch.randn(1, 3, INPUT_SIZE, INPUT_SIZE)
+    torch.onnx.export(
+        net, dummy, out_path,
+        input_names=["input"],
+        output_names=["logits"],
+        dynamic_axes={"input": {0: "batch"}, "logits": {0: "batch"}},
+        opset_version=opset,
+    )
+
+    # 클래스 목록은 ONNX metadata에 같이 저장 (런타임에서 .pth 없이 사용, 없으면 OnnxClassifier가 로드 거부)
+    import onnx
+    model = onnx.load(out_path)
+    onnx.helper.set_model_props(model, {"classes": json.dumps(classes, ensure_ascii=False)})
+    onnx.save(model, out_path)
+    print(f"[EXPORT] {ckpt_path} → {out_path} ({len(classes)} classes)")
+    return out_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EfficientNet-B3 checkpoint → ONNX")
+    parser.add_argument("checkpoint", nargs="+", help="model_state + classes 형식의 .pth")
+    parser.add_argument("-o", "--out", help="출력 경로 (체크포인트가 하나일 때만)")
+    parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+
+    if args.out and len(args.checkpoint) > 1:
+        parser.error("--out can only be used with a single checkpoint")
+    for path in dict.fromkeys(args.checkpoint):
+        export_checkpoint(path, args.out, args.opset)
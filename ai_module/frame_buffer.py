@@ -0,0 +1,48 @@
+# frame_buffer.py
+# 단일 슬롯 "최신 프레임" 버퍼
+# - 생산자(캡처 스레드)는 항상 덮어쓰기 → 큐가 쌓이지 않음
+# - 소비자는 자기가 마지막으로 본 seq보다 새로운 항목이 올 때까지 대기
+import threading
+
+
+class LatestFrameBuffer:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._seq = 0
+        self._read_seq = 0
+        self._closed = False
+        self.dropped = 0     # 한 번도 읽히지 않고 덮어써진 항목 수
+
+    def put(self, item):
+        with self._cond:
+            if self._seq > self._read_seq:
+                self.dropped += 1
+            self._item = item
+            self._seq += 1
+            self._cond.notify_all()
+            return self._seq
+
+    def get(self, after_seq=0, timeout=None):
+        """after_seq보다 새로운 항목 → (seq, item). 닫혔거나 timeout이면 (after_seq, None)"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > after_seq or self._closed, timeout):
+                return after_seq, None
+            if self._seq <= after_seq:
+                return after_seq, None
+            self._read_seq = max(self._read_seq, self._seq)
+            return self._seq, self._item
+
+    def peek(self):
+        """대기 없이 현재 항목 → (seq, item)"""
+        with self._cond:
+            return self._seq, self._item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
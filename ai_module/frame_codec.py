@@ -0,0 +1,140 @@
+# frame_codec.py
+# 라즈베리파이 → 서버 프레임 메시지의 binary 포맷 (base64-in-JSON 대체)
+#
+#   [고정 헤더 HEADER_SIZE bytes, little-endian] + [JPEG 원본 bytes]
+#     magic       4s   b"FSRC"
+#     version     B    FORMAT_VERSION
+#     flags       B    FLAG_* 조합
+#     device_id   32s  utf-8, 뒤는 \0 패딩
+#     seq         I    디바이스별 프레임 번호 (uint32, wrap)
+#     capture_ts  d    캡처 시각 (time.time())
+#     distance    f    cm, 없으면 NaN
+#     speed       f    current_speed, 없으면 NaN
+#     jpeg_len    I    뒤따르는 JPEG 길이 (검증용)
+#
+# decode_frame()은 payload를 복사하지 않고 JPEG 부분을 memoryview로 돌려줌 → jpeg_array()로 np.frombuffer
+# 배포 기간 동안 예전 JSON({"frame": base64, "distance": ...}) 및 센서 전용 JSON도 그대로 받음 (version 0)
+# 파이 쪽은 표준 라이브러리만 사용 (numpy는 jpeg_array에서만 필요)
+import base64
+import json
+import math
+import struct
+import time
+
+MAGIC = b"FSRC"
+FORMAT_VERSION = 1
+LEGACY_VERSION = 0
+
+FLAG_HAS_MOVE_STATE = 0x01
+FLAG_MOVE_STATE = 0x02
+
+DEVICE_ID_BYTES = 32
+_HEADER = struct.Struct("<4sBB32sIdffI")
+HEADER_SIZE = _HEADER.size
+
+
+class FrameDecodeError(ValueError):
+    pass
+
+
+class FramePacket:
+    """decode_frame 결과. jpeg는 수신 payload를 가리키는 memoryview (센서 전용 메시지면 None)"""
+    __slots__ = ("device_id", "seq", "capture_ts", "distance", "current_speed", "move_state", "jpeg", "version")
+
+    def __init__(self, device_id, seq, capture_ts, distance, current_speed, move_state, jpeg, version):
+        self.device_id = device_id
+        self.seq = seq
+        self.capture_ts = capture_ts
+        self.distance = distance
+        self.current_speed = current_speed
+        self.move_state = move_state
+        self.jpeg = jpeg
+        self.version = version
+
+    @property
+    def has_frame(self):
+        return self.jpeg is not None
+
+    def sensors(self):
+        """기존 수신부의 data dict와 같은 키"""
+        return {
+            "distance": self.distance,
+            "current_speed": self.current_speed,
+            "move_state": self.move_state,
+        }
+
+
+def _opt_float(value):
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _from_float(value):
+    return None if math.isnan(value) else value
+
+
+def encode_frame(device_id, seq, jpeg, distance=None, current_speed=None, move_state=None, capture_ts=None):
+    """
+    jpeg: bytes / bytearray / cv2.imencode 결과(np.uint8 배열) 등 buffer protocol 객체
+    → 헤더 + JPEG를 이어 붙인 bytes (복사는 이 join 한 번)
+    """
+    dev = device_id.encode("utf-8")
+    if len(dev) > DEVICE_ID_BYTES:
+        raise ValueError(f"device_id longer than {DEVICE_ID_BYTES} bytes: {device_id!r}")
+    body = memoryview(jpeg).cast("B")
+    flags = 0
+    if move_state is not None:
+        flags |= FLAG_HAS_MOVE_STATE
+        if move_state:
+            flags |= FLAG_MOVE_STATE
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, flags, dev, seq & 0xFFFFFFFF,
+        time.time() if capture_ts is None else capture_ts,
+        _opt_float(distance), _opt_float(current_speed), len(body),
+    )
+    return b"".join((header, body))
+
+
+def _decode_legacy(payload, device_id):
+    try:
+        obj = json.loads(bytes(payload).decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise FrameDecodeError(f"not a binary frame or legacy JSON: {e}") from e
+    if not isinstance(obj, dict):
+        raise FrameDecodeError("legacy payload is not a JSON object")
+    b64 = obj.get("frame")
+    jpeg = memoryview(base64.b64decode(b64)) if b64 else None
+    return FramePacket(device_id, None, None, obj.get("distance"), obj.get("current_speed"),
+                       obj.get("move_state"), jpeg, LEGACY_VERSION)
+
+
+def decode_frame(payload, device_id=None):
+    """
+    payload: MQTT msg.payload (bytes)
+    device_id: 예전 JSON 포맷에는 device id가 없으므로 토픽에서 얻은 값을 넘김
+    """
+    mv = memoryview(payload)
+    if len(mv) < HEADER_SIZE or mv[:4] != MAGIC:
+        return _decode_legacy(mv, device_id)
+
+    magic, version, flags, dev, seq, capture_ts, distance, speed, jpeg_len = _HEADER.unpack_from(mv)
+    if version != FORMAT_VERSION:
+        raise FrameDecodeError(f"unsupported frame format version {version}")
+    if HEADER_SIZE + jpeg_len != len(mv):
+        raise FrameDecodeError(f"jpeg_len {jpeg_len} does not match payload size {len(mv)}")
+    move_state = bool(flags & FLAG_MOVE_STATE) if flags & FLAG_HAS_MOVE_STATE else None
+    return FramePacket(
+        dev.rstrip(b"\0").decode("utf-8") or device_id, seq, capture_ts,
+        _from_float(distance), _from_float(speed), move_state,
+        mv[HEADER_SIZE:] if jpeg_len else None, version,
+    )
+
+
+def jpeg_array(packet):
+    """JPEG 부분 → np.uint8 1-D 배열 (payload 메모리를 그대로 공유, cv2.imdecode에 바로 사용)"""
+    import numpy as np
+    return np.frombuffer(packet.jpeg, dtype=np.uint8)
@@ -0,0 +1,238 @@
+# image_writer.py
+# 검출 루프 밖에서 JPEG 저장을 처리하는 백그라운드 writer 풀
+# - 고정 크기 큐 + worker 스레드 N개, 이미 만든 폴더는 캐시 (mkdir 반복 X)
+# - 큐가 가득 차면 policy에 따라 처리
+#     "drop_oldest": 가장 오래된 저장 요청을 버리고 새 요청을 넣음 (기본값)
+#     "drop"       : 새 요청을 버림
+#     "spill"      : 호출 스레드에서 JPEG 인코딩만 해서 메모리 overflow에 보관 (raw 프레임보다 훨씬 작음),
+#                    spill_max_bytes를 넘으면 버림
+#     "block"      : block_timeout까지 대기 후 버림
+# - close()/프로세스 종료 시 남은 요청을 모두 쓰고 종료
+# - links: 같은 내용을 여러 폴더에 저장할 때 한 번만 쓰고 나머지는 hard link (안 되면 복사)
+# - 항상 같은 폴더의 임시 파일에 쓴 뒤 os.replace: 같은 경로에 다시 저장해도 이전 파일(inode)과
+#   거기 걸린 hard link는 그대로 (덮어쓰기로 다른 라벨 폴더의 사본까지 바뀌지 않음)
+# 주의: submit()한 image 배열은 저장될 때까지 수정하지 말 것 (필요하면 copy()해서 넘김)
+import atexit
+import os
+import shutil
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+POLICIES = ("drop_oldest", "drop", "spill", "block")
+
+
+class ImageWriter:
+    def __init__(self, workers=2, max_queue=64, policy="drop_oldest", spill_max_bytes=64 * 1024 * 1024,
+                 block_timeout=0.5, name="image_writer"):
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}, got {policy!r}")
+        self.max_queue = max_queue
+        self.policy = policy
+        self.spill_max_bytes = spill_max_bytes
+        self.block_timeout = block_timeout
+        self.name = name
+
+        self._cond = threading.Condition()
+        self._queue = deque()        # (path, image ndarray 또는 None, data bytes 또는 None, links)
+        self._spill = deque()        # (path, None, jpeg bytes, links)
+        self._spill_bytes = 0
+        self._in_flight = 0
+        self._closed = False
+        self._dirs = set()
+        self._dirs_lock = threading.Lock()
+
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.errors = 0
+        self._write_ms = deque(maxlen=500)
+
+        self._threads = [
+            threading.Thread(target=self._run, name=f"{name}-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+        atexit.register(self.close)
+
+    # ---------- 생산자 쪽 ----------
+    def submit(self, path, image=None, data=None, links=()):
+        """
+        image(BGR ndarray) 또는 이미 인코딩된 data(bytes)를 path에 저장 예약. 큐에 들어갔으면 True
+        links: 같은 파일을 추가로 둘 경로들 (path를 쓴 뒤 hard link)
+        """
+        if (image is None) == (data is None):
+            raise ValueError("pass exactly one of image / data")
+        path = str(path)
+        links = tuple(dict.fromkeys(str(p) for p in links if str(p) != path))
+        item = (path, image, data, links)
+        with self._cond:
+            if self._closed:
+                self.dropped += 1
+                return False
+            self.submitted += 1
+            if len(self._queue) < self.max_queue:
+                return self._enqueue(item)
+
+            if self.policy == "drop_oldest":
+                self._queue.popleft()
+                self.dropped += 1
+                return self._enqueue(item)
+            if self.policy == "block":
+                if self._cond.wait_for(lambda: len(self._queue) < self.max_queue or self._closed,
+                                       self.block_timeout) and not self._closed:
+                    return self._enqueue(item)
+                self.dropped += 1
+                return False
+            if self.policy == "drop":
+                self.dropped += 1
+                return False
+
+        # spill: 인코딩은 lock 밖에서
+        if data is None:
+            ok, buf = cv2.imencode(os.path.splitext(path)[1] or ".jpg", image)
+            if not ok:
+                with self._cond:
+                    self.errors += 1
+                return False
+            data = buf.tobytes()
+        with self._cond:
+            if self._spill_bytes + len(data) > self.spill_max_bytes:
+                self.dropped += 1
+                return False
+            self._spill.append((path, None, data, links))
+            self._spill_bytes += len(data)
+            self.spilled += 1
+            self._cond.notify()
+            return True
+
+    def _enqueue(self, item):
+        self._queue.append(item)
+        self._cond.notify()
+        return True
+
+    # ---------- worker ----------
+    def _next(self):
+        with self._cond:
+            self._cond.wait_for(lambda: self._queue or self._spill or self._closed)
+            if self._queue:
+                item = self._queue.popleft()
+            elif self._spill:
+                item = self._spill.popleft()
+                self._spill_bytes -= len(item[2])
+            else:
+                return None
+            self._in_flight += 1
+            # block 정책으로 대기 중인 생산자 깨우기
+            self._cond.notify_all()
+            return item
+
+    def _ensure_dir(self, path):
+        d = os.path.dirname(path)
+        if not d or d in self._dirs:
+            return
+        with self._dirs_lock:
+            if d not in self._dirs:
+                os.makedirs(d, exist_ok=True)
+                self._dirs.add(d)
+
+    def _write(self, path, image, data, links=()):
+        self._ensure_dir(path)
+        if image is not None:
+            ok, buf = cv2.imencode(os.path.splitext(path)[1] or ".jpg", image)
+            if not ok:
+                raise IOError(f"cv2.imencode failed: {path}")
+            data = buf.tobytes()
+        # worker마다 다른 임시 이름 (mkstemp는 0600 권한이라 일반 open으로 만듦)
+        tmp = f"{path}.{os.getpid()}-{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        for link in links:
+            self._ensure_dir(link)
+            if os.path.lexists(link):
+                os.remove(link)
+            try:
+                os.link(path, link)
+            except OSError:
+                # 다른 파일시스템 / hard link 미지원
+                shutil.copyfile(path, link)
+
+    def _run(self):
+        while True:
+            item = self._next()
+            if item is None:
+                return
+            start = time.perf_counter()
+            try:
+                self._write(*item)
+                ok = True
+            except Exception as e:
+                print(f"[❌ {self.name}] {item[0]}: {e}")
+                ok = False
+            elapsed = (time.perf_counter() - start) * 1000
+            with self._cond:
+                self._in_flight -= 1
+                if ok:
+                    self.written += 1
+                    self._write_ms.append(elapsed)
+                else:
+                    self.errors += 1
+                self._cond.notify_all()
+
+    # ---------- 종료 / 상태 ----------
+    def flush(self, timeout=None):
+        """지금까지 들어온 요청이 모두 쓰일 때까지 대기. 다 썼으면 True"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._queue and not self._spill and self._in_flight == 0, timeout)
+
+    def close(self, timeout=10.0):
+        if self._closed:
+            return
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for t in self._threads:
+            t.join(timeout=1.0)
+
+    def stats(self):
+        with self._cond:
+            times = np.asarray(self._write_ms) if self._write_ms else np.zeros(1)
+            return {
+                "policy": self.policy,
+                "queued": len(self._queue),
+                "spill_queued": len(self._spill),
+                "spill_bytes": self._spill_bytes,
+                "submitted": self.submitted,
+                "written": self.written,
+                "dropped": self.dropped,
+                "spilled": self.spilled,
+                "errors": self.errors,
+                "write_ms_avg": round(float(times.mean()), 2),
+                "write_ms_p95": round(float(np.percentile(times, 95)), 2),
+            }
+
+
+_default_writer = None
+_default_lock = threading.Lock()
+
+
+def get_image_writer(**kwargs):
+    """프로세스 공용 writer (처음 호출할 때의 kwargs로 생성)"""
+    global _default_writer
+    with _default_lock:
+        if _default_writer is None:
+            _default_writer = ImageWriter(**kwargs)
+        return _default_writer
@@ -2,17 +2,34 @@
 
 import torch
 import io
+import os
 from PIL import Image
 from torchvision import models
 import torch.nn as nn
 import torchvision.transforms as T
 import time
+import threading
+from ai_module.batching import MicroBatcher
 
 model = None
 device = torch.device("mps" if torch.backends.mps.is_available() else "cpu")
 print(f"[INFO] Training on device: {device}")
 loaded_classes = None
 
+MODEL_PATH = "model_files/model_effb3.pth"
+# "torch" | "onnx" | "int8"
+# onnx: export_onnx.py로 만든 model_effb3.onnx, int8: quantize.py로 만든 model_effb3_int8.pt
+CLF_BACKEND = os.environ.get("CLF_BACKEND", "torch")
+ONNX_MODEL_PATH = os.path.splitext(MODEL_PATH)[0] + ".onnx"
+INT8_MODEL_PATH = os.path.splitext(MODEL_PATH)[0] + "_int8.pt"
+
+# 마이크로 배칭 설정 (동시 요청을 최대 MAX_BATCH_SIZE개, 최대 MAX_BATCH_WAIT_MS 동안 모음)
+MAX_BATCH_SIZE = 8
+MAX_BATCH_WAIT_MS = 5.0
+batcher = None
+_batcher_lock = threading.Lock()
+_model_lock = threading.Lock()
+
 infer_transform = T.Compose([
     T.Resize((300,300)),
     T.ToTensor(),
@@ -20,37 +37,77 @@ infer_transform = T.Compose([
 ])
 
 def load_model_once():
-    global model, loaded_classes
-    if model is None:
-        checkpoint = torch.load("model_files/model_effb3.pth", map_location=device)
-        classes = checkpoint["classes"]  # list of folder-based classes
-        loaded_classes = classes
+    """classify_image가 threadpool에서 동시에 불려도 모델은 한 번만 로드 (get_batcher와 같은 double-check)"""
+    global model, loaded_classes, device
+    if model is not None:
+        return
+    with _model_lock:
+        if model is not None:
+            return
+        if CLF_BACKEND == "int8":
+            # 양자화 모델은 CPU 전용
+            from ai_module.quantize import load_int8
+            net, classes = load_int8(INT8_MODEL_PATH)
+            device = torch.device("cpu")
+            print(f"[INFO] INT8 backend: {INT8_MODEL_PATH}")
+        elif CLF_BACKEND == "onnx":
+            from ai_module.onnx_backend import OnnxClassifier
+            net = OnnxClassifier(ONNX_MODEL_PATH)
+            classes = net.classes
+            print(f"[INFO] ONNX Runtime backend: {ONNX_MODEL_PATH}")
+        else:
+            checkpoint = torch.load(MODEL_PATH, map_location=device)
+            classes = checkpoint["classes"]  # list of folder-based classes
 
-        net = models.efficientnet_b3(weights=None)  # We'll load state dict
-        in_features = net.classifier[1].in_features
-        net.classifier[1] = nn.Linear(in_features, len(classes))
-        net.load_state_dict(checkpoint["model_state"])
-        net.eval()
-        net.to(device)
+            net = models.efficientnet_b3(weights=None)  # We'll load state dict
+            in_features = net.classifier[1].in_features
+            net.classifier[1] = nn.Linear(in_features, len(classes))
+            net.load_state_dict(checkpoint["model_state"])
+            net.eval()
+            net.to(device)
+        # model은 마지막에 설정: 락 밖에서 model is not None을 본 스레드는 classes/device도 준비된 상태
+        loaded_classes = classes
         model = net
 
 
-def classify_image(image_bytes: bytes):
-    load_model_once()
-    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
-    tensor = infer_transform(img).unsqueeze(0).to(device)
+def _classify_batch(tensors):
+    """전처리된 [3,300,300] 텐서 리스트 → [(label, confidence), ...]"""
+    batch = torch.stack(tensors).to(device)
 
     start = time.time()  # 측정 시작
     with torch.no_grad():
-        outputs = model(tensor)
+        outputs = model(batch)
     inference_time = (time.time() - start) * 1000  # ms 단위
 
     probs = torch.softmax(outputs, dim=1)
     top_prob, top_idx = probs.max(dim=1)
 
-    print(f"Inference time: {inference_time:.2f} ms")
+    print(f"Inference time: {inference_time:.2f} ms (batch={len(tensors)})")
+
+    return [(loaded_classes[idx], prob) for idx, prob in zip(top_idx.tolist(), top_prob.tolist())]
+
+
+def get_batcher():
+    global batcher
+    with _batcher_lock:
+        if batcher is None:
+            batcher = MicroBatcher(_classify_batch, max_batch_size=MAX_BATCH_SIZE,
+                                   max_wait_ms=MAX_BATCH_WAIT_MS, name="classify-batcher")
+    return batcher
+
+
+def get_batch_metrics():
+    """배치 크기 분포 / 큐 대기 시간 통계 (처리량 vs tail latency 튜닝용)"""
+    if batcher is None:
+        return {}
+    return batcher.metrics.snapshot()
+
+
+def classify_image(image_bytes: bytes):
+    load_model_once()
+    img = Image.open(io.BytesIO(image_bytes)).convert("RGB")
+    tensor = infer_transform(img)
 
-    label_idx = top_idx.item()
-    label_str = loaded_classes[label_idx]
-    confidence = top_prob.item()
+    # 동시에 들어온 요청들과 함께 한 번의 forward로 처리됨
+    label_str, confidence = get_batcher().submit(tensor).result()
     return label_str, confidence
@@ -0,0 +1,309 @@
+# latency_trace.py
+# 파이 캡처 → 서버 수신/디코딩/추론/판단 → 명령 전송 → 액추에이터 파이 수신까지 단계별 지연 추적
+# - trace id("<device_id>:<seq>")와 단계별 시각을 MQTT v5 user property로 실어 보냄 (payload 포맷은 그대로)
+# - 시각은 호스트별 monotonic 시계(perf_counter)의 차이로 재고, 생성 시점의 time.time()에 고정해서 표현
+#   → 같은 호스트 안의 단계 간격은 NTP 보정 등에 흔들리지 않음
+# - 호스트가 다른 구간(파이 → 서버, 서버 → 파이)은 ping/pong 및 명령 ack의 4개 시각으로
+#   파이-서버 시계 차이(offset)를 추정해서 보정 (NTP 방식, 왕복 지연이 가장 작은 샘플 사용)
+# - LatencyRecorder: 디바이스/구간별 최근 샘플 → 백분위, 히스토그램, 리포트
+# 파이 쪽에서 쓰는 부분(Trace, trace_properties, install_echo, ack_command)은 표준 라이브러리 + paho만 사용
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+
+STAGES = ("capture", "encode", "publish", "receive", "decode", "infer", "decide", "command", "ack")
+SERVER = "server"
+
+TOPIC_PING = "trace/ping/"   # 서버 → 파이   {"t1"}
+TOPIC_PONG = "trace/pong/"   # 파이 → 서버   {"t1", "t2", "t3"}
+TOPIC_ACK = "trace/ack/"     # 액추에이터 파이 → 서버 (명령 수신 확인) {"trace", "t1", "t2", "t3"}
+
+
+class Trace:
+    """한 프레임의 단계별 시각. marks: stage -> (host, 그 호스트 시계 기준 시각)"""
+    __slots__ = ("trace_id", "device_id", "host", "marks", "_wall0", "_mono0")
+
+    def __init__(self, trace_id, device_id, host=SERVER, marks=None):
+        self.trace_id = trace_id
+        self.device_id = device_id
+        self.host = host
+        self.marks = dict(marks or {})
+        self._wall0 = time.time()
+        self._mono0 = time.perf_counter()
+
+    @classmethod
+    def start(cls, device_id, seq, stage="capture"):
+        """파이에서 캡처 직후 호출"""
+        trace = cls(f"{device_id}:{seq}", device_id, host=device_id)
+        trace.mark(stage)
+        return trace
+
+    def now(self):
+        return self._wall0 + (time.perf_counter() - self._mono0)
+
+    def mark(self, stage):
+        ts = self.now()
+        self.marks[stage] = (self.host, ts)
+        return ts
+
+
+def mark(trace, stage):
+    """trace가 없는 메시지(예전 파이)도 같은 코드로 처리하기 위한 helper"""
+    if trace is not None:
+        trace.mark(stage)
+
+
+# ------------------ MQTT v5 user property ------------------
+def _properties(pairs):
+    from paho.mqtt.packettypes import PacketTypes
+    from paho.mqtt.properties import Properties
+    props = Properties(PacketTypes.PUBLISH)
+    props.UserProperty = [(k, str(v)) for k, v in pairs]
+    return props
+
+
+def _user_properties(msg):
+    props = getattr(msg, "properties", None)
+    return dict(getattr(props, "UserProperty", None) or [])
+
+
+def trace_properties(trace):
+    """파이 → 서버 프레임 publish용: trace id + 이 호스트에서 찍은 단계 시각"""
+    marks = ",".join(f"{stage}={ts:.6f}" for stage, (host, ts) in trace.marks.items() if host == trace.host)
+    return _properties([("trace", trace.trace_id), ("host", trace.host), ("marks", marks)])
+
+
+def trace_from_message(msg, device_id):
+    """수신 콜백 맨 앞에서 호출 → receive까지 mark된 Trace (trace 속성이 없으면 None)"""
+    props = _user_properties(msg)
+    trace_id = props.get("trace")
+    if not trace_id:
+        return None
+    host = props.get("host", device_id)
+    marks = {}
+    for item in props.get("marks", "").split(","):
+        stage, _, ts = item.partition("=")
+        if stage and ts:
+            marks[stage] = (host, float(ts))
+    trace = Trace(trace_id, device_id, host=SERVER, marks=marks)
+    trace.mark("receive")
+    return trace
+
+
+def command_properties(trace):
+    """서버 → 액추에이터 명령 publish용: trace id + 전송 시각(t1)"""
+    return _properties([("trace", trace.trace_id), ("t1", f"{trace.marks['command'][1]:.6f}")])
+
+
+# ------------------ 파이 쪽 ------------------
+def install_echo(client, device_id):
+    """ping(trace/ping/<device_id>)에 바로 pong 응답 → 서버가 이 파이의 시계 차이를 추정"""
+    def on_ping(client, userdata, msg):
+        t2 = time.time()
+        try:
+            t1 = json.loads(msg.payload)["t1"]
+        except (ValueError, KeyError, TypeError):
+            return
+        client.publish(TOPIC_PONG + device_id, json.dumps({"t1": t1, "t2": t2, "t3": time.time()}))
+
+    client.message_callback_add(TOPIC_PING + device_id, on_ping)
+    client.subscribe(TOPIC_PING + device_id)
+
+
+def ack_command(client, device_id, msg, received=None):
+    """명령 수신 콜백 맨 앞에서 호출. trace가 달린 명령이면 수신 시각을 서버로 돌려보냄"""
+    t2 = time.time() if received is None else received
+    props = _user_properties(msg)
+    if "trace" not in props or "t1" not in props:
+        return
+    client.publish(TOPIC_ACK + device_id, json.dumps({
+        "trace": props["trace"], "t1": float(props["t1"]), "t2": t2, "t3": time.time(),
+    }))
+
+
+# ------------------ 서버 쪽 ------------------
+class ClockOffsetEstimator:
+    """
+    t1: 서버 전송, t2: 파이 수신, t3: 파이 응답, t4: 서버 수신 (각자 자기 시계)
+    offset = 파이 시계 - 서버 시계. 왕복 지연이 가장 작은 최근 샘플의 값을 사용
+    """
+    def __init__(self, window=64):
+        self._samples = deque(maxlen=window)   # (delay, offset)
+
+    def add(self, t1, t2, t3, t4):
+        delay = (t4 - t1) - (t3 - t2)
+        offset = ((t2 - t1) + (t3 - t4)) / 2
+        self._samples.append((delay, offset))
+        return offset
+
+    def _best(self):
+        return min(self._samples) if self._samples else None
+
+    @property
+    def offset(self):
+        best = self._best()
+        return None if best is None else best[1]
+
+    @property
+    def delay(self):
+        best = self._best()
+        return None if best is None else best[0]
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * q / 100.0
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+class LatencyRecorder:
+    """
+    observe(trace): 찍힌 단계들을 서버 시계로 맞춘 뒤 연속 구간("decode->infer" 등)과 total을 기록
+    expect_ack(trace): 명령을 보낸 trace는 ack가 오면 "command->ack", "capture->ack" 기록
+    """
+    HIST_EDGES_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+    def __init__(self, window=2000, max_pending=1024):
+        self.window = window
+        self.max_pending = max_pending
+        self.offsets = {}                  # host -> ClockOffsetEstimator
+        self._samples = {}                 # device_id -> {구간: deque(ms)}
+        self._pending = OrderedDict()      # trace_id -> 명령을 보낸 trace
+        self._lock = threading.Lock()
+
+    # ---------- 시계 보정 ----------
+    def add_clock_sample(self, host, t1, t2, t3, t4):
+        with self._lock:
+            est = self.offsets.get(host)
+            if est is None:
+                est = self.offsets[host] = ClockOffsetEstimator()
+            return est.add(t1, t2, t3, t4)
+
+    def to_server_time(self, host, ts):
+        """host 시계 시각 → 서버 시계. 아직 offset 샘플이 없으면 보정 없이 그대로"""
+        if host == SERVER:
+            return ts
+        with self._lock:
+            est = self.offsets.get(host)
+            offset = est.offset if est is not None else None
+        return ts if offset is None else ts - offset
+
+    # ---------- 기록 ----------
+    def record(self, device_id, span, ms):
+        with self._lock:
+            spans = self._samples.setdefault(device_id, {})
+            q = spans.get(span)
+            if q is None:
+                q = spans[span] = deque(maxlen=self.window)
+            q.append(ms)
+
+    def observe(self, trace, device_id=None):
+        device_id = device_id or trace.device_id
+        points = [(stage, self.to_server_time(*trace.marks[stage])) for stage in STAGES if stage in trace.marks]
+        for (a, ta), (b, tb) in zip(points, points[1:]):
+            self.record(device_id, f"{a}->{b}", (tb - ta) * 1000)
+        if len(points) > 2:
+            self.record(device_id, f"{points[0][0]}->{points[-1][0]}", (points[-1][1] - points[0][1]) * 1000)
+
+    def expect_ack(self, trace):
+        with self._lock:
+            self._pending[trace.trace_id] = trace
+            while len(self._pending) > self.max_pending:
+                self._pending.popitem(last=False)   # ack를 안 보내는 액추에이터
+
+    def on_ack(self, actuator_id, ack, received):
+        self.add_clock_sample(actuator_id, ack["t1"], ack["t2"], ack["t3"], received)
+        with self._lock:
+            trace = self._pending.pop(ack.get("trace"), None)
+        if trace is None:
+            return
+        trace.marks["ack"] = (actuator_id, ack["t2"])
+        ack_ts = self.to_server_time(actuator_id, ack["t2"])
+        for start in ("command", "capture"):
+            if start in trace.marks:
+                self.record(trace.device_id, f"{start}->ack", (ack_ts - self.to_server_time(*trace.marks[start])) * 1000)
+
+    # ---------- MQTT ----------
+    def attach(self, client):
+        """pong/ack 수신 콜백 등록 (on_message와 별개로 동작)"""
+        def on_pong(client, userdata, msg):
+            t4 = time.time()
+            try:
+                body = json.loads(msg.payload)
+                self.add_clock_sample(msg.topic[len(TOPIC_PONG):], body["t1"], body["t2"], body["t3"], t4)
+            except (ValueError, KeyError, TypeError):
+                pass
+
+        def on_ack(client, userdata, msg):
+            t4 = time.time()
+            try:
+                self.on_ack(msg.topic[len(TOPIC_ACK):], json.loads(msg.payload), t4)
+            except (ValueError, KeyError, TypeError):
+                pass
+
+        client.message_callback_add(TOPIC_PONG + "+", on_pong)
+        client.message_callback_add(TOPIC_ACK + "+", on_ack)
+        client.subscribe(TOPIC_PONG + "+")
+        client.subscribe(TOPIC_ACK + "+")
+
+    @staticmethod
+    def ping(client, device_id):
+        client.publish(TOPIC_PING + device_id, json.dumps({"t1": time.time()}))
+
+    def start_pinging(self, client, device_ids, interval=5.0):
+        """device_ids(): 지금 연결된 디바이스 목록. interval초마다 ping (시계 차이 갱신)"""
+        def loop():
+            while True:
+                for device_id in list(device_ids()):
+                    self.ping(client, device_id)
+                time.sleep(interval)
+        t = threading.Thread(target=loop, name="latency-ping", daemon=True)
+        t.start()
+        return t
+
+    # ---------- 조회 ----------
+    def percentiles(self, device_id=None):
+        with self._lock:
+            devices = {d: {k: sorted(v) for k, v in spans.items()} for d, spans in self._samples.items()
+                       if device_id is None or d == device_id}
+        return {
+            d: {span: {
+                "count": len(v),
+                "p50": round(_percentile(v, 50), 2),
+                "p95": round(_percentile(v, 95), 2),
+                "p99": round(_percentile(v, 99), 2),
+                "max": round(v[-1], 2),
+            } for span, v in spans.items()}
+            for d, spans in devices.items()
+        }
+
+    def histogram(self, device_id, span, edges=HIST_EDGES_MS):
+        """edges(ms) 기준 구간별 개수. 마지막 칸은 edges[-1] 초과"""
+        with self._lock:
+            values = list(self._samples.get(device_id, {}).get(span, ()))
+        counts = [0] * (len(edges) + 1)
+        for v in values:
+            i = 0
+            while i < len(edges) and v > edges[i]:
+                i += 1
+            counts[i] += 1
+        return counts
+
+    def report(self):
+        lines = []
+        for device_id, spans in sorted(self.percentiles().items()):
+            lines.append(f"[{device_id}]")
+            order = {s: i for i, s in enumerate(STAGES)}
+            for span, p in sorted(spans.items(), key=lambda kv: (order.get(kv[0].split("->")[0], 99),
+                                                                 order.get(kv[0].split("->")[1], 99))):
+                lines.append(f"  {span:<20} n={p['count']:<5} p50={p['p50']:>8.2f}  p95={p['p95']:>8.2f}  "
+                             f"p99={p['p99']:>8.2f}  max={p['max']:>8.2f} ms")
+        with self._lock:
+            for host, est in sorted(self.offsets.items()):
+                if est.offset is not None:
+                    lines.append(f"clock {host}: offset={est.offset * 1000:+.2f} ms  rtt={est.delay * 1000:.2f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,282 @@
+# load_generator.py
+# FSRC_CameraSensor 같은 카메라 파이 N대를 흉내 내는 부하 생성기
+# - 디바이스마다 MQTT 연결 1개, camera/frame/<id>로 binary 프레임(frame_codec) + trace user property 전송
+# - 프레임은 현장사진/, data/val 이미지를 640x480, 지정한 JPEG 품질로 미리 인코딩해서 사용
+# - 거리/이동 상태는 컨베이어 시나리오로 생성: 빈 벨트(이동) → 옷 도착(거리 감소) → 정지(분석 구간) → 다시 이동
+#   정지 구간마다 한 종류(data/val 폴더)의 옷 이미지를 보내서 서버 판단(on/off)이 바뀌게 함
+# - image/command/<id> 응답을 받아 판단 지연 측정
+#     명령에 trace가 있으면 (서버가 latency_trace 사용) 그 명령을 만든 프레임의 전송 시각 기준 → 정확한 값
+#     없으면 현재 정지 구간 시작 시각 기준 (추정값, estimated로 따로 집계)
+# - 드롭: publish 실패(클라이언트 송신 큐 가득) + 일정보다 늦어서 건너뛴 프레임 (카메라처럼 밀린 프레임은 안 보냄)
+# - 명령 ack / ping 응답도 실제 파이처럼 보냄 → 서버 쪽 latency 리포트('t' 키)에도 반영됨
+#
+# 사용 예:
+#   python load_generator.py --broker 127.0.0.1 --devices 1 2 4 8 --seconds 30 --fps 10
+import argparse
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from frame_codec import encode_frame
+from latency_trace import Trace, ack_command, install_echo, trace_properties
+
+_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+DEFAULT_IMAGE_DIRS = (os.path.join(_ROOT, "현장사진"), os.path.join(_ROOT, "data", "val"))
+NEAR_CM = 30   # 서버가 분석하는 거리 기준 (distance < 30)
+
+
+def load_frames(dirs=DEFAULT_IMAGE_DIRS, size=(640, 480), quality=80, per_label=20):
+    """폴더 이름을 라벨로 → {label: [JPEG bytes, ...]}. 이미지가 하나도 없으면 랜덤 노이즈 프레임"""
+    frames = {}
+    for root_dir in dirs:
+        if not os.path.isdir(root_dir):
+            continue
+        for root, _, files in os.walk(root_dir):
+            label = os.path.basename(root)
+            for name in sorted(files):
+                if not name.lower().endswith((".jpg", ".jpeg", ".png")):
+                    continue
+                if len(frames.get(label, ())) >= per_label:
+                    break
+                img = cv2.imdecode(np.fromfile(os.path.join(root, name), dtype=np.uint8), cv2.IMREAD_COLOR)
+                if img is None:
+                    continue
+                img = cv2.resize(img, size)
+                ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+                if ok:
+                    frames.setdefault(label, []).append(buf.tobytes())
+    if not frames:
+        rng = np.random.default_rng(0)
+        noise = [rng.integers(0, 255, (size[1], size[0], 3), dtype=np.uint8) for _ in range(4)]
+        frames["noise"] = [cv2.imencode(".jpg", n, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes() for n in noise]
+    return frames
+
+
+class ConveyorScenario:
+    """
+    at(t) -> (distance_cm, move_state, window)
+      window: 정지(분석) 구간 번호, 그 외 구간은 None
+    한 주기 = 빈 벨트 gap초(이동, 먼 거리) → approach초 동안 거리 감소 → dwell초 정지(가까운 거리)
+    """
+    def __init__(self, rng, gap=(1.0, 3.0), approach=0.5, dwell=(1.0, 2.0), near_cm=15, far_cm=100):
+        self.rng = rng
+        self.gap = gap
+        self.approach = approach
+        self.dwell = dwell
+        self.near_cm = near_cm
+        self.far_cm = far_cm
+        self._cycles = []    # (start, approach_start, stop_start, end)
+
+    def _cycle(self, i):
+        while len(self._cycles) <= i:
+            start = self._cycles[-1][3] if self._cycles else 0.0
+            approach_start = start + self.rng.uniform(*self.gap)
+            stop_start = approach_start + self.approach
+            self._cycles.append((start, approach_start, stop_start, stop_start + self.rng.uniform(*self.dwell)))
+        return self._cycles[i]
+
+    def at(self, t):
+        i = 0
+        while self._cycle(i)[3] <= t:
+            i += 1
+        start, approach_start, stop_start, end = self._cycle(i)
+        noise = self.rng.gauss(0, 1.5)
+        if t < approach_start:
+            return int(self.far_cm + noise), True, None
+        if t < stop_start:
+            frac = (t - approach_start) / self.approach
+            return int(self.far_cm + (self.near_cm - self.far_cm) * frac + noise), True, None
+        return max(1, int(self.near_cm + noise)), False, i
+
+    def window_start(self, window):
+        return self._cycle(window)[2]
+
+
+class EmulatedDevice:
+    def __init__(self, device_id, frames, broker, port=1883, fps=10.0, seed=0, max_queued=32):
+        self.device_id = device_id
+        # FSRC_server_0529_3은 raspi-cam-NN 명령을 raspi-NN으로 보냄 → 둘 다 구독
+        self.control_ids = list(dict.fromkeys([device_id, device_id.replace("cam-", "")]))
+        self.frames = frames
+        self.labels = sorted(frames)
+        self.fps = fps
+        self.rng = random.Random(seed)
+        self.scenario = ConveyorScenario(self.rng)
+
+        self.sent = 0
+        self.publish_failed = 0
+        self.late_skipped = 0
+        self.commands = {"on": 0, "off": 0}
+        self.latencies_ms = []            # trace로 매칭된 판단 지연
+        self.estimated_ms = []            # trace 없는 명령: 정지 구간 시작 기준
+        self._sent_at = OrderedDict()     # trace id -> 전송 시각
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._t0 = None
+        self._window = None
+
+        from settings import make_mqtt_client
+        self.client = make_mqtt_client(broker, client_id=f"loadgen-{device_id}")
+        self.client.max_queued_messages_set(max_queued)
+        self.client.on_message = self._on_command
+        self.client.connect(broker, port, 60)
+        for control_id in self.control_ids:
+            self.client.subscribe(f"image/command/{control_id}")
+        install_echo(self.client, device_id)
+        self.client.loop_start()
+        self._thread = threading.Thread(target=self._run, name=f"loadgen-{device_id}", daemon=True)
+
+    def start(self, t0):
+        self._t0 = t0
+        self._thread.start()
+
+    def _run(self):
+        interval = 1.0 / self.fps
+        seq = 0
+        k = 0
+        while not self._stop.is_set():
+            due = self._t0 + k * interval
+            delay = due - time.time()
+            if delay > 0:
+                time.sleep(delay)
+            elif -delay > interval:
+                # 카메라처럼 밀린 프레임은 건너뜀
+                missed = int(-delay / interval)
+                self.late_skipped += missed
+                k += missed
+                continue
+            k += 1
+
+            distance, moving, window = self.scenario.at(time.time() - self._t0)
+            if window is not None:
+                label = self.labels[window % len(self.labels)]
+                self._window = window
+            else:
+                label = self.rng.choice(self.labels)
+            jpeg = self.rng.choice(self.frames[label])
+
+            trace = Trace.start(self.device_id, seq)
+            payload = encode_frame(self.device_id, seq, jpeg, distance=distance, current_speed=0,
+                                   move_state=moving, capture_ts=trace.marks["capture"][1])
+            trace.mark("encode")
+            sent_at = trace.mark("publish")
+            info = self.client.publish(f"camera/frame/{self.device_id}", payload,
+                                       properties=trace_properties(trace))
+            with self._lock:
+                if info.rc != 0:
+                    self.publish_failed += 1
+                else:
+                    self.sent += 1
+                    self._sent_at[trace.trace_id] = sent_at
+                    while len(self._sent_at) > 4096:
+                        self._sent_at.popitem(last=False)
+            seq += 1
+
+    def _on_command(self, client, userdata, msg):
+        received = time.time()
+        control_id = msg.topic.rsplit("/", 1)[-1]
+        ack_command(client, control_id, msg, received)
+        command = msg.payload.decode(errors="replace")
+        props = getattr(msg, "properties", None)
+        trace_id = dict(getattr(props, "UserProperty", None) or []).get("trace")
+        with self._lock:
+            self.commands[command] = self.commands.get(command, 0) + 1
+            sent_at = self._sent_at.get(trace_id)
+            if sent_at is not None:
+                self.latencies_ms.append((received - sent_at) * 1000)
+            elif self._window is not None:
+                self.estimated_ms.append((received - self._t0 - self.scenario.window_start(self._window)) * 1000)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=2)
+        self.client.loop_stop()
+        self.client.disconnect()
+
+    def stats(self, elapsed):
+        with self._lock:
+            attempted = self.sent + self.publish_failed + self.late_skipped
+            lat = np.asarray(self.latencies_ms or self.estimated_ms or [np.nan])
+            return {
+                "device": self.device_id,
+                "fps": round(self.sent / elapsed, 2),
+                "drop_pct": round(100.0 * (self.publish_failed + self.late_skipped) / max(1, attempted), 2),
+                "publish_failed": self.publish_failed,
+                "late_skipped": self.late_skipped,
+                "commands": dict(self.commands),
+                "latency_source": "trace" if self.latencies_ms else ("window" if self.estimated_ms else "-"),
+                "latency_n": int(np.isfinite(lat).sum()),
+                "latency_ms_p50": round(float(np.nanpercentile(lat, 50)), 1) if np.isfinite(lat).any() else None,
+                "latency_ms_p95": round(float(np.nanpercentile(lat, 95)), 1) if np.isfinite(lat).any() else None,
+                "latency_ms_max": round(float(np.nanmax(lat)), 1) if np.isfinite(lat).any() else None,
+            }
+
+
+def run_load(n, frames, broker, port=1883, seconds=30.0, fps=10.0, prefix="raspi-cam", seed=0):
+    """디바이스 n대를 seconds초 동안 돌리고 디바이스별 통계 리스트 반환"""
+    devices = [EmulatedDevice(f"{prefix}-{i:02d}", frames, broker, port, fps, seed=seed + i)
+               for i in range(1, n + 1)]
+    t0 = time.time() + 0.5
+    for d in devices:
+        d.start(t0)
+    time.sleep(seconds + 0.5)
+    for d in devices:
+        d.stop()
+    time.sleep(0.2)
+    return [d.stats(seconds) for d in devices]
+
+
+def _summary(n, rows):
+    lat_p95 = [r["latency_ms_p95"] for r in rows if r["latency_ms_p95"] is not None]
+    lat_p50 = [r["latency_ms_p50"] for r in rows if r["latency_ms_p50"] is not None]
+    return {
+        "devices": n,
+        "total_fps": round(sum(r["fps"] for r in rows), 1),
+        "drop_pct": round(float(np.mean([r["drop_pct"] for r in rows])), 2),
+        "decisions": sum(sum(r["commands"].values()) for r in rows),
+        "p50_ms": round(float(np.median(lat_p50)), 1) if lat_p50 else None,
+        "worst_p95_ms": round(max(lat_p95), 1) if lat_p95 else None,
+    }
+
+
+def main():
+    from settings import mqtt_broker, mqtt_port
+    parser = argparse.ArgumentParser(description="Emulated Raspberry Pi camera load generator")
+    parser.add_argument("--broker", default=mqtt_broker("127.0.0.1"))
+    parser.add_argument("--port", type=int, default=mqtt_port())
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 2, 4, 8], help="디바이스 수 (여러 개면 차례로)")
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--fps", type=float, default=10.0)
+    parser.add_argument("--quality", type=int, default=80)
+    parser.add_argument("--images", nargs="+", default=list(DEFAULT_IMAGE_DIRS))
+    parser.add_argument("--prefix", default="raspi-cam")
+    parser.add_argument("--verbose", action="store_true", help="디바이스별 통계도 출력")
+    args = parser.parse_args()
+
+    frames = load_frames(args.images, quality=args.quality)
+    print(f"🖼 {sum(len(v) for v in frames.values())}장 ({len(frames)}개 라벨), JPEG 품질 {args.quality}")
+    summaries = []
+    for n in args.devices:
+        print(f"▶ {n}대 × {args.fps} fps, {args.seconds}s")
+        rows = run_load(n, frames, args.broker, args.port, args.seconds, args.fps, args.prefix)
+        if args.verbose:
+            for row in rows:
+                print(f"   {row}")
+        summaries.append(_summary(n, rows))
+        print(f"   {summaries[-1]}")
+        time.sleep(1.0)   # 서버 큐가 비워질 시간
+
+    print(f"\n{'devices':>8} {'fps':>8} {'drop%':>7} {'decisions':>10} {'p50 ms':>8} {'worst p95':>10}")
+    for s in summaries:
+        print(f"{s['devices']:>8} {s['total_fps']:>8} {s['drop_pct']:>7} {s['decisions']:>10} "
+              f"{s['p50_ms'] if s['p50_ms'] is not None else '-':>8} "
+              f"{s['worst_p95_ms'] if s['worst_p95_ms'] is not None else '-':>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,624 @@
+# local_broker.py
+# 테스트/벤치마크용 MQTT 브로커 대용 (실제 브로커/파이 없이 수신부를 돌리기 위함)
+# - LocalBroker : 프로세스 안의 pub/sub. MQTT 토픽 와일드카드(+, #), retain 지원, QoS는 0으로 전달
+# - LocalClient : paho Client와 같은 사용법 (on_message, message_callback_add, subscribe, publish,
+#                 loop_start/loop_stop/loop_forever, connect/disconnect). 콜백은 클라이언트별 스레드에서 호출
+#                 → paho처럼 publish한 쪽 스레드를 막지 않음. 받는 쪽이 밀리면 max_queue를 넘는 오래된 메시지를 버림
+# - BrokerServer: 같은 LocalBroker를 localhost TCP로 공개하는 최소 MQTT 3.1.1/5 서버
+#                 → 다른 프로세스(load_generator, 파이 스크립트, mqtt_replay)의 paho 클라이언트도 접속 가능
+#                 CONNECT/PUBLISH(QoS 0~2 수신)/SUBSCRIBE/UNSUBSCRIBE/PING/DISCONNECT만 처리, 인증/세션 유지 없음
+#
+# 보통은 settings.make_mqtt_client()가 MQTT_BROKER=local일 때 LocalClient를 만들어 줌
+#   python local_broker.py --port 1883        # 단독 브로커로 실행
+import argparse
+import itertools
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+DEFAULT_MAX_QUEUE = 1000
+
+
+def topic_matches(topic_filter, topic):
+    """MQTT 토픽 필터 매칭. '$'로 시작하는 토픽은 맨 앞 와일드카드에 매칭되지 않음"""
+    f = topic_filter.split("/")
+    t = topic.split("/")
+    if topic.startswith("$") and f[0] in ("+", "#"):
+        return False
+    for i, part in enumerate(f):
+        if part == "#":
+            return True
+        if i >= len(t) or (part != "+" and part != t[i]):
+            return False
+    return len(f) == len(t)
+
+
+def _to_bytes(payload):
+    """paho와 같은 payload 변환"""
+    if payload is None:
+        return b""
+    if isinstance(payload, str):
+        return payload.encode("utf-8")
+    if isinstance(payload, (int, float)):
+        return str(payload).encode("ascii")
+    return bytes(payload)
+
+
+class Message:
+    """paho MQTTMessage와 같은 속성"""
+    __slots__ = ("topic", "payload", "qos", "retain", "properties", "mid", "timestamp")
+
+    def __init__(self, topic, payload, qos=0, retain=False, properties=None, mid=0):
+        self.topic = topic
+        self.payload = payload
+        self.qos = qos
+        self.retain = retain
+        self.properties = properties
+        self.mid = mid
+        self.timestamp = time.monotonic()
+
+
+class MessageInfo:
+    __slots__ = ("rc", "mid")
+
+    def __init__(self, rc, mid):
+        self.rc = rc
+        self.mid = mid
+
+    def is_published(self):
+        return self.rc == 0
+
+    def wait_for_publish(self, timeout=None):
+        return None
+
+
+# ------------------ 브로커 ------------------
+class LocalBroker:
+    """session: deliver(topic, payload, retain, properties)를 가진 객체 (LocalClient, TCP 연결)"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subs = {}        # session -> set(topic_filter)
+        self._retained = {}    # topic -> (payload, properties)
+        self._routes = {}      # topic -> [session] (구독이 바뀌면 비움)
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, session, topic_filter):
+        with self._lock:
+            self._subs.setdefault(session, set()).add(topic_filter)
+            self._routes.clear()
+            retained = [(t, p, props) for t, (p, props) in self._retained.items() if topic_matches(topic_filter, t)]
+        for topic, payload, props in retained:
+            session.deliver(topic, payload, True, props)
+
+    def unsubscribe(self, session, topic_filter):
+        with self._lock:
+            self._subs.get(session, set()).discard(topic_filter)
+            self._routes.clear()
+
+    def detach(self, session):
+        with self._lock:
+            self._subs.pop(session, None)
+            self._routes.clear()
+
+    def publish(self, topic, payload, retain=False, properties=None):
+        if not topic or "+" in topic or "#" in topic:
+            raise ValueError(f"invalid publish topic: {topic!r}")
+        with self._lock:
+            self.published += 1
+            if retain:
+                if payload:
+                    self._retained[topic] = (payload, properties)
+                else:
+                    self._retained.pop(topic, None)
+            targets = self._routes.get(topic)
+            if targets is None:
+                targets = self._routes[topic] = [
+                    s for s, filters in self._subs.items() if any(topic_matches(f, topic) for f in filters)]
+            self.delivered += len(targets)
+        for session in targets:
+            session.deliver(topic, payload, False, properties)
+        return len(targets)
+
+    def stats(self):
+        with self._lock:
+            return {"sessions": len(self._subs), "published": self.published, "delivered": self.delivered,
+                    "retained": len(self._retained)}
+
+
+_brokers = {}
+_brokers_lock = threading.Lock()
+
+
+def get_broker(name="default"):
+    """이름별 프로세스 공용 브로커"""
+    with _brokers_lock:
+        broker = _brokers.get(name)
+        if broker is None:
+            broker = _brokers[name] = LocalBroker()
+        return broker
+
+
+# ------------------ 클라이언트 ------------------
+class LocalClient:
+    """paho.mqtt.client.Client 대용. 생성자 인자(CallbackAPIVersion, protocol 등)는 받아서 무시"""
+    _mids = itertools.count(1)
+
+    def __init__(self, *args, client_id="", userdata=None, broker=None, max_queue=DEFAULT_MAX_QUEUE, **kwargs):
+        self._client_id = client_id
+        self._userdata = userdata
+        self._broker = broker
+        self.max_queue = max_queue
+        self.on_message = None
+        self.on_connect = None
+        self.on_disconnect = None
+        self.on_subscribe = None
+        self.on_publish = None
+        self._callbacks = []           # (topic_filter, callback)
+        self._cond = threading.Condition()
+        self._queue = deque()          # Message 또는 ("connect"/"disconnect", rc)
+        self._connected = False
+        self._thread = None
+        self._stopping = False
+        self.dropped = 0
+
+    # ---------- 연결 ----------
+    def connect(self, host=None, port=1883, keepalive=60, *args, **kwargs):
+        """host/port는 무시하고 LocalBroker에 연결"""
+        if self._broker is None:
+            self._broker = get_broker()
+        self._connected = True
+        self._enqueue(("connect", 0))
+        return 0
+
+    connect_async = connect
+
+    def reconnect(self):
+        return 0
+
+    def disconnect(self, *args, **kwargs):
+        if self._broker is not None:
+            self._broker.detach(self)
+        self._connected = False
+        self._enqueue(("disconnect", 0))
+        return 0
+
+    def is_connected(self):
+        return self._connected
+
+    # ---------- pub/sub ----------
+    def subscribe(self, topic, qos=0, options=None, properties=None):
+        if isinstance(topic, str):
+            filters = [topic]
+        elif isinstance(topic, tuple):
+            filters = [topic[0]]
+        else:
+            filters = [t[0] if isinstance(t, tuple) else t for t in topic]
+        if not self._connected:
+            return 4, None   # MQTT_ERR_NO_CONN
+        for f in filters:
+            self._broker.subscribe(self, f)
+        return 0, next(self._mids)
+
+    def unsubscribe(self, topic, properties=None):
+        for f in [topic] if isinstance(topic, str) else topic:
+            if self._broker is not None:
+                self._broker.unsubscribe(self, f)
+        return 0, next(self._mids)
+
+    def publish(self, topic, payload=None, qos=0, retain=False, properties=None):
+        mid = next(self._mids)
+        if not self._connected:
+            return MessageInfo(4, mid)
+        self._broker.publish(topic, _to_bytes(payload), retain, properties)
+        if self.on_publish is not None:
+            self._enqueue(("publish", mid))
+        return MessageInfo(0, mid)
+
+    def message_callback_add(self, sub, callback):
+        self._callbacks = [(f, cb) for f, cb in self._callbacks if f != sub] + [(sub, callback)]
+
+    def message_callback_remove(self, sub):
+        self._callbacks = [(f, cb) for f, cb in self._callbacks if f != sub]
+
+    def user_data_set(self, userdata):
+        self._userdata = userdata
+
+    # paho 설정 메서드들: 로컬에서는 의미 없음
+    def max_queued_messages_set(self, queue_size):
+        return self
+
+    def username_pw_set(self, *args, **kwargs):
+        pass
+
+    def tls_set(self, *args, **kwargs):
+        pass
+
+    def will_set(self, *args, **kwargs):
+        pass
+
+    def reconnect_delay_set(self, *args, **kwargs):
+        pass
+
+    def enable_logger(self, *args, **kwargs):
+        pass
+
+    # ---------- 수신 ----------
+    def deliver(self, topic, payload, retain, properties):
+        self._enqueue(Message(topic, payload, 0, retain, properties))
+
+    def _enqueue(self, item):
+        with self._cond:
+            if isinstance(item, Message) and len(self._queue) >= self.max_queue:
+                self._queue.popleft()   # 느린 구독자: QoS 0처럼 오래된 것부터 버림
+                self.dropped += 1
+            self._queue.append(item)
+            self._cond.notify()
+
+    def _dispatch(self, item):
+        try:
+            if isinstance(item, Message):
+                matched = [cb for f, cb in self._callbacks if topic_matches(f, item.topic)]
+                if matched:
+                    for cb in matched:
+                        cb(self, self._userdata, item)
+                elif self.on_message is not None:
+                    self.on_message(self, self._userdata, item)
+            elif item[0] == "connect" and self.on_connect is not None:
+                self.on_connect(self, self._userdata, {"session present": 0}, item[1], None)
+            elif item[0] == "disconnect" and self.on_disconnect is not None:
+                self.on_disconnect(self, self._userdata, item[1])
+            elif item[0] == "publish" and self.on_publish is not None:
+                self.on_publish(self, self._userdata, item[1])
+        except Exception as e:
+            print(f"[❌ local mqtt callback] {self._client_id}: {e!r}")
+
+    def loop(self, timeout=1.0, *args, **kwargs):
+        """쌓인 메시지를 호출 스레드에서 처리 (loop_start 없이 테스트에서 직접 돌릴 때)"""
+        with self._cond:
+            if not self._queue:
+                self._cond.wait(timeout)
+            items = list(self._queue)
+            self._queue.clear()
+        for item in items:
+            self._dispatch(item)
+        return 0
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._queue or self._stopping)
+                if not self._queue:
+                    return
+                item = self._queue.popleft()
+            self._dispatch(item)
+
+    def loop_start(self):
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name=f"local-mqtt-{self._client_id}", daemon=True)
+            self._thread.start()
+        return 0
+
+    def loop_stop(self, force=False):
+        if self._thread is not None:
+            with self._cond:
+                self._stopping = True
+                self._cond.notify_all()
+            self._thread.join(timeout=2)
+            self._thread = None
+        return 0
+
+    def loop_forever(self, *args, **kwargs):
+        self._stopping = False
+        self._run()
+        return 0
+
+
+# ------------------ TCP (최소 MQTT 서버) ------------------
+PUBLISH_PROPS = {  # 속성 id -> 값 형식 (PUBLISH에 올 수 있는 것)
+    0x01: "byte", 0x02: "int4", 0x03: "str", 0x08: "str", 0x09: "bin", 0x0B: "varint", 0x23: "int2", 0x26: "pair",
+}
+_NOT_FORWARDED = (0x0B, 0x23)   # subscription identifier / topic alias는 연결마다 다름
+
+
+def _varint(n):
+    out = bytearray()
+    while True:
+        b = n % 128
+        n //= 128
+        out.append(b | 0x80 if n else b)
+        if not n:
+            return bytes(out)
+
+
+def _read_varint(buf, i):
+    mult, value = 1, 0
+    while True:
+        b = buf[i]
+        i += 1
+        value += (b & 0x7F) * mult
+        if not b & 0x80:
+            return value, i
+        mult *= 128
+
+
+def _str(s):
+    data = s.encode("utf-8") if isinstance(s, str) else s
+    return struct.pack("!H", len(data)) + data
+
+
+def _read_str(buf, i):
+    n = struct.unpack_from("!H", buf, i)[0]
+    return bytes(buf[i + 2:i + 2 + n]), i + 2 + n
+
+
+class WireProperties:
+    """TCP로 받은 PUBLISH 속성. UserProperty는 paho Properties처럼 [(key, value), ...]"""
+    def __init__(self, items):
+        self.items = items    # [(id, 원본 값 bytes)]
+        self.UserProperty = []
+        for pid, raw in items:
+            if pid == 0x26:
+                k, j = _read_str(raw, 0)
+                v, _ = _read_str(raw, j)
+                self.UserProperty.append((k.decode("utf-8"), v.decode("utf-8")))
+
+    @classmethod
+    def parse(cls, buf):
+        items, i = [], 0
+        while i < len(buf):
+            pid, i = _read_varint(buf, i)
+            kind = PUBLISH_PROPS.get(pid)
+            start = i
+            if kind == "byte":
+                i += 1
+            elif kind == "int2":
+                i += 2
+            elif kind == "int4":
+                i += 4
+            elif kind in ("str", "bin"):
+                _, i = _read_str(buf, i)
+            elif kind == "pair":
+                _, i = _read_str(buf, i)
+                _, i = _read_str(buf, i)
+            elif kind == "varint":
+                _, i = _read_varint(buf, i)
+            else:
+                raise ValueError(f"unsupported publish property 0x{pid:02x}")
+            items.append((pid, bytes(buf[start:i])))
+        return cls(items)
+
+
+def _pack_properties(properties):
+    """v5 구독자에게 보낼 속성 bytes (길이 varint 포함)"""
+    if properties is None:
+        return b"\x00"
+    if isinstance(properties, WireProperties):
+        body = b"".join(_varint(pid) + raw for pid, raw in properties.items if pid not in _NOT_FORWARDED)
+    else:
+        # paho Properties 또는 UserProperty만 가진 객체
+        body = b"".join(b"\x26" + _str(k) + _str(v) for k, v in getattr(properties, "UserProperty", None) or [])
+    return _varint(len(body)) + body
+
+
+class _TcpSession:
+    def __init__(self, server, sock):
+        self.server = server
+        self.sock = sock
+        self.version = 4
+        self.client_id = ""
+        self.aliases = {}
+        self._out = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.dropped = 0
+        threading.Thread(target=self._read_loop, daemon=True).start()
+        threading.Thread(target=self._write_loop, daemon=True).start()
+
+    # ---------- 송신 ----------
+    def _send(self, packet_type, body, flags=0):
+        with self._cond:
+            if self._closed:
+                return
+            self._out.append(bytes([packet_type << 4 | flags]) + _varint(len(body)) + body)
+            self._cond.notify()
+
+    def deliver(self, topic, payload, retain, properties):
+        body = _str(topic)
+        if self.version == 5:
+            body += _pack_properties(properties)
+        with self._cond:
+            if len(self._out) >= self.server.max_queue:
+                self._out.popleft()
+                self.dropped += 1
+        self._send(3, body + payload, flags=1 if retain else 0)
+
+    def _write_loop(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._out or self._closed)
+                if self._closed:
+                    return
+                chunks = list(self._out)
+                self._out.clear()
+            try:
+                self.sock.sendall(b"".join(chunks))
+            except OSError:
+                self.close()
+                return
+
+    # ---------- 수신 ----------
+    def _recv_exact(self, n):
+        buf = bytearray()
+        while len(buf) < n:
+            chunk = self.sock.recv(n - len(buf))
+            if not chunk:
+                raise ConnectionError("closed")
+            buf += chunk
+        return bytes(buf)
+
+    def _read_packet(self):
+        first = self._recv_exact(1)[0]
+        mult, length = 1, 0
+        while True:
+            b = self._recv_exact(1)[0]
+            length += (b & 0x7F) * mult
+            if not b & 0x80:
+                break
+            mult *= 128
+        return first >> 4, first & 0x0F, self._recv_exact(length) if length else b""
+
+    def _read_loop(self):
+        try:
+            while True:
+                ptype, flags, body = self._read_packet()
+                if ptype == 1:
+                    self._on_connect(body)
+                elif ptype == 3:
+                    self._on_publish(flags, body)
+                elif ptype == 6:       # PUBREL → PUBCOMP
+                    self._send(7, body[:2] + (b"\x00" if self.version == 5 else b""))
+                elif ptype == 8:
+                    self._on_subscribe(body)
+                elif ptype == 10:
+                    self._on_unsubscribe(body)
+                elif ptype == 12:
+                    self._send(13, b"")
+                elif ptype == 14:
+                    break
+        except (ConnectionError, OSError, ValueError, IndexError, struct.error):
+            pass
+        self.close()
+
+    def _on_connect(self, body):
+        _, i = _read_str(body, 0)
+        self.version = body[i]
+        i += 4                                   # level, flags, keepalive
+        if self.version == 5:
+            n, i = _read_varint(body, i)
+            i += n
+        client_id, _ = _read_str(body, i)
+        self.client_id = client_id.decode("utf-8", "replace")
+        self._send(2, b"\x00\x00" + (b"\x00" if self.version == 5 else b""))
+
+    def _on_publish(self, flags, body):
+        qos = (flags >> 1) & 0x03
+        topic, i = _read_str(body, 0)
+        topic = topic.decode("utf-8")
+        pid = None
+        if qos:
+            pid = body[i:i + 2]
+            i += 2
+        properties = None
+        if self.version == 5:
+            n, i = _read_varint(body, i)
+            properties = WireProperties.parse(body[i:i + n])
+            i += n
+            alias = next((struct.unpack("!H", raw)[0] for p, raw in properties.items if p == 0x23), None)
+            if alias is not None:
+                if topic:
+                    self.aliases[alias] = topic
+                else:
+                    topic = self.aliases[alias]
+        self.server.broker.publish(topic, body[i:], bool(flags & 0x01), properties)
+        if qos == 1:
+            self._send(4, pid)
+        elif qos == 2:
+            self._send(5, pid)
+
+    def _on_subscribe(self, body):
+        pid, i = body[:2], 2
+        if self.version == 5:
+            n, i = _read_varint(body, i)
+            i += n
+        codes = bytearray()
+        while i < len(body):
+            topic_filter, i = _read_str(body, i)
+            i += 1                               # subscription options
+            self.server.broker.subscribe(self, topic_filter.decode("utf-8"))
+            codes.append(0)                      # QoS 0 granted
+        self._send(9, pid + (b"\x00" if self.version == 5 else b"") + bytes(codes))
+
+    def _on_unsubscribe(self, body):
+        pid, i = body[:2], 2
+        if self.version == 5:
+            n, i = _read_varint(body, i)
+            i += n
+        count = 0
+        while i < len(body):
+            topic_filter, i = _read_str(body, i)
+            self.server.broker.unsubscribe(self, topic_filter.decode("utf-8"))
+            count += 1
+        self._send(11, pid + (b"\x00" + b"\x00" * count if self.version == 5 else b""))
+
+    def close(self):
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self.server.broker.detach(self)
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+
+
+class BrokerServer:
+    """LocalBroker를 host:port로 공개. port=0이면 빈 포트 (self.port로 확인)"""
+    def __init__(self, broker=None, host="127.0.0.1", port=1883, max_queue=DEFAULT_MAX_QUEUE):
+        self.broker = broker or get_broker()
+        self.max_queue = max_queue
+        self._sock = socket.create_server((host, port), reuse_port=False)
+        self.host, self.port = self._sock.getsockname()[:2]
+        self._closed = False
+        self._thread = threading.Thread(target=self._accept_loop, name="local-mqtt-server", daemon=True)
+        self._thread.start()
+
+    def _accept_loop(self):
+        while not self._closed:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            _TcpSession(self, conn)
+
+    def close(self):
+        self._closed = True
+        self._sock.close()
+
+
+_servers = {}
+_servers_lock = threading.Lock()
+
+
+def serve(port=1883, host="127.0.0.1", broker=None):
+    """(host, port)마다 한 번만 시작하는 BrokerServer"""
+    with _servers_lock:
+        server = _servers.get((host, port))
+        if server is None:
+            server = _servers[(host, port)] = BrokerServer(broker, host, port)
+        return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local MQTT broker stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1883)
+    args = parser.parse_args()
+    server = BrokerServer(host=args.host, port=args.port)
+    print(f"📡 local broker: {server.host}:{server.port}")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"   {server.broker.stats()}")
+    except KeyboardInterrupt:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# model_registry.py
+# 체크포인트 경로 + 내용 해시 기준으로 모델을 한 번만 로드해서 여러 슬롯이 공유하는 레지스트리
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+
+def file_sha1(path, chunk_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def module_nbytes(model):
+    """nn.Module 파라미터 + 버퍼 크기(bytes). nbytes 속성이 있으면 그 값, 둘 다 없으면 0"""
+    if hasattr(model, "nbytes"):
+        return model.nbytes
+    if not hasattr(model, "parameters"):
+        return 0
+    total = sum(p.numel() * p.element_size() for p in model.parameters())
+    total += sum(b.numel() * b.element_size() for b in model.buffers())
+    return total
+
+
+class ModelRegistry:
+    """
+    loader(path) -> (model, classes)
+
+    - 같은 내용(sha1)의 체크포인트는 경로가 달라도 한 번만 로드해서 공유
+    - get()이 처음 불릴 때 로드 (lazy)
+    - memory_budget_bytes를 넘으면 가장 오래 안 쓴 모델부터 해제 (LRU)
+    """
+    def __init__(self, loader, memory_budget_bytes=None, size_fn=module_nbytes):
+        self.loader = loader
+        self.memory_budget_bytes = memory_budget_bytes
+        self.size_fn = size_fn
+
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()  # sha1 -> (model, classes, nbytes)
+        self._path_hashes = {}         # realpath -> ((mtime_ns, size), sha1)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key_for(self, path):
+        real = os.path.realpath(path)
+        st = os.stat(real)
+        sig = (st.st_mtime_ns, st.st_size)
+        cached = self._path_hashes.get(real)
+        if cached is not None and cached[0] == sig:
+            return cached[1]
+        digest = file_sha1(real)
+        self._path_hashes[real] = (sig, digest)
+        return digest
+
+    def get(self, path):
+        with self._lock:
+            key = self.key_for(path)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], entry[1]
+
+            self.misses += 1
+            model, classes = self.loader(path)
+            nbytes = self.size_fn(model)
+            self._entries[key] = (model, classes, nbytes)
+            print(f"[REGISTRY] loaded {path} ({nbytes / 1e6:.1f} MB, key={key[:8]})")
+            self._evict(keep=key)
+            return model, classes
+
+    def preload(self, paths):
+        """서로 다른 체크포인트만 골라서 미리 로드"""
+        for path in dict.fromkeys(paths):
+            self.get(path)
+
+    def total_bytes(self):
+        with self._lock:
+            return sum(e[2] for e in self._entries.values())
+
+    def _evict(self, keep):
+        if self.memory_budget_bytes is None:
+            return
+        while self.total_bytes() > self.memory_budget_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                break
+            _, _, nbytes = self._entries.pop(key)
+            self.evictions += 1
+            print(f"[REGISTRY] evicted key={key[:8]} ({nbytes / 1e6:.1f} MB)")
+
+    def stats(self):
+        with self._lock:
+            return {
+                "loaded": len(self._entries),
+                "total_mb": round(self.total_bytes() / 1e6, 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,93 @@
+# motion_gate.py
+# 컨베이어 화면이 정지해 있을 때 YOLO를 건너뛰기 위한 motion/occupancy gate
+# (data/auto_capture.py의 MOG2 + 모폴로지 방식을 축소 프레임에서 수행)
+#  - 전경(움직임) 비율이 min_fg_ratio 이상이면 통과
+#  - 마지막으로 통과시킨 프레임 대비 전경 비율이 change_ratio 이상 변하면 통과 (물체가 빠져나감 등)
+#  - 그 외에는 건너뜀 → 호출한 쪽에서 직전 검출 결과를 재사용
+#  - max_skip 프레임 연속으로 건너뛰면 한 번은 강제로 통과 (결과가 너무 오래되지 않게)
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    def __init__(self, width=160, min_fg_ratio=0.01, change_ratio=0.005, max_skip=30,
+                 history=300, var_threshold=50, warmup=10, name="gate", report_every=0):
+        self.width = width
+        self.min_fg_ratio = min_fg_ratio
+        self.change_ratio = change_ratio
+        self.max_skip = max_skip
+        self.warmup = warmup
+        self.name = name
+        self.report_every = report_every
+        self._bg = cv2.createBackgroundSubtractorMOG2(history=history, varThreshold=var_threshold,
+                                                      detectShadows=False)
+        self._kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+        self._ref_ratio = None
+        self._skipped_in_row = 0
+        self.last_fg_ratio = 0.0
+
+        self.frames = 0
+        self.passed = 0
+        self._gate_ms = deque(maxlen=1000)
+
+    def foreground_ratio(self, frame):
+        h, w = frame.shape[:2]
+        if w > self.width:
+            small = cv2.resize(frame, (self.width, max(1, int(h * self.width / w))),
+                               interpolation=cv2.INTER_AREA)
+        else:
+            small = frame
+        mask = self._bg.apply(small)
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, self._kernel)
+        return cv2.countNonZero(mask) / mask.size
+
+    def check(self, frame):
+        """True면 검출기를 돌려야 하는 프레임, False면 직전 결과 재사용"""
+        start = time.perf_counter()
+        ratio = self.foreground_ratio(frame)
+        self.frames += 1
+
+        run = (
+            self.frames <= self.warmup
+            or self._ref_ratio is None
+            or ratio >= self.min_fg_ratio
+            or abs(ratio - self._ref_ratio) >= self.change_ratio
+            or self._skipped_in_row >= self.max_skip
+        )
+        if run:
+            self.passed += 1
+            self._ref_ratio = ratio
+            self._skipped_in_row = 0
+        else:
+            self._skipped_in_row += 1
+        self.last_fg_ratio = ratio
+        self._gate_ms.append((time.perf_counter() - start) * 1000)
+
+        if self.report_every and self.frames % self.report_every == 0:
+            print(self.summary())
+        return run
+
+    __call__ = check
+
+    @property
+    def skipped(self):
+        return self.frames - self.passed
+
+    def stats(self):
+        times = np.asarray(self._gate_ms) if self._gate_ms else np.zeros(1)
+        return {
+            "frames": self.frames,
+            "inferences_run": self.passed,
+            "inferences_saved": self.skipped,
+            "saved_ratio": round(self.skipped / self.frames, 3) if self.frames else 0.0,
+            "gate_ms_avg": round(float(times.mean()), 3),
+            "gate_ms_p95": round(float(np.percentile(times, 95)), 3),
+        }
+
+    def summary(self):
+        s = self.stats()
+        return (f"[GATE] {self.name}: {s['inferences_saved']}/{s['frames']} inferences saved "
+                f"({s['saved_ratio']:.0%}), gate overhead avg {s['gate_ms_avg']:.2f} ms / p95 {s['gate_ms_p95']:.2f} ms")
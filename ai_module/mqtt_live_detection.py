@@ -2,13 +2,15 @@
 import cv2
 import numpy as np
 import queue
-import paho.mqtt.client as mqtt
+from settings import make_mqtt_client, mqtt_broker, mqtt_port
 from ultralytics import YOLO
+from detections import Detections
 from pathlib import Path
 from datetime import datetime
 
 # -------- 설정 --------
-MQTT_BROKER = "172.30.1.21"
+MQTT_BROKER = mqtt_broker("172.30.1.21")
+MQTT_PORT = mqtt_port()
 TOPIC_FRAME = "camera/frame"
 TOPIC_COMMAND = "camera/command/raspi-01"
 TOPIC_RESULT = "camera/result/raspi-01"
@@ -41,9 +43,9 @@ def on_message(client, userdata, msg):
         if command == "capture":
             capture_flag = True
 
-client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, protocol=mqtt.MQTTv5)
+client = make_mqtt_client(MQTT_BROKER)
 client.on_message = on_message
-client.connect(MQTT_BROKER, 1883, 60)
+client.connect(MQTT_BROKER, MQTT_PORT, 60)
 client.subscribe(TOPIC_FRAME)
 client.subscribe(TOPIC_COMMAND)
 client.loop_start()
@@ -51,20 +53,9 @@ client.loop_start()
 # -------- YOLO 분석 --------
 def detect(frame_bgr):
     results = model.predict(source=frame_bgr, conf=0.5, verbose=False)
-    detections = []
-    if len(results) > 0:
-        for box in results[0].boxes:
-            xyxy = box.xyxy[0].cpu().numpy()
-            cls_idx = int(box.cls[0].item())
-            conf = float(box.conf[0].item())
-            x1, y1, x2, y2 = xyxy
-            category = CLASS_NAMES[cls_idx]
-            detections.append({
-                "category": category,
-                "score": conf,
-                "box": (x1, y1, x2, y2)
-            })
-    return detections
+    if len(results) == 0:
+        return Detections()
+    return Detections.from_ultralytics(results[0], CLASS_NAMES)
 
 # -------- 메인 루프 --------
 try:
@@ -89,8 +80,8 @@ try:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
                 if detections:
-                    match = any(d["category"] == EXPECTED_CATEGORY for d in detections)
-                    category = detections[0]["category"]
+                    match = bool(detections.filter(labels=(EXPECTED_CATEGORY,)))
+                    category = detections.labels[0]
                     save_path = SAVE_DIR / category
                     save_path.mkdir(exist_ok=True)
                     filename = f"{category}_{timestamp}.jpg"
@@ -0,0 +1,354 @@
+# mqtt_replay.py
+# camera/frame/# 트래픽을 파일로 녹화하고, 같은 타이밍으로 다시 재생하는 도구 (실제 파이 없이 수신부 부하 테스트)
+#
+# 로그 파일 (append-only):
+#   FILE_MAGIC + 레코드 반복
+#   레코드 = struct "<dHHI" (도착 시각, topic 길이, user property JSON 길이, payload 길이) + topic + props + payload
+# 인덱스 파일 (<로그>.idx): 레코드마다 struct "<Qd" (로그 안 offset, 도착 시각)
+#   → 개수/구간 조회와 임의 접근이 로그 전체를 읽지 않고 가능. 없거나 깨졌으면 로그를 훑어서 다시 만듦
+#
+# 재생:
+#   speed=1.0 원래 속도, 4.0 이면 4배, 0이면 최대 속도 (대기 없음)
+#   publish(client): 브로커로 다시 publish / inject(on_message): 수신부 콜백을 직접 호출 (브로커 없이)
+#
+# 사용 예:
+#   python mqtt_replay.py record --broker 172.30.1.88 --out traffic.log --seconds 60
+#   python mqtt_replay.py info traffic.log
+#   python mqtt_replay.py replay traffic.log --broker 127.0.0.1 --speed 0 --loop 3
+import argparse
+import bisect
+import json
+import os
+import struct
+import threading
+import time
+
+FILE_MAGIC = b"FSRCLOG1"
+_RECORD = struct.Struct("<dHHI")
+_INDEX = struct.Struct("<Qd")
+
+
+class Record:
+    __slots__ = ("ts", "topic", "payload", "user_properties")
+
+    def __init__(self, ts, topic, payload, user_properties=()):
+        self.ts = ts
+        self.topic = topic
+        self.payload = payload
+        self.user_properties = list(user_properties)
+
+
+class ReplayMessage:
+    """paho MQTTMessage 대신 on_message에 넘기는 객체 (수신부가 쓰는 속성만)"""
+    __slots__ = ("topic", "payload", "properties", "qos", "retain", "mid", "timestamp")
+
+    def __init__(self, topic, payload, properties=None):
+        self.topic = topic
+        self.payload = payload
+        self.properties = properties
+        self.qos = 0
+        self.retain = False
+        self.mid = 0
+        self.timestamp = time.monotonic()
+
+
+def _user_properties(msg):
+    props = getattr(msg, "properties", None)
+    return list(getattr(props, "UserProperty", None) or [])
+
+
+def _publish_properties(pairs):
+    if not pairs:
+        return None
+    from paho.mqtt.packettypes import PacketTypes
+    from paho.mqtt.properties import Properties
+    props = Properties(PacketTypes.PUBLISH)
+    props.UserProperty = [tuple(p) for p in pairs]
+    return props
+
+
+# ------------------ 녹화 ------------------
+class TrafficRecorder:
+    """
+    record(msg): 수신 콜백에서 호출 (msg.topic / msg.payload / MQTT v5 user property 저장)
+    attach(client, topic): 기존 on_message와 별개로 해당 토픽을 녹화
+    """
+    def __init__(self, path, flush_every=50):
+        self.path = str(path)
+        self.flush_every = flush_every
+        new = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        if not new:
+            # 기존 로그에 이어 쓰기: 검증 + 인덱스 최신화, 비정상 종료로 잘린 마지막 레코드는 잘라냄
+            log = TrafficLog(self.path)
+            valid_end = log.valid_end
+            log.close()
+            os.truncate(self.path, valid_end)
+        self._log = open(self.path, "ab")
+        self._idx = open(self.path + ".idx", "ab")
+        if new:
+            self._log.write(FILE_MAGIC)
+        self._lock = threading.Lock()
+        self._unflushed = 0
+        self.records = 0
+        self.bytes = 0
+
+    def record(self, msg, ts=None):
+        ts = time.time() if ts is None else ts
+        topic = msg.topic.encode("utf-8")
+        pairs = _user_properties(msg)
+        props = json.dumps(pairs).encode("utf-8") if pairs else b""
+        payload = bytes(msg.payload)
+        with self._lock:
+            offset = self._log.tell()
+            self._log.write(_RECORD.pack(ts, len(topic), len(props), len(payload)))
+            self._log.write(topic)
+            self._log.write(props)
+            self._log.write(payload)
+            self._idx.write(_INDEX.pack(offset, ts))
+            self.records += 1
+            self.bytes += len(payload)
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self._flush()
+
+    def _flush(self):
+        # 로그를 먼저 디스크로 보내야 인덱스가 없는 레코드를 가리키지 않음
+        self._log.flush()
+        self._idx.flush()
+        self._unflushed = 0
+
+    def attach(self, client, topic="camera/frame/#"):
+        client.message_callback_add(topic, lambda c, u, msg: self.record(msg))
+        client.subscribe(topic)
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._log.close()
+            self._idx.close()
+
+
+# ------------------ 읽기 ------------------
+class TrafficLog:
+    def __init__(self, path):
+        self.path = str(path)
+        self._f = open(self.path, "rb")
+        if self._f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+            self._f.close()
+            raise ValueError(f"{self.path} is not an MQTT traffic log")
+        self._offsets, self._times = self._load_index()
+        self.valid_end = self._record_end(self._offsets[-1]) if self._offsets else len(FILE_MAGIC)
+
+    def _load_index(self):
+        size = os.path.getsize(self.path)
+        idx_path = self.path + ".idx"
+        offsets, times = [], []
+        if os.path.exists(idx_path):
+            with open(idx_path, "rb") as f:
+                data = f.read()
+            for offset, ts in _INDEX.iter_unpack(data[:len(data) - len(data) % _INDEX.size]):
+                offsets.append(offset)
+                times.append(ts)
+            if offsets and self._record_end(offsets[-1]) == size:
+                return offsets, times
+        return self._rebuild_index(size)
+
+    def _record_end(self, offset):
+        self._f.seek(offset)
+        head = self._f.read(_RECORD.size)
+        if len(head) < _RECORD.size:
+            return -1
+        _, tl, pl, nl = _RECORD.unpack(head)
+        return offset + _RECORD.size + tl + pl + nl
+
+    def _rebuild_index(self, size):
+        """인덱스가 없거나 로그와 안 맞으면 (비정상 종료 등) 로그를 훑어서 다시 만듦. 잘린 마지막 레코드는 무시"""
+        offsets, times = [], []
+        offset = len(FILE_MAGIC)
+        while offset + _RECORD.size <= size:
+            self._f.seek(offset)
+            ts, tl, pl, nl = _RECORD.unpack(self._f.read(_RECORD.size))
+            end = offset + _RECORD.size + tl + pl + nl
+            if end > size:
+                break
+            offsets.append(offset)
+            times.append(ts)
+            offset = end
+        with open(self.path + ".idx", "wb") as f:
+            f.write(b"".join(_INDEX.pack(o, t) for o, t in zip(offsets, times)))
+        return offsets, times
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def __getitem__(self, i):
+        self._f.seek(self._offsets[i])
+        ts, tl, pl, nl = _RECORD.unpack(self._f.read(_RECORD.size))
+        topic = self._f.read(tl).decode("utf-8")
+        props = json.loads(self._f.read(pl)) if pl else []
+        return Record(ts, topic, self._f.read(nl), props)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def between(self, start=None, end=None):
+        """도착 시각 [start, end) 구간 레코드 (인덱스로 이분 탐색)"""
+        lo = 0 if start is None else bisect.bisect_left(self._times, start)
+        hi = len(self) if end is None else bisect.bisect_left(self._times, end)
+        for i in range(lo, hi):
+            yield self[i]
+
+    @property
+    def duration(self):
+        return self._times[-1] - self._times[0] if self._times else 0.0
+
+    def info(self):
+        devices = {}
+        total = 0
+        for rec in self:
+            devices[rec.topic] = devices.get(rec.topic, 0) + 1
+            total += len(rec.payload)
+        return {
+            "records": len(self),
+            "duration_s": round(self.duration, 3),
+            "bytes": total,
+            "topics": devices,
+        }
+
+    def close(self):
+        self._f.close()
+
+
+# ------------------ 재생 ------------------
+class Replayer:
+    """
+    speed: 1.0 원래 속도, N배속, 0 이하이면 대기 없이 최대 속도
+    keep_properties: 녹화된 user property(trace 등)도 같이 보냄. 기본 False (옛 시각이 섞이면 지연 통계가 틀어짐)
+    """
+    def __init__(self, log, speed=1.0, loops=1, keep_properties=False):
+        self.log = log
+        self.speed = speed
+        self.loops = loops
+        self.keep_properties = keep_properties
+        self.stats = {}
+
+    def _schedule(self):
+        """(record, 재생 시작 기준 보내야 할 시각) 순서대로"""
+        if not len(self.log):
+            return
+        first = self.log[0].ts
+        offset = 0.0
+        for _ in range(self.loops):
+            last = first
+            for rec in self.log:
+                last = rec.ts
+                yield rec, (offset + rec.ts - first) / self.speed if self.speed > 0 else None
+            offset += last - first + 1e-3
+
+    def _run(self, send):
+        count = sent_bytes = 0
+        max_lag = 0.0
+        start = time.perf_counter()
+        for rec, due in self._schedule():
+            if due is not None:
+                delay = start + due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    max_lag = max(max_lag, -delay)
+            send(rec)
+            count += 1
+            sent_bytes += len(rec.payload)
+        elapsed = time.perf_counter() - start
+        self.stats = {
+            "messages": count,
+            "bytes": sent_bytes,
+            "elapsed_s": round(elapsed, 3),
+            "msg_per_s": round(count / elapsed, 1) if elapsed > 0 else 0.0,
+            "max_lag_ms": round(max_lag * 1000, 2),   # 일정보다 늦게 보낸 최대 시간 (수신부가 느리면 커짐)
+        }
+        return self.stats
+
+    def publish(self, client, qos=0):
+        """브로커로 다시 publish (수신부는 평소처럼 MQTT로 받음)"""
+        def send(rec):
+            props = _publish_properties(rec.user_properties) if self.keep_properties else None
+            client.publish(rec.topic, rec.payload, qos=qos, properties=props)
+        return self._run(send)
+
+    def inject(self, on_message, client=None, userdata=None):
+        """수신부 on_message(client, userdata, msg)를 직접 호출 (브로커/네트워크 없이 수신부만 측정)"""
+        def send(rec):
+            props = _publish_properties(rec.user_properties) if self.keep_properties else None
+            on_message(client, userdata, ReplayMessage(rec.topic, rec.payload, props))
+        return self._run(send)
+
+
+# ------------------ CLI ------------------
+def _connect(broker, port):
+    from settings import make_mqtt_client
+    client = make_mqtt_client(broker)
+    client.connect(broker, port, 60)
+    client.loop_start()
+    return client
+
+
+def main():
+    from settings import mqtt_broker, mqtt_port
+    parser = argparse.ArgumentParser(description="MQTT traffic recorder / replayer")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("record", help="토픽 트래픽을 로그 파일로 녹화")
+    r.add_argument("--broker", default=mqtt_broker("127.0.0.1"))
+    r.add_argument("--port", type=int, default=mqtt_port())
+    r.add_argument("--topic", default="camera/frame/#")
+    r.add_argument("--out", required=True)
+    r.add_argument("--seconds", type=float, default=0, help="0이면 Ctrl+C까지")
+
+    i = sub.add_parser("info", help="로그 요약")
+    i.add_argument("log")
+
+    p = sub.add_parser("replay", help="로그를 브로커로 다시 publish")
+    p.add_argument("log")
+    p.add_argument("--broker", default=mqtt_broker("127.0.0.1"))
+    p.add_argument("--port", type=int, default=mqtt_port())
+    p.add_argument("--speed", type=float, default=1.0, help="배속, 0이면 최대 속도")
+    p.add_argument("--loop", type=int, default=1)
+    p.add_argument("--keep-properties", action="store_true")
+
+    args = parser.parse_args()
+    if args.cmd == "record":
+        recorder = TrafficRecorder(args.out)
+        client = _connect(args.broker, args.port)
+        recorder.attach(client, args.topic)
+        print(f"⏺ 녹화 중: {args.topic} → {args.out}")
+        try:
+            end = time.time() + args.seconds if args.seconds > 0 else None
+            while end is None or time.time() < end:
+                time.sleep(0.2)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            client.loop_stop()
+            client.disconnect()
+            recorder.close()
+        print(f"✅ {recorder.records}개 메시지, {recorder.bytes / 1e6:.1f} MB")
+    elif args.cmd == "info":
+        log = TrafficLog(args.log)
+        print(json.dumps(log.info(), ensure_ascii=False, indent=2))
+        log.close()
+    else:
+        log = TrafficLog(args.log)
+        client = _connect(args.broker, args.port)
+        try:
+            stats = Replayer(log, args.speed, args.loop, args.keep_properties).publish(client)
+        finally:
+            client.loop_stop()
+            client.disconnect()
+            log.close()
+        print(stats)
+
+
+if __name__ == "__main__":
+    main()
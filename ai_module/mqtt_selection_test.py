@@ -6,15 +6,17 @@ import json
 import base64
 from pathlib import Path
 from datetime import datetime
-import paho.mqtt.client as mqtt
+from settings import make_mqtt_client, mqtt_broker, mqtt_port
 from ultralytics import YOLO
+from detections import Detections
 from verify_decode import verify_and_decode_image
 # -------- YOLO 모델 로딩 --------
 yolo_model = YOLO("/Users/songseungho/Desktop/making program/Project_ai_clothes/ai-clothes-sorter/model_files/yolov8n_clothes.pt")
 detection_class_names = yolo_model.names
 
 # -------- MQTT 설정 --------
-MQTT_BROKER = "172.30.1.21"
+MQTT_BROKER = mqtt_broker("172.30.1.21")
+MQTT_PORT = mqtt_port()
 MQTT_TOPIC_FRAME = "image/#"
 MQTT_TOPIC_RESULT = "camera/result"
 EXPECTED_CATEGORY = "상의"
@@ -27,29 +29,17 @@ def on_message(client, userdata, msg):
         frame_queue.get_nowait()
     frame_queue.put_nowait(msg.payload)
 
-client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, protocol=mqtt.MQTTv5)
+client = make_mqtt_client(MQTT_BROKER)
 client.on_message = on_message
-client.connect(MQTT_BROKER, 1883, 60)
+client.connect(MQTT_BROKER, MQTT_PORT, 60)
 client.subscribe(MQTT_TOPIC_FRAME)
 client.loop_start()
 
 def detect_with_yolo(frame_bgr, conf_thres=0.5):
     results = yolo_model.predict(source=frame_bgr, conf=conf_thres, verbose=False)
-    dets = []
-    if len(results) > 0:
-        boxes_data = results[0].boxes
-        for box in boxes_data:
-            xyxy = box.xyxy[0].cpu().numpy()
-            cls_idx = int(box.cls[0].item())
-            conf = float(box.conf[0].item())
-            x1, y1, x2, y2 = xyxy
-            cat = detection_class_names[cls_idx]
-            dets.append({
-                "box": (x1, y1, x2, y2),
-                "category": cat,
-                "score": conf
-            })
-    return dets
+    if len(results) == 0:
+        return Detections()
+    return Detections.from_ultralytics(results[0], detection_class_names)
 
 # -------- 디렉토리 설정 --------
 SAVE_DIR = Path.cwd() / "results"
@@ -81,11 +71,11 @@ try:
 
             matched = False
             category = "unknown"
-            for i, det in enumerate(detections):
-                print(f"🔍 [{i}] 분류: {det['category']} ({det['score']:.2f})")
-                if det["category"] == EXPECTED_CATEGORY:
+            for i, (label, score) in enumerate(zip(detections.labels, detections.scores)):
+                print(f"🔍 [{i}] 분류: {label} ({score:.2f})")
+                if label == EXPECTED_CATEGORY:
                     matched = True
-                category = det["category"]
+                category = label
 
             # 저장 파일 이름 생성
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
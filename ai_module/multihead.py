@@ -0,0 +1,96 @@
+# multihead.py
+# EfficientNet-B3 backbone 하나 + 대분류별 Linear head
+# 한 프레임의 여러 crop(대분류가 달라도)을 backbone 한 번에 통과시키고 head로 나눠 보냄
+import torch
+import torch.nn as nn
+import torchvision
+
+MULTIHEAD_FORMAT = "multihead"
+
+# nn.ModuleDict 키로 쓸 영문 이름
+BIG_CAT_KEYS = {
+    "상의": "tops",
+    "하의": "bottoms",
+    "아우터": "outer",
+    "치마": "skirt",
+}
+
+
+def head_key(big_cat):
+    return BIG_CAT_KEYS.get(big_cat, big_cat)
+
+
+class MultiHeadClassifier(nn.Module):
+    """
+    head_classes: {"상의": [세분류...], "하의": [...], ...}
+    """
+    def __init__(self, head_classes, pretrained=False):
+        super().__init__()
+        weights = torchvision.models.EfficientNet_B3_Weights.IMAGENET1K_V1 if pretrained else None
+        backbone = torchvision.models.efficientnet_b3(weights=weights)
+        self.features = backbone.features
+        self.avgpool = backbone.avgpool
+        self.dropout = backbone.classifier[0]
+        in_features = backbone.classifier[1].in_features
+
+        self.head_classes = {cat: list(classes) for cat, classes in head_classes.items()}
+        self.heads = nn.ModuleDict({
+            head_key(cat): nn.Linear(in_features, len(classes))
+            for cat, classes in self.head_classes.items()
+        })
+
+    def embed(self, x):
+        x = self.features(x)
+        x = self.avgpool(x)
+        return self.dropout(torch.flatten(x, 1))
+
+    def head_logits(self, emb, big_cat):
+        return self.heads[head_key(big_cat)](emb)
+
+    def has_head(self, big_cat):
+        return head_key(big_cat) in self.heads
+
+    def forward(self, x, big_cat):
+        return self.head_logits(self.embed(x), big_cat)
+
+    @torch.no_grad()
+    def classify(self, x, big_cats):
+        """
+        x: [N,3,H,W], big_cats: 길이 N 리스트
+        return: [(fine_label, conf), ...] (입력 순서 유지, head가 없는 대분류는 (big_cat, 1.0))
+        """
+        results = [(cat, 1.0) for cat in big_cats]
+        valid = [i for i, cat in enumerate(big_cats) if self.has_head(cat)]
+        if not valid:
+            return results
+
+        emb = self.embed(x[valid])
+        groups = {}
+        for row, i in enumerate(valid):
+            groups.setdefault(big_cats[i], []).append((row, i))
+
+        for cat, members in groups.items():
+            rows = torch.tensor([r for r, _ in members], device=emb.device)
+            probs = torch.softmax(self.head_logits(emb[rows], cat), dim=1)
+            top_prob, top_idx = probs.max(dim=1)
+            classes = self.head_classes[cat]
+            for (_, i), idx, prob in zip(members, top_idx.tolist(), top_prob.tolist()):
+                results[i] = (classes[idx], prob)
+        return results
+
+
+def save_multihead(model, path):
+    torch.save({
+        "format": MULTIHEAD_FORMAT,
+        "arch": "efficientnet_b3",
+        "head_classes": model.head_classes,
+        "model_state": model.state_dict(),
+    }, path)
+
+
+def build_multihead_from_checkpoint(checkpoint, device):
+    net = MultiHeadClassifier(checkpoint["head_classes"])
+    net.load_state_dict(checkpoint["model_state"])
+    net.eval()
+    net.to(device)
+    return net
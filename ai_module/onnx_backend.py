@@ -0,0 +1,54 @@
+# onnx_backend.py
+# export_onnx.py로 만든 EfficientNet-B3 ONNX를 ONNX Runtime(CPU)으로 실행
+# PyTorch 모델 자리에 그대로 끼워 쓸 수 있도록 torch 텐서 입력 → torch 텐서 logits 반환
+import json
+import os
+
+import numpy as np
+import torch
+
+# None이면 ONNX Runtime 기본값(물리 코어 수)
+ONNX_INTRA_OP_THREADS = None
+# 그래프가 순차 실행이라 inter-op 병렬성은 거의 없음
+ONNX_INTER_OP_THREADS = 1
+
+
+class OnnxClassifier:
+    def __init__(self, path, intra_op_threads=ONNX_INTRA_OP_THREADS, inter_op_threads=ONNX_INTER_OP_THREADS):
+        import onnxruntime as ort
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        if intra_op_threads:
+            opts.intra_op_num_threads = intra_op_threads
+        if inter_op_threads:
+            opts.inter_op_num_threads = inter_op_threads
+
+        self.path = path
+        self.session = ort.InferenceSession(path, sess_options=opts, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        # 클래스 목록은 export_onnx.py가 metadata에 넣음. 없으면 로드 시점에 바로 실패
+        # (나중에 batcher 안에서 loaded_classes[idx] TypeError로 터지지 않도록)
+        meta = self.session.get_modelmeta().custom_metadata_map
+        if "classes" not in meta:
+            raise ValueError(f"{path}: no 'classes' metadata, re-export it with export_onnx.py")
+        self.classes = json.loads(meta["classes"])
+        num_logits = self.session.get_outputs()[0].shape[-1]
+        if not self.classes or (isinstance(num_logits, int) and num_logits != len(self.classes)):
+            raise ValueError(f"{path}: 'classes' metadata has {len(self.classes)} entries "
+                             f"but the model outputs {num_logits} logits")
+        self.nbytes = os.path.getsize(path)  # model_registry 메모리 계산용
+
+    def __call__(self, x):
+        if isinstance(x, torch.Tensor):
+            x = x.detach().cpu().numpy()
+        logits = self.session.run(None, {self.input_name: np.ascontiguousarray(x, dtype=np.float32)})[0]
+        return torch.from_numpy(logits)
+
+    # nn.Module처럼 쓰는 코드 호환용
+    def eval(self):
+        return self
+
+    def to(self, device):
+        return self
@@ -0,0 +1,107 @@
+# overlay.py
+# 한글 라벨 + 박스를 프레임(numpy BGR)에 직접 그리는 렌더러
+# - 폰트는 크기별로 한 번만 로드
+# - 글자(glyph) 단위로 미리 래스터화한 alpha mask를 캐시해서 라벨을 조립
+# - 프레임당 한 번, 복사 없이 in-place로 alpha blending
+import unicodedata
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+
+class OverlayRenderer:
+    def __init__(self, font_path="NanumGothic.ttf", max_labels=512):
+        self.font_path = font_path
+        self.max_labels = max_labels
+        self._fonts = {}                 # size -> ImageFont
+        self._glyphs = {}                # (char, size) -> (mask uint8 [h,w], advance)
+        self._labels = OrderedDict()     # (text, size) -> alpha float32 [h,w,1] (LRU)
+
+    def font(self, size):
+        font = self._fonts.get(size)
+        if font is None:
+            try:
+                font = ImageFont.truetype(self.font_path, size)
+            except Exception as e:
+                print("Font load error:", e)
+                font = ImageFont.load_default()
+            self._fonts[size] = font
+        return font
+
+    def _line_height(self, size):
+        font = self.font(size)
+        if hasattr(font, "getmetrics"):
+            ascent, descent = font.getmetrics()
+            return ascent + descent
+        return size
+
+    def _glyph(self, ch, size):
+        key = (ch, size)
+        glyph = self._glyphs.get(key)
+        if glyph is None:
+            font = self.font(size)
+            h = self._line_height(size)
+            advance = int(round(font.getlength(ch))) if hasattr(font, "getlength") else size
+            # 이탤릭/오버행 여유분 포함
+            img = Image.new("L", (max(advance, 1) + size // 4, h), 0)
+            ImageDraw.Draw(img).text((0, 0), ch, font=font, fill=255)
+            glyph = (np.asarray(img, dtype=np.uint8), advance)
+            self._glyphs[key] = glyph
+        return glyph
+
+    def label_alpha(self, text, size):
+        """라벨 문자열 → alpha mask (0~1 float32, [h,w,1])"""
+        text = unicodedata.normalize('NFC', text)
+        key = (text, size)
+        alpha = self._labels.get(key)
+        if alpha is not None:
+            self._labels.move_to_end(key)
+            return alpha
+
+        glyphs = [self._glyph(ch, size) for ch in text]
+        h = self._line_height(size)
+        width = sum(adv for _, adv in glyphs) + size // 4
+        mask = np.zeros((h, max(width, 1)), dtype=np.uint8)
+        x = 0
+        for g, adv in glyphs:
+            gw = min(g.shape[1], mask.shape[1] - x)
+            np.maximum(mask[:, x:x + gw], g[:, :gw], out=mask[:, x:x + gw])
+            x += adv
+
+        alpha = (mask.astype(np.float32) / 255.0)[:, :, None]
+        self._labels[key] = alpha
+        if len(self._labels) > self.max_labels:
+            self._labels.popitem(last=False)
+        return alpha
+
+    def _blend(self, frame, alpha, pos, color):
+        x, y = int(pos[0]), int(pos[1])
+        fh, fw = frame.shape[:2]
+        h, w = alpha.shape[:2]
+        # 화면 밖으로 나가는 부분 잘라내기
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, fw), min(y + h, fh)
+        if x0 >= x1 or y0 >= y1:
+            return
+        a = alpha[y0 - y:y1 - y, x0 - x:x1 - x]
+        roi = frame[y0:y1, x0:x1]
+        blended = roi * (1.0 - a) + np.asarray(color, dtype=np.float32) * a
+        roi[:] = blended.astype(np.uint8)
+
+    def draw(self, frame, items, thickness=2):
+        """
+        items: [{"box": (x1,y1,x2,y2) 또는 None, "color": (B,G,R),
+                 "texts": [(text, (x,y), (B,G,R), font_size), ...]}, ...]
+        frame을 직접 수정하고 그대로 반환
+        """
+        for item in items:
+            box = item.get("box")
+            if box is not None:
+                x1, y1, x2, y2 = map(int, box)
+                cv2.rectangle(frame, (x1, y1), (x2, y2), item.get("color", (0, 255, 0)), thickness)
+        for item in items:
+            for text, pos, color, size in item.get("texts", []):
+                self._blend(frame, self.label_alpha(text, size), pos, color)
+        return frame
@@ -2,102 +2,203 @@
 import cv2
 import time
 import os
+import threading
+from collections import deque
 import numpy as np
-from detection_inference import detect_with_yolo
-from classification_inference import classify_fine
-from PIL import Image, ImageDraw, ImageFont
-import unicodedata
-# 한글 텍스트를 위한 helper 함수 (PIL 사용)
+from detection_inference import detect
+from detections import Detections
+from classification_inference import classify_fine_bgr_batch
+from overlay import OverlayRenderer
+from tracker import MultiObjectTracker
+from motion_gate import MotionGate
+from frame_buffer import LatestFrameBuffer
+from image_writer import get_image_writer
+# 한글 텍스트를 위한 helper (폰트/글자 bitmap 캐시, 프레임에 직접 그림)
 fontPath="NanumGothic.ttf"
+overlay = OverlayRenderer(fontPath)
+_renderers = {fontPath: overlay}
 
 def put_text_with_pil(cv2_img, text, position, font_path=fontPath, font_size=20, color=(0,255,0)):
-    cv2_img_rgb = cv2.cvtColor(cv2_img, cv2.COLOR_BGR2RGB)
-    pil_img = Image.fromarray(cv2_img_rgb)
-    draw = ImageDraw.Draw(pil_img)
-    text_nfc = unicodedata.normalize('NFC', text)
-    try:
-        font = ImageFont.truetype(font_path, font_size)
-    except Exception as e:
-        print("Font load error:", e)
-        font = ImageFont.load_default()
-    draw.text(position, text_nfc, font=font, fill=(color[2], color[1], color[0]))
-    return cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
+    """예전처럼 글자를 그린 새 이미지를 반환 (cv2_img는 그대로). 여러 라벨은 OverlayRenderer.draw로 in-place"""
+    renderer = _renderers.get(font_path)
+    if renderer is None:
+        renderer = _renderers[font_path] = OverlayRenderer(font_path)
+    return renderer.draw(cv2_img.copy(), [{"box": None, "texts": [(text, position, color, font_size)]}])
 
 
 # 임계값 (세분류 confidence가 이 값 미만이면 박스를 그리지 않음)
 CONF_THRESHOLD = 0.6
+LATENCY_WINDOW = 300
 
-def run_pipeline_camera():
-    cap = cv2.VideoCapture(2)
-    if not cap.isOpened():
-        print("Cannot open camera.")
-        return
-
-    os.makedirs("result_pipeline", exist_ok=True)
 
-    while True:
+def capture_loop(cap, frames, stop):
+    """카메라 → 단일 슬롯 버퍼 (항상 최신 프레임으로 덮어씀)"""
+    while not stop.is_set():
         ret, frame = cap.read()
         if not ret:
             break
+        frames.put((frame, time.perf_counter()))
+    frames.close()
+
+
+def inference_loop(frames, results, stop):
+    """가장 최신 프레임만 가져와서 detect → track → 세분류 → 캡처, 결과에 지연시간 기록"""
+    # 같은 옷은 같은 track id → 세분류/캡처를 track 단위로 한 번씩
+    tracker = MultiObjectTracker(iou_threshold=0.3, max_age=10)
+    # 화면이 정지해 있으면 YOLO 생략하고 직전 검출 결과 재사용
+    gate = MotionGate(name="pipeline", report_every=300)
+    # 렌더 스레드와 캐시를 공유하지 않도록 캡처 저장용 렌더러는 따로
+    capture_overlay = OverlayRenderer(fontPath)
+    # 디스크 저장은 백그라운드 writer가 처리
+    image_writer = get_image_writer()
+    detections = Detections()
+    latencies = deque(maxlen=LATENCY_WINDOW)
+    seq = 0
+
+    while not stop.is_set():
+        seq, item = frames.get(seq, timeout=0.5)
+        if item is None:
+            if frames.closed:
+                break
+            continue
+        frame, captured_at = item
 
         img_h, img_w, _ = frame.shape
         img_area = img_w * img_h
 
-        # 1) YOLO detect => [ {box, category, score}, ... ]
-        detections = detect_with_yolo(frame, conf_thres=0.5)
+        # 1) YOLO detect => Detections (박스/점수/대분류 배열)
+        if gate.check(frame):
+            detections = detect(frame, conf_thres=0.5)
 
-        # 2) 각 검출 영역에 대해 세분류 수행
-        for det in detections:
-            (x1, y1, x2, y2) = det["box"]
-            big_cat = det["category"]  # 예: "상의", "하의", "아우터", "치마"
-            score_d = det["score"]
-
-            # 계산: 박스 면적
-            box_area = (x2 - x1) * (y2 - y1)
-            # 만약 박스 면적이 전체 이미지 면적의 80% 이상이면 건너뛰기
-            if box_area / img_area > 0.95:
-                continue
+        # 2) 박스 면적이 전체 이미지 면적의 95%를 넘는 검출은 한 번에 제외
+        kept = detections[detections.areas() / img_area <= 0.95]
 
-            # 박스 그리기 및 대분류 텍스트 표시
-            temp_frame = frame.copy()
-            cv2.rectangle(temp_frame, (int(x1), int(y1)), (int(x2), int(y2)), (0,255,0), 2)
-            temp_frame = put_text_with_pil(temp_frame, f"{big_cat}({score_d:.2f})", (int(x1), int(y1)-5),
-                                           font_path=fontPath, font_size=20, color=(0,255,0))
+        # 유효한 검출 영역 crop 모으기 (검출 순서 유지), tracker/overlay에는 dict로 넘김
+        valid = []
+        for det in kept.to_dicts(label_key="category", as_int=False):
+            (x1, y1, x2, y2) = det["box"]
 
             # 크롭
             crop_bgr = frame[int(y1):int(y2), int(x1):int(x2)]
             if crop_bgr.size <= 0:
                 continue
-            crop_rgb = cv2.cvtColor(crop_bgr, cv2.COLOR_BGR2RGB)
-            pil_crop = Image.fromarray(crop_rgb)
-
-            # 3) 세분류 수행
-            fine_label, fine_conf = classify_fine(pil_crop, big_cat)
-
+            valid.append((det, crop_bgr))
+
+        # 3) 추적: 검출 → track 매칭
+        tracked = tracker.update([det for det, _ in valid])
+
+        # 4) 세분류: 새 track이거나 아직 confidence가 낮은 track만, 프레임 단위로 묶어서 forward
+        pending = [i for i, (_, track) in enumerate(tracked) if track.needs_classification(CONF_THRESHOLD)]
+        fine_results = classify_fine_bgr_batch([valid[i][1] for i in pending],
+                                               [valid[i][0]["category"] for i in pending])
+        for i, (fine_label, fine_conf) in zip(pending, fine_results):
+            tracked[i][1].add_vote(fine_label, fine_conf)
+
+        accepted = []
+        overlay_items = []
+        for det, track in tracked:
+            fine_label, fine_conf = track.fine_label, track.fine_conf
             # 세분류 confidence가 낮으면 무시
-            if fine_conf < CONF_THRESHOLD:
+            if fine_label is None or fine_conf < CONF_THRESHOLD:
                 continue
+            accepted.append((det, track))
 
-            # 세분류 텍스트 추가
-            temp_frame = put_text_with_pil(temp_frame, f"{fine_label}({fine_conf:.2f})", (int(x1), int(y1)+20),
-                                           font_path=fontPath, font_size=20, color=(0,255,255))
-            frame = temp_frame
-
-            # 중앙에 도달 시 캡처
-            w = frame.shape[1]
-            center_box_x = (x1 + x2) / 2
-            if abs(center_box_x - w/2) < 20:
-                timestamp = time.strftime("%Y%m%d_%H%M%S")
-                filename = f"{timestamp}_{big_cat}_{score_d}_{fine_label}_{fine_conf}.jpg"
-                cv2.imwrite(os.path.join("result_pipeline", filename), frame)
-                print(f"[CAPTURE] saved => {filename}")
-
-        cv2.imshow("2-stage pipeline", frame)
-        if cv2.waitKey(1) & 0xFF == 27:  # ESC
-            break
+            # 박스 + 대분류/세분류 텍스트
+            (x1, y1, x2, y2) = det["box"]
+            overlay_items.append({
+                "box": (x1, y1, x2, y2),
+                "color": (0,255,0),
+                "texts": [
+                    (f"#{track.track_id} {det['category']}({det['score']:.2f})", (int(x1), int(y1)-5), (0,255,0), 20),
+                    (f"{fine_label}({fine_conf:.2f})", (int(x1), int(y1)+20), (0,255,255), 20),
+                ],
+            })
+
+        decided_at = time.perf_counter()
+        latency_ms = (decided_at - captured_at) * 1000
+        latencies.append(latency_ms)
+
+        # 5) 중앙선에 도달한 track만 한 번 캡처 (판단에 쓴 프레임에 그려서 저장)
+        w = frame.shape[1]
+        annotated = None
+        for det, track in accepted:
+            if track.captured or not track.crossed_center(w, tol=20):
+                continue
+            track.captured = True
+            if annotated is None:
+                # 렌더 스레드가 같은 프레임을 읽고 있을 수 있으므로 복사본에 그림
+                annotated = capture_overlay.draw(frame.copy(), overlay_items)
+            big_cat = det["category"]
+            score_d = det["score"]
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            filename = f"{timestamp}_{big_cat}_{score_d}_{track.fine_label}_{track.fine_conf}_id{track.track_id}.jpg"
+            image_writer.submit(os.path.join("result_pipeline", filename), annotated)
+            print(f"[CAPTURE] saved => {filename} (capture→decision {latency_ms:.1f} ms)")
+
+        results.put({
+            "frame_seq": seq,
+            "items": overlay_items,
+            "captured_at": captured_at,
+            "decided_at": decided_at,
+            "latency_ms": latency_ms,
+        })
+
+    print(gate.summary())
+    if latencies:
+        lat = np.asarray(latencies)
+        print(f"[LATENCY] capture→decision p50 {np.percentile(lat, 50):.1f} ms / "
+              f"p95 {np.percentile(lat, 95):.1f} ms / max {lat.max():.1f} ms "
+              f"(frames skipped by inference: {frames.dropped})")
 
-    cap.release()
-    cv2.destroyAllWindows()
+
+def run_pipeline_camera():
+    cap = cv2.VideoCapture(2)
+    if not cap.isOpened():
+        print("Cannot open camera.")
+        return
+    # 드라이버 쪽 버퍼도 최소로 (지원하는 백엔드만 적용됨)
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+    os.makedirs("result_pipeline", exist_ok=True)
+
+    frames = LatestFrameBuffer()     # capture → inference/render
+    results = LatestFrameBuffer()    # inference → render
+    stop = threading.Event()
+    workers = [
+        threading.Thread(target=capture_loop, args=(cap, frames, stop), daemon=True),
+        threading.Thread(target=inference_loop, args=(frames, results, stop), daemon=True),
+    ]
+    for t in workers:
+        t.start()
+
+    # 렌더 스테이지 (imshow/waitKey는 메인 스레드에서): 최신 카메라 프레임 + 최신 판단 결과
+    shown_seq = 0
+    try:
+        while not frames.closed:
+            seq, item = frames.peek()
+            if item is None or seq == shown_seq:
+                if cv2.waitKey(5) & 0xFF == 27:  # ESC
+                    break
+                continue
+            shown_seq = seq
+            display = item[0].copy()
+            _, result = results.peek()
+            if result is not None:
+                overlay.draw(display, result["items"])
+                lag_text = f"decision lag {result['latency_ms']:.0f} ms (frame {seq - result['frame_seq']} behind)"
+                overlay.draw(display, [{"box": None, "texts": [(lag_text, (10, 10), (0,255,255), 18)]}])
+
+            cv2.imshow("2-stage pipeline", display)
+            if cv2.waitKey(1) & 0xFF == 27:  # ESC
+                break
+    finally:
+        stop.set()
+        frames.close()
+        for t in workers:
+            t.join(timeout=2.0)
+        cap.release()
+        cv2.destroyAllWindows()
+        get_image_writer().close()
 
 
 if __name__ == "__main__":
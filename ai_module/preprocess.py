@@ -0,0 +1,90 @@
+# preprocess.py
+# YOLO 박스에서 잘라낸 BGR numpy crop → 정규화된 NCHW float 텐서 (PIL 변환 없음)
+# T.Resize((300,300)) + T.ToTensor() + T.Normalize(ImageNet mean/std)와 같은 결과를 목표로 함
+#  - 확대: bilinear끼리라 평균 오차 0.01 미만
+#  - 축소: INTER_AREA(box) vs PIL antialias(triangle) 차이로 평균 0.01~0.03, 촘촘한 질감의 가장자리 픽셀은 크게 다를 수 있음
+#  (허용 오차는 tests/test_preprocess.py)
+# 벤치마크: python preprocess.py
+import time
+
+import cv2
+import numpy as np
+import torch
+
+MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
+
+class CropPreprocessor:
+    """
+    미리 잡아둔 [max_batch,3,size,size] 버퍼에 바로 써서 반환.
+    반환 텐서는 버퍼의 view이므로 다음 호출 전에 forward까지 끝내야 함 (스레드 하나에서 사용).
+    """
+    def __init__(self, size=300, max_batch=8):
+        self.size = size
+        self._buf = torch.empty((max_batch, 3, size, size), dtype=torch.float32)
+        # (x/255 - mean)/std = x * scale - bias  (RGB 채널 순서)
+        self.scale = (1.0 / (255.0 * STD)).astype(np.float32)
+        self.bias = (MEAN / STD).astype(np.float32)
+
+    def _ensure_capacity(self, n):
+        if n > self._buf.shape[0]:
+            self._buf = torch.empty((n, 3, self.size, self.size), dtype=torch.float32)
+
+    def __call__(self, crops_bgr):
+        n = len(crops_bgr)
+        self._ensure_capacity(n)
+        out = self._buf[:n]
+        arr = out.numpy()  # 같은 메모리
+        s = self.size
+        for i, crop in enumerate(crops_bgr):
+            h, w = crop.shape[:2]
+            # 축소는 INTER_AREA (PIL Resize의 antialias와 가까움), 확대는 bilinear
+            interp = cv2.INTER_AREA if (h > s or w > s) else cv2.INTER_LINEAR
+            resized = cv2.resize(crop, (s, s), interpolation=interp)
+            for c in range(3):
+                # BGR → RGB: 출력 채널 c는 입력 채널 2-c
+                np.multiply(resized[:, :, 2 - c], self.scale[c], out=arr[i, c])
+                arr[i, c] -= self.bias[c]
+        return out
+
+
+def _benchmark(num_crops=5, frames=50):
+    import torchvision.transforms as T
+    from PIL import Image
+
+    pil_tf = T.Compose([
+        T.Resize((300,300)),
+        T.ToTensor(),
+        T.Normalize([0.485,0.456,0.406],[0.229,0.224,0.225])
+    ])
+    rng = np.random.default_rng(0)
+    frame_crops = [
+        [rng.integers(0, 255, (int(rng.integers(120, 400)), int(rng.integers(120, 400)), 3), dtype=np.uint8)
+         for _ in range(num_crops)]
+        for _ in range(frames)
+    ]
+    prep = CropPreprocessor()
+
+    start = time.perf_counter()
+    for crops in frame_crops:
+        torch.stack([pil_tf(Image.fromarray(cv2.cvtColor(c, cv2.COLOR_BGR2RGB))) for c in crops])
+    pil_ms = (time.perf_counter() - start) * 1000 / frames
+
+    start = time.perf_counter()
+    for crops in frame_crops:
+        prep(crops)
+    np_ms = (time.perf_counter() - start) * 1000 / frames
+
+    # 정확도 확인 (보간 방식 차이로 약간 다름)
+    ref = torch.stack([pil_tf(Image.fromarray(cv2.cvtColor(c, cv2.COLOR_BGR2RGB))) for c in frame_crops[0]])
+    diff = (ref - prep(frame_crops[0])).abs().mean().item()
+
+    print(f"crops/frame={num_crops}, frames={frames}")
+    print(f"PIL + T.Compose : {pil_ms:.2f} ms/frame")
+    print(f"CropPreprocessor: {np_ms:.2f} ms/frame")
+    print(f"saved           : {pil_ms - np_ms:.2f} ms/frame ({pil_ms / np_ms:.1f}x), mean abs diff={diff:.4f}")
+
+
+if __name__ == "__main__":
+    _benchmark()
@@ -0,0 +1,164 @@
+# quantize.py
+# EfficientNet-B3 체크포인트 → static INT8 (post-training quantization)
+# data/val/<class> 이미지 일부로 calibration 후 TorchScript로 저장하고,
+# FP32 대비 정확도 (calibration에 안 쓴 나머지 이미지) / 지연시간 / 메모리 비교 리포트를 같이 남긴다.
+# 사용: python quantize.py model_files/model_effb3.pth --val-dir data/val
+import argparse
+import io
+import json
+import os
+import random
+import time
+
+import torch
+import torch.nn as nn
+import torchvision
+from PIL import Image
+
+try:
+    from data_utils import val_transform              # python quantize.py (ai_module 디렉터리에서 실행)
+except ImportError:
+    from ai_module.data_utils import val_transform    # ai_module.inference에서 load_int8만 가져갈 때
+
+IMG_EXTS = (".jpg", ".jpeg", ".png")
+
+
+def build_fp32(ckpt_path):
+    checkpoint = torch.load(ckpt_path, map_location="cpu")
+    classes = checkpoint["classes"]
+    net = torchvision.models.efficientnet_b3(weights=None)
+    in_features = net.classifier[1].in_features
+    net.classifier[1] = nn.Linear(in_features, len(classes))
+    net.load_state_dict(checkpoint["model_state"])
+    net.eval()
+    return net, classes
+
+
+def list_val_images(val_dir, classes):
+    """data/val/<class>/*.jpg 중 체크포인트 클래스에 있는 폴더만 (path, label_idx)"""
+    samples = []
+    for idx, cls in enumerate(classes):
+        cls_dir = os.path.join(val_dir, cls)
+        if not os.path.isdir(cls_dir):
+            continue
+        for name in sorted(os.listdir(cls_dir)):
+            if name.lower().endswith(IMG_EXTS):
+                samples.append((os.path.join(cls_dir, name), idx))
+    return samples
+
+
+def split_samples(samples, calib_size, seed=0):
+    """섞은 뒤 앞 calib_size개는 calibration, 나머지는 정확도 평가용 (겹치지 않음)"""
+    samples = list(samples)
+    random.Random(seed).shuffle(samples)
+    return samples[:calib_size], samples[calib_size:]
+
+
+def load_tensor(path):
+    return val_transform(Image.open(path).convert("RGB")).unsqueeze(0)
+
+
+def quantize_static(net, calib_paths, backend="x86"):
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+    torch.backends.quantized.engine = backend
+    example = torch.randn(1, 3, 300, 300)
+    prepared = prepare_fx(net, get_default_qconfig_mapping(backend), (example,))
+    with torch.no_grad():
+        for path in calib_paths:
+            prepared(load_tensor(path))
+    qnet = convert_fx(prepared)
+    qnet.eval()
+    return torch.jit.trace(qnet, example)
+
+
+def evaluate(net, samples):
+    correct = 0
+    with torch.no_grad():
+        for path, label in samples:
+            correct += int(net(load_tensor(path)).argmax(dim=1).item() == label)
+    return correct / len(samples) if samples else 0.0
+
+
+def measure_latency(net, runs=30, warmup=5):
+    x = torch.randn(1, 3, 300, 300)
+    times = []
+    with torch.no_grad():
+        for i in range(warmup + runs):
+            start = time.perf_counter()
+            net(x)
+            if i >= warmup:
+                times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {"mean_ms": round(sum(times) / len(times), 2), "p95_ms": round(times[int(0.95 * (len(times) - 1))], 2)}
+
+
+def serialized_mb(net):
+    buf = io.BytesIO()
+    if isinstance(net, torch.jit.ScriptModule):
+        torch.jit.save(net, buf)
+    else:
+        torch.save(net.state_dict(), buf)
+    return round(buf.tell() / 1e6, 2)
+
+
+def save_int8(qnet, classes, out_path):
+    torch.jit.save(qnet, out_path, _extra_files={"classes.json": json.dumps(classes, ensure_ascii=False)})
+
+
+def load_int8(path):
+    """→ (model, classes). inference.load_model_once(CLF_BACKEND=int8)도 이 함수로 로드"""
+    extra = {"classes.json": ""}
+    net = torch.jit.load(path, map_location="cpu", _extra_files=extra)
+    net.eval()
+    return net, json.loads(extra["classes.json"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="EfficientNet-B3 static INT8 quantization")
+    parser.add_argument("checkpoint")
+    parser.add_argument("--val-dir", default="data/val")
+    parser.add_argument("--calib-size", type=int, default=100, help="calibration에 쓸 이미지 수")
+    parser.add_argument("--backend", default="x86", choices=["x86", "fbgemm", "qnnpack"])
+    parser.add_argument("-o", "--out", help="기본값: <checkpoint>_int8.pt")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    out_path = args.out or os.path.splitext(args.checkpoint)[0] + "_int8.pt"
+    net, classes = build_fp32(args.checkpoint)
+    samples = list_val_images(args.val_dir, classes)
+    if not samples:
+        raise SystemExit(f"No images under {args.val_dir} matching classes {classes}")
+
+    calib_samples, eval_samples = split_samples(samples, args.calib_size, args.seed)
+    if not eval_samples:
+        raise SystemExit(f"Need more than --calib-size={args.calib_size} images under {args.val_dir} "
+                         f"to evaluate on images not used for calibration (found {len(samples)})")
+    calib = [p for p, _ in calib_samples]
+    print(f"[QUANT] calibration {len(calib)} images / eval {len(eval_samples)} images")
+
+    qnet = quantize_static(net, calib, args.backend)
+    save_int8(qnet, classes, out_path)
+
+    fp32_acc, int8_acc = evaluate(net, eval_samples), evaluate(qnet, eval_samples)
+    report = {
+        "checkpoint": args.checkpoint,
+        "int8_model": out_path,
+        "backend": args.backend,
+        "calibration_images": len(calib),
+        "eval_images": len(eval_samples),
+        "accuracy": {"fp32": round(fp32_acc, 4), "int8": round(int8_acc, 4), "delta": round(int8_acc - fp32_acc, 4)},
+        "latency_bs1": {"fp32": measure_latency(net), "int8": measure_latency(qnet)},
+        "size_mb": {"fp32": serialized_mb(net), "int8": serialized_mb(qnet)},
+        "torch_threads": torch.get_num_threads(),
+    }
+    report_path = os.path.splitext(out_path)[0] + "_report.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    print(f"[QUANT] saved => {out_path}, report => {report_path}")
+
+
+if __name__ == "__main__":
+    main()
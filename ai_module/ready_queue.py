@@ -0,0 +1,55 @@
+# ready_queue.py
+# "최신 프레임 + 분석 요청"이 둘 다 있는 디바이스만 깨우는 ready queue
+# - put_frame(): 디바이스별 최신 프레임 1장만 보관 (이전 프레임은 덮어씀, Queue(maxsize=1) drop-oldest와 같음)
+# - request(): 분석 요청 플래그. 프레임이 먼저 와 있으면 바로 ready, 아니면 다음 프레임이 올 때 ready
+# - get(): ready인 디바이스가 생길 때까지 Condition으로 대기 → polling/busy loop 없음, 깨어나는 즉시 처리
+#   프레임과 요청을 같이 꺼내가므로 요청 하나당 분석 한 번
+# MQTT 콜백과 처리 스레드가 같은 dict를 lock 없이 건드리던 문제도 여기서 lock으로 정리
+import threading
+from collections import deque
+
+
+class DeviceReadyQueue:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._frames = {}        # device_id -> 최신 프레임
+        self._requests = {}      # device_id -> request() 때 넘긴 값
+        self._ready = deque()    # 프레임과 요청이 모두 있는 device_id (도착 순서)
+        self._closed = False
+        self.dropped = 0         # 분석 요청 없이 덮어써진 프레임 수
+
+    def _mark_ready(self, device_id):
+        if device_id in self._frames and device_id in self._requests and device_id not in self._ready:
+            self._ready.append(device_id)
+            self._cond.notify()
+
+    def put_frame(self, device_id, frame):
+        with self._cond:
+            if device_id in self._frames:
+                self.dropped += 1
+            self._frames[device_id] = frame
+            self._mark_ready(device_id)
+
+    def request(self, device_id, value=True):
+        """분석 요청. value는 get()에서 프레임과 같이 돌려줌 (요청한 쪽 정보 등)"""
+        with self._cond:
+            self._requests[device_id] = value
+            self._mark_ready(device_id)
+
+    def get(self, timeout=None):
+        """ready 디바이스 → (device_id, frame, request 값). 닫혔거나 timeout이면 None"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._ready or self._closed, timeout) or not self._ready:
+                return None
+            device_id = self._ready.popleft()
+            return device_id, self._frames.pop(device_id), self._requests.pop(device_id)
+
+    def pending(self):
+        """요청은 왔지만 아직 프레임이 없는 디바이스들"""
+        with self._cond:
+            return [d for d in self._requests if d not in self._frames]
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
@@ -0,0 +1,34 @@
+# settings.py
+# 서버/파이 모듈 공통 MQTT 브로커 설정
+# - MQTT_BROKER : 브로커 주소 (없으면 각 모듈의 기본 IP). "local"이면 프로세스 안의 LocalBroker 사용
+# - MQTT_PORT   : 브로커 포트 (기본 1883)
+# - MQTT_LOCAL_PORT : MQTT_BROKER=local일 때 같은 브로커를 이 포트로도 공개 (load_generator 등 다른 프로세스용)
+#
+#   MQTT_BROKER=local MQTT_LOCAL_PORT=1883 python FSRC_server_0529_3.py
+#   python load_generator.py --broker 127.0.0.1 --devices 4
+import os
+
+import paho.mqtt.client as mqtt
+
+LOCAL = "local"
+
+
+def mqtt_broker(default):
+    return os.environ.get("MQTT_BROKER", default)
+
+
+def mqtt_port(default=1883):
+    return int(os.environ.get("MQTT_PORT", default))
+
+
+def make_mqtt_client(broker, client_id="", protocol=mqtt.MQTTv5):
+    """broker가 "local"이면 LocalClient, 아니면 paho Client (paho 1.x/2.x 모두)"""
+    if broker == LOCAL:
+        from local_broker import LocalClient, serve
+        local_port = os.environ.get("MQTT_LOCAL_PORT")
+        if local_port:
+            serve(int(local_port))
+        return LocalClient(client_id=client_id)
+    if hasattr(mqtt, "CallbackAPIVersion"):
+        return mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, client_id=client_id, protocol=protocol)
+    return mqtt.Client(client_id=client_id, protocol=protocol)
@@ -0,0 +1,427 @@
+# sharded_analyzer.py
+# GIL/torch 스레드 경합을 피하기 위한 멀티 프로세스 분석기
+# - 수신(ingest) 프로세스는 device_id를 consistent hash로 N개의 worker 프로세스 중 하나에 고정 배정
+# - worker 프로세스마다 모델 인스턴스 1개, torch 스레드 수 고정 (torch.set_num_threads)
+# - 프레임은 JPEG bytes로 보내고 디코딩/추론은 worker에서 수행
+# - shard마다 DeviceBatchScheduler를 하나씩 둬서 디바이스당 최신 프레임만, 라운드로빈으로 batch 전송
+# - 결과는 Future로 수신 프로세스에 돌아옴 → 기존 명령 전송/모니터링 로직 그대로 사용
+#
+# worker는 subprocess로 이 파일을 새로 실행하므로 (spawn과 달리) 수신 스크립트의 모듈 레벨 코드
+# (MQTT 연결, 모델 로드 등)를 다시 실행하지 않음. 통신은 multiprocessing.connection (localhost + authkey)
+#
+# 벤치마크: python sharded_analyzer.py bench --workers 0 1 2 4 --devices 6 --detector yolo --model yolov8n.pt
+#   (workers 0 = 기존처럼 프로세스 하나에서 스레드 + batch scheduler)
+import argparse
+import bisect
+import hashlib
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Client, Listener
+
+from batch_scheduler import DeviceBatchScheduler
+from detections import Detections
+from shm_ring import SharedFrameRing
+
+AUTHKEY_ENV = "SHARDED_ANALYZER_AUTHKEY"
+
+
+# ------------------ consistent hash ------------------
+def _hash(key):
+    return int.from_bytes(hashlib.md5(key.encode("utf-8")).digest()[:8], "big")
+
+
+class HashRing:
+    """노드(worker)마다 가상 노드 vnodes개. 노드 수가 바뀌어도 대부분의 디바이스는 같은 worker에 남음"""
+    def __init__(self, nodes, vnodes=64):
+        self._ring = sorted((_hash(f"{node}#{v}"), node) for node in nodes for v in range(vnodes))
+        self._keys = [h for h, _ in self._ring]
+
+    def node_for(self, key):
+        i = bisect.bisect(self._keys, _hash(key)) % len(self._ring)
+        return self._ring[i][1]
+
+
+# ------------------ detector (worker 프로세스 안에서 생성) ------------------
+def build_detector(spec, model_path=None, conf=0.5):
+    """
+    spec:
+      "yolo"     : ultralytics YOLO(model_path) batched predict → 프레임별 Detections
+      "cpu:<ms>" : 모델 없이 프레임당 <ms>만큼 순수 파이썬 연산 (GIL 경합 재현용 벤치마크)
+    반환: detect(frames_bgr) -> 프레임별 detections 리스트
+    """
+    if spec == "yolo":
+        from ultralytics import YOLO
+        model = YOLO(model_path)
+
+        def detect(frames):
+            results = model.predict(source=list(frames), conf=conf, verbose=False)
+            return [Detections.from_ultralytics(r, model.names) for r in results]
+        return detect
+
+    if spec.startswith("cpu:"):
+        busy = float(spec[4:]) / 1000.0
+
+        def detect(frames):
+            out = []
+            for _ in frames:
+                end = time.perf_counter() + busy
+                x = 0
+                while time.perf_counter() < end:
+                    x += 1
+                out.append(Detections())
+            return out
+        return detect
+
+    raise ValueError(f"unknown detector spec: {spec!r}")
+
+
+def _to_image(frame):
+    """JPEG bytes → BGR ndarray (이미 디코딩된 ndarray면 그대로). 실패하면 None"""
+    import cv2
+    import numpy as np
+    if isinstance(frame, np.ndarray) and frame.ndim >= 2:
+        return frame
+    return cv2.imdecode(np.frombuffer(frame, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+
+def _detect_batch(detect, frames):
+    """None(디코딩 실패/대체된 프레임)은 건너뛰고 나머지만 한 번에 detect"""
+    ok = [i for i, f in enumerate(frames) if f is not None]
+    results = [None] * len(frames)
+    for i, d in zip(ok, detect([frames[i] for i in ok]) if ok else []):
+        results[i] = d
+    return results
+
+
+def worker_main(index, address, detector, model_path, conf, torch_threads, ring_name=None):
+    """
+    worker 프로세스: batch 수신 → predict → 프레임별 결과 리스트 반환
+      jpeg 전송: batch = [JPEG bytes, ...] → 여기서 디코딩
+      shm 전송 : batch = [(slot, version), ...] → 공유 메모리 프레임을 복사 없이 읽음
+                 슬롯에 안 맞는 프레임은 (slot, version) 대신 ndarray/JPEG bytes 그대로 pipe로 옴
+    """
+    if torch_threads:
+        import torch
+        torch.set_num_threads(torch_threads)
+        torch.set_num_interop_threads(1)
+    try:
+        import cv2
+        cv2.setNumThreads(1)
+    except ImportError:
+        pass
+    detect = build_detector(detector, model_path, conf)
+    ring = SharedFrameRing(ring_name) if ring_name else None
+
+    conn = Client(address, authkey=bytes.fromhex(os.environ[AUTHKEY_ENV]))
+    conn.send(index)
+    while True:
+        try:
+            batch = conn.recv()
+        except EOFError:
+            break
+        if batch is None:
+            break
+        try:
+            if ring is None:
+                conn.send(("ok", _detect_batch(detect, [_to_image(j) for j in batch])))
+                continue
+            refs, frames = [], []
+            for item in batch:
+                if isinstance(item, tuple):
+                    slot, version = item
+                    ref = ring.read(slot, after_version=version - 1)
+                    ref = ref if ref is not None and ref.version == version else None
+                    refs.append(ref)
+                    frames.append(ref.image if ref is not None else None)
+                else:
+                    refs.append(None)
+                    frames.append(_to_image(item))
+            results = _detect_batch(detect, frames)
+            # 추론하는 동안 덮어써진 슬롯의 결과는 버림 (seqlock 검증)
+            results = [res if r is None or ring.is_valid(r) else None for r, res in zip(refs, results)]
+            conn.send(("ok", results))
+        except Exception as e:
+            conn.send(("error", repr(e)))
+    conn.close()
+    if ring is not None:
+        ring.close()
+
+
+# ------------------ 수신 프로세스 쪽 ------------------
+class ShardedAnalyzer:
+    """
+    predict(device_id, frame) -> detections (디바이스 워커 스레드에서 호출, 결과까지 대기)
+      transport="jpeg": frame은 JPEG bytes, worker에서 디코딩
+      transport="shm" : frame은 이미 디코딩된 BGR ndarray, 공유 메모리 슬롯에 한 번 복사하고
+                        worker는 복사 없이 읽음 (수신 쪽에서 motion gate 등으로 이미 디코딩한 경우)
+                        frame_shape 슬롯에 안 맞는 프레임만 jpeg 전송처럼 pipe로 보냄 (batch의 다른 프레임은 그대로)
+      None: 더 새 프레임으로 대체됐거나 deadline 초과 또는 디코딩 실패
+    """
+    def __init__(self, num_workers, model_path=None, detector="yolo", conf=0.5, torch_threads=None,
+                 max_batch_size=8, max_wait_ms=10.0, deadline_ms=500.0, start_timeout=120.0,
+                 transport="jpeg", max_devices=64, frame_shape=(480, 640, 3)):
+        if transport not in ("jpeg", "shm"):
+            raise ValueError(f"transport must be 'jpeg' or 'shm', got {transport!r}")
+        if num_workers < 1:
+            raise ValueError("num_workers must be >= 1")
+        if torch_threads is None:
+            torch_threads = max(1, (os.cpu_count() or 1) // num_workers)
+        self.num_workers = num_workers
+        self.ring = HashRing(range(num_workers))
+        self.routes = {}     # device_id -> worker index
+        self.transport = transport
+        self.frames = SharedFrameRing(max_devices=max_devices, frame_shape=frame_shape, create=True) \
+            if transport == "shm" else None
+        ring_args = ["--ring", self.frames.name] if self.frames is not None else []
+        self.pipe_frames = 0   # shm 전송인데 슬롯에 안 맞아 pipe로 보낸 프레임 수
+
+        authkey = secrets.token_bytes(16)
+        self._listener = Listener(("127.0.0.1", 0), authkey=authkey)
+        env = dict(os.environ, **{AUTHKEY_ENV: authkey.hex()})
+        host, port = self._listener.address
+        self._procs = [
+            subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), "worker",
+                 "--index", str(i), "--address", f"{host}:{port}", "--detector", detector,
+                 "--model", model_path or "", "--conf", str(conf), "--torch-threads", str(torch_threads), *ring_args],
+                env=env,
+            )
+            for i in range(num_workers)
+        ]
+
+        self._conns = [None] * num_workers
+        deadline = time.time() + start_timeout
+        for _ in range(num_workers):
+            if time.time() > deadline:
+                self.close()
+                raise TimeoutError("sharded analyzer workers did not connect in time")
+            conn = self._listener.accept()
+            self._conns[conn.recv()] = conn
+
+        self._shards = [
+            DeviceBatchScheduler(self._remote(i), max_batch_size=max_batch_size, max_wait_ms=max_wait_ms,
+                                 deadline_ms=deadline_ms, name=f"shard-{i}")
+            for i in range(num_workers)
+        ]
+
+    def _remote(self, index):
+        conn = self._conns[index]
+
+        def predict_batch(items):
+            # shard당 DeviceBatchScheduler 스레드 하나만 호출 → 연결당 in-flight batch 1개
+            if self.frames is None:
+                conn.send([bytes(j) for j in items])
+            else:
+                # 슬롯 writer도 이 스레드 하나 (디바이스는 한 shard에만 속함)
+                conn.send([self._shm_item(d, f) for d, f in items])
+            status, payload = conn.recv()
+            if status != "ok":
+                raise RuntimeError(f"worker {index}: {payload}")
+            return payload
+        return predict_batch
+
+    def _shm_item(self, device_id, frame):
+        if self.frames.fits(frame):
+            return (self.frames.slot_of(device_id, assign=True), self.frames.write(device_id, frame))
+        # 크기/타입이 슬롯에 안 맞으면 이 프레임만 pipe로 (batch 전체를 실패시키지 않음)
+        self.pipe_frames += 1
+        return frame
+
+    def shard_for(self, device_id):
+        index = self.routes.get(device_id)
+        if index is None:
+            index = self.routes[device_id] = self.ring.node_for(device_id)
+        return index
+
+    def submit(self, device_id, frame):
+        item = frame if self.frames is None else (device_id, frame)
+        return self._shards[self.shard_for(device_id)].submit(device_id, item)
+
+    def predict(self, device_id, frame, timeout=None):
+        return self.submit(device_id, frame).result(timeout)
+
+    def stats(self):
+        return {
+            "workers": self.num_workers,
+            "routes": dict(self.routes),
+            "shards": [s.stats() for s in self._shards] if hasattr(self, "_shards") else [],
+            "frames": self.frames.stats() if self.frames is not None else {},
+            "pipe_frames": self.pipe_frames,
+        }
+
+    def close(self, timeout=5.0):
+        for shard in getattr(self, "_shards", []):
+            shard.close(timeout)
+        for conn in self._conns:
+            if conn is None:
+                continue
+            try:
+                conn.send(None)
+                conn.close()
+            except OSError:
+                pass
+        for proc in self._procs:
+            try:
+                proc.wait(timeout)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        self._listener.close()
+        if self.frames is not None:
+            self.frames.close()
+
+
+class LocalAnalyzer:
+    """단일 프로세스 모드 (기존 방식): 같은 프로세스에서 batch scheduler + 모델 하나"""
+    def __init__(self, model_path=None, detector="yolo", conf=0.5, max_batch_size=8, max_wait_ms=10.0,
+                 deadline_ms=500.0):
+        detect = build_detector(detector, model_path, conf)
+
+        def predict_batch(frames):
+            return _detect_batch(detect, [_to_image(f) for f in frames])
+
+        self._scheduler = DeviceBatchScheduler(predict_batch, max_batch_size=max_batch_size,
+                                               max_wait_ms=max_wait_ms, deadline_ms=deadline_ms)
+
+    def predict(self, device_id, frame, timeout=None):
+        """frame: JPEG bytes 또는 디코딩된 BGR ndarray"""
+        return self._scheduler.predict(device_id, frame, timeout)
+
+    def stats(self):
+        return {"workers": 0, "shards": [self._scheduler.stats()]}
+
+    def close(self, timeout=5.0):
+        self._scheduler.close(timeout)
+
+
+def make_analyzer(num_workers, **kwargs):
+    """num_workers 0 → 단일 프로세스, 1 이상 → worker 프로세스 N개"""
+    if num_workers <= 0:
+        for key in ("torch_threads", "transport", "max_devices", "frame_shape"):
+            kwargs.pop(key, None)
+        return LocalAnalyzer(**kwargs)
+    return ShardedAnalyzer(num_workers, **kwargs)
+
+
+# ------------------ 벤치마크 ------------------
+def _sample_jpegs(image_dir, count=16):
+    import cv2
+    import numpy as np
+    jpegs = []
+    if image_dir and os.path.isdir(image_dir):
+        for root, _, files in os.walk(image_dir):
+            for name in sorted(files):
+                if name.lower().endswith((".jpg", ".jpeg", ".png")) and len(jpegs) < count:
+                    img = cv2.imread(os.path.join(root, name))
+                    if img is not None:
+                        img = cv2.resize(img, (640, 480))
+                        jpegs.append(cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes())
+    rng = np.random.default_rng(0)
+    while len(jpegs) < count:
+        img = rng.integers(0, 255, (480, 640, 3), dtype=np.uint8)
+        jpegs.append(cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes())
+    return jpegs
+
+
+def bench(args):
+    import numpy as np
+    frames = _sample_jpegs(args.images)
+    if args.transport == "shm":
+        frames = [_to_image(j) for j in frames]   # 수신 쪽에서 이미 디코딩한 프레임을 넘기는 경우
+    devices = [f"raspi-cam-{i:02d}" for i in range(1, args.devices + 1)]
+    report = []
+    for workers in args.workers:
+        analyzer = make_analyzer(workers, model_path=args.model, detector=args.detector, conf=args.conf,
+                                 torch_threads=args.torch_threads or None, transport=args.transport)
+        latencies, done, dropped = [], [0], [0]
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def device_loop(device_id):
+            i = 0
+            while not stop.is_set():
+                start = time.perf_counter()
+                res = analyzer.predict(device_id, frames[i % len(frames)])
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    if res is None:
+                        dropped[0] += 1
+                    else:
+                        done[0] += 1
+                        latencies.append(elapsed)
+                i += 1
+
+        # 워밍업 (모델 첫 호출)
+        for d in devices:
+            analyzer.predict(d, frames[0])
+        threads = [threading.Thread(target=device_loop, args=(d,), daemon=True) for d in devices]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - start
+        stats = analyzer.stats()
+        analyzer.close()
+
+        lat = np.asarray(latencies) if latencies else np.zeros(1)
+        row = {
+            "workers": workers,
+            "fps": round(done[0] / elapsed, 2),
+            "latency_ms_p50": round(float(np.percentile(lat, 50)), 1),
+            "latency_ms_p95": round(float(np.percentile(lat, 95)), 1),
+            "dropped": dropped[0],
+            "avg_batch_size": [s["avg_batch_size"] for s in stats["shards"]],
+        }
+        report.append(row)
+        print(row)
+
+    base = report[0]["fps"] or 1e-9
+    print(f"\n{'workers':>8} {'fps':>8} {'speedup':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for row in report:
+        print(f"{row['workers']:>8} {row['fps']:>8} {row['fps'] / base:>8.2f} "
+              f"{row['latency_ms_p50']:>8} {row['latency_ms_p95']:>8}")
+    print(f"(cpu_count={os.cpu_count()}, devices={args.devices}, detector={args.detector}, "
+          f"transport={args.transport})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded multi-process analyzer")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    w = sub.add_parser("worker", help="(내부용) worker 프로세스")
+    w.add_argument("--index", type=int, required=True)
+    w.add_argument("--address", required=True)
+    w.add_argument("--detector", default="yolo")
+    w.add_argument("--model", default="")
+    w.add_argument("--conf", type=float, default=0.5)
+    w.add_argument("--torch-threads", type=int, default=0)
+    w.add_argument("--ring", default=None, help="shm 전송일 때 공유 메모리 이름")
+
+    b = sub.add_parser("bench", help="단일 프로세스 vs worker N개 처리량/지연 비교")
+    b.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    b.add_argument("--devices", type=int, default=6)
+    b.add_argument("--seconds", type=float, default=10.0)
+    b.add_argument("--detector", default="yolo", help='"yolo" 또는 "cpu:<ms>"')
+    b.add_argument("--model", default="yolov8n.pt")
+    b.add_argument("--conf", type=float, default=0.5)
+    b.add_argument("--torch-threads", type=int, default=0, help="0이면 cpu_count / workers")
+    b.add_argument("--transport", choices=("jpeg", "shm"), default="jpeg")
+    b.add_argument("--images", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "현장사진"))
+
+    args = parser.parse_args()
+    if args.cmd == "worker":
+        host, port = args.address.rsplit(":", 1)
+        worker_main(args.index, (host, int(port)), args.detector, args.model or None, args.conf,
+                    args.torch_threads, args.ring)
+    else:
+        bench(args)
+
+
+if __name__ == "__main__":
+    main()
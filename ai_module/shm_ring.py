@@ -0,0 +1,233 @@
+# shm_ring.py
+# 수신(ingest) 프로세스 → 추론 프로세스로 디코딩된 프레임을 넘기는 공유 메모리 버퍼
+# - multiprocessing.shared_memory 하나에 디바이스당 고정 슬롯 1개 (프레임 최대 크기는 생성 시 고정)
+# - 슬롯마다 seqlock 카운터: 쓰는 중이면 홀수, 다 쓰면 짝수. version = seq // 2
+# - 생산자는 항상 덮어쓰기 (최신 프레임만 유지, DeviceHandler의 Queue(maxsize=1) drop-oldest와 같은 의미)
+# - 소비자는 read()로 공유 메모리를 그대로 가리키는 ndarray를 받음 (pickle/복사 없음)
+#   다 쓴 뒤 is_valid(ref)로 그 사이 덮어써지지 않았는지 확인 → False면 결과를 버리고 최신 프레임으로 다시
+#   안전하게 복사본이 필요하면 read_copy()
+# 슬롯당 생산자는 한 명이어야 함 (seqlock은 writer끼리 보호하지 않음)
+# 정렬된 int64 카운터 하나씩만 갱신하므로 x86-64/ARM64에서 찢어진 카운터 값은 보이지 않음
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+MAGIC = 0x46535243524E4731   # "FSRCRNG1"
+DEVICE_ID_BYTES = 32
+_ALIGN = 64
+
+# 슬롯 메타데이터 (int64) 컬럼
+SEQ, HEIGHT, WIDTH, CHANNELS, READ_VERSION, WRITTEN, OVERWRITTEN = range(7)
+_META_COLS = 8
+
+
+def _align(n):
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+class FrameRef:
+    """read() 결과. image는 공유 메모리 view라서 is_valid()로 확인하기 전까지는 덮어써질 수 있음"""
+    __slots__ = ("slot", "seq", "image", "capture_ts")
+
+    def __init__(self, slot, seq, image, capture_ts):
+        self.slot = slot
+        self.seq = seq
+        self.image = image
+        self.capture_ts = capture_ts
+
+    @property
+    def version(self):
+        return self.seq // 2
+
+
+class SharedFrameRing:
+    """
+    생성(ingest 쪽):  ring = SharedFrameRing(max_devices=16, frame_shape=(480, 640, 3), create=True)
+    연결(worker 쪽):  ring = SharedFrameRing(ring.name)
+    """
+    def __init__(self, name=None, max_devices=16, frame_shape=(480, 640, 3), create=False):
+        if create:
+            slot_bytes = _align(int(np.prod(frame_shape)))
+            size = self._layout(max_devices, slot_bytes)
+            self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            self._map(max_devices, slot_bytes)
+            self._header[:] = (MAGIC, max_devices, slot_bytes, 0)
+            self._meta[:] = 0
+            self._names[:] = b""
+        else:
+            self._shm = shared_memory.SharedMemory(name=name)
+            # Python < 3.13: 연결만 한 프로세스가 종료될 때 resource_tracker가 공유 메모리를 지워버리는 것 방지
+            try:
+                resource_tracker.unregister(self._shm._name, "shared_memory")
+            except Exception:
+                pass
+            magic, max_devices, slot_bytes = np.ndarray((3,), dtype=np.int64, buffer=self._shm.buf)
+            if magic != MAGIC:
+                self._shm.close()
+                raise ValueError(f"{name!r} is not a shared frame ring")
+            self._map(int(max_devices), int(slot_bytes))
+        self.owner = create
+        self._slots = {}   # device_id -> slot (캐시)
+
+    @staticmethod
+    def _layout(max_devices, slot_bytes):
+        header = _ALIGN
+        meta = _align(max_devices * _META_COLS * 8)
+        ts = _align(max_devices * 8)
+        names = _align(max_devices * DEVICE_ID_BYTES)
+        return header + meta + ts + names + max_devices * slot_bytes
+
+    def _map(self, max_devices, slot_bytes):
+        buf = self._shm.buf
+        self.max_devices = max_devices
+        self.slot_bytes = slot_bytes
+        off = 0
+        self._header = np.ndarray((4,), dtype=np.int64, buffer=buf, offset=off)
+        off += _ALIGN
+        self._meta = np.ndarray((max_devices, _META_COLS), dtype=np.int64, buffer=buf, offset=off)
+        off += _align(max_devices * _META_COLS * 8)
+        self._ts = np.ndarray((max_devices,), dtype=np.float64, buffer=buf, offset=off)
+        off += _align(max_devices * 8)
+        self._names = np.ndarray((max_devices,), dtype=f"S{DEVICE_ID_BYTES}", buffer=buf, offset=off)
+        off += _align(max_devices * DEVICE_ID_BYTES)
+        self._data = np.ndarray((max_devices, slot_bytes), dtype=np.uint8, buffer=buf, offset=off)
+
+    @property
+    def name(self):
+        return self._shm.name
+
+    # ---------- 슬롯 ----------
+    def slot_of(self, device_id, assign=False):
+        """device_id의 슬롯 번호. 없으면 assign=True일 때만 새로 배정 (생산자 쪽), 아니면 None"""
+        slot = self._slots.get(device_id)
+        if slot is not None:
+            return slot
+        key = device_id.encode("utf-8")
+        if len(key) > DEVICE_ID_BYTES:
+            raise ValueError(f"device_id longer than {DEVICE_ID_BYTES} bytes: {device_id!r}")
+        used = int(self._header[3])
+        for i in range(used):
+            if self._names[i] == key:
+                self._slots[device_id] = i
+                return i
+        if not assign:
+            return None
+        if used >= self.max_devices:
+            raise RuntimeError(f"shared frame ring is full ({self.max_devices} devices)")
+        self._names[used] = key
+        self._header[3] = used + 1   # 이름을 쓴 뒤에 공개
+        self._slots[device_id] = used
+        return used
+
+    def devices(self):
+        return [n.decode("utf-8") for n in self._names[:int(self._header[3])]]
+
+    def _slot(self, key):
+        return key if isinstance(key, (int, np.integer)) else self.slot_of(key)
+
+    # ---------- 생산자 ----------
+    def fits(self, frame):
+        """write()로 슬롯에 넣을 수 있는 프레임이면 True (uint8 ndarray, 슬롯 크기 이하)"""
+        return isinstance(frame, np.ndarray) and frame.dtype == np.uint8 and frame.nbytes <= self.slot_bytes
+
+    def write(self, device_id, frame, capture_ts=None):
+        """frame(uint8 HxW 또는 HxWxC)을 슬롯에 한 번 복사. 새 version 반환"""
+        frame = np.asarray(frame)
+        if frame.dtype != np.uint8:
+            raise ValueError(f"frame must be uint8, got {frame.dtype}")
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"frame of {frame.nbytes} bytes does not fit slot of {self.slot_bytes} bytes")
+        slot = self.slot_of(device_id, assign=True)
+        meta = self._meta[slot]
+        h, w = frame.shape[:2]
+        c = frame.shape[2] if frame.ndim == 3 else 1
+
+        seq = int(meta[SEQ])
+        if seq // 2 > meta[READ_VERSION]:
+            meta[OVERWRITTEN] += 1   # 한 번도 읽히지 않고 덮어써짐
+        meta[SEQ] = seq + 1          # 홀수: 쓰는 중
+        self._data[slot, :frame.nbytes].reshape(frame.shape)[...] = frame
+        meta[HEIGHT], meta[WIDTH], meta[CHANNELS] = h, w, c
+        self._ts[slot] = time.time() if capture_ts is None else capture_ts
+        meta[WRITTEN] += 1
+        meta[SEQ] = seq + 2          # 짝수: 완료
+        return (seq + 2) // 2
+
+    # ---------- 소비자 ----------
+    def _view(self, slot, h, w, c):
+        shape = (h, w) if c == 1 else (h, w, c)
+        return self._data[slot, :h * w * c].reshape(shape)
+
+    def read(self, key, after_version=0, spin=1000):
+        """
+        after_version보다 새 프레임이 있으면 FrameRef(image는 공유 메모리 view), 없으면 None
+        쓰는 중이면 spin번까지 다시 시도
+        """
+        slot = self._slot(key)
+        if slot is None:
+            return None
+        meta = self._meta[slot]
+        for _ in range(spin):
+            seq = int(meta[SEQ])
+            if seq & 1:
+                continue
+            if seq // 2 <= after_version:
+                return None
+            h, w, c = int(meta[HEIGHT]), int(meta[WIDTH]), int(meta[CHANNELS])
+            ts = float(self._ts[slot])
+            if int(meta[SEQ]) != seq:
+                continue
+            if meta[READ_VERSION] < seq // 2:
+                meta[READ_VERSION] = seq // 2
+            return FrameRef(slot, seq, self._view(slot, h, w, c), ts)
+        return None
+
+    def is_valid(self, ref):
+        """ref를 읽은 뒤로 슬롯이 덮어써지지 않았으면 True (view로 계산한 결과를 써도 됨)"""
+        return int(self._meta[ref.slot, SEQ]) == ref.seq
+
+    def read_copy(self, key, after_version=0, retries=10):
+        """read() + 복사 + seqlock 검증. 찢어지지 않은 복사본이 담긴 FrameRef 또는 None"""
+        for _ in range(retries):
+            ref = self.read(key, after_version)
+            if ref is None:
+                return None
+            image = ref.image.copy()
+            if self.is_valid(ref):
+                ref.image = image
+                return ref
+        return None
+
+    def wait(self, key, after_version=0, timeout=None, poll=0.001):
+        """after_version보다 새 프레임이 올 때까지 polling → FrameRef 또는 timeout이면 None"""
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            ref = self.read(key, after_version)
+            if ref is not None:
+                return ref
+            if end is not None and time.monotonic() >= end:
+                return None
+            time.sleep(poll)
+
+    # ---------- 종료 / 상태 ----------
+    def stats(self):
+        out = {}
+        for i, device_id in enumerate(self.devices()):
+            meta = self._meta[i]
+            out[device_id] = {
+                "version": int(meta[SEQ]) // 2,
+                "written": int(meta[WRITTEN]),
+                "overwritten": int(meta[OVERWRITTEN]),
+            }
+        return out
+
+    def close(self):
+        # 내부 view부터 정리. 밖에 FrameRef view가 남아 있으면 매핑은 GC 때 해제됨
+        self._header = self._meta = self._ts = self._names = self._data = None
+        try:
+            self._shm.close()
+        except BufferError:
+            pass
+        if self.owner:
+            self._shm.unlink()
@@ -0,0 +1,178 @@
+# tracker.py
+# SORT 스타일 다중 객체 추적기 (Kalman 등속 모델 + IoU 매칭)
+# 컨베이어 위 같은 옷에 같은 track id를 붙여서
+#  - 세분류는 새 track이거나 아직 확신이 낮을 때만 수행 (라벨은 투표로 결정)
+#  - 캡처는 track당 한 번, 박스 중심이 화면 중앙선을 지날 때
+import numpy as np
+
+
+def iou_matrix(a, b):
+    """a: [N,4], b: [M,4] (x1,y1,x2,y2) → [N,M]"""
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    a = np.asarray(a, dtype=np.float32)[:, None, :]
+    b = np.asarray(b, dtype=np.float32)[None, :, :]
+    iw = np.clip(np.minimum(a[..., 2], b[..., 2]) - np.maximum(a[..., 0], b[..., 0]), 0, None)
+    ih = np.clip(np.minimum(a[..., 3], b[..., 3]) - np.maximum(a[..., 1], b[..., 1]), 0, None)
+    inter = iw * ih
+    area_a = (a[..., 2] - a[..., 0]) * (a[..., 3] - a[..., 1])
+    area_b = (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])
+    return inter / np.maximum(area_a + area_b - inter, 1e-6)
+
+
+def _box_to_z(box):
+    x1, y1, x2, y2 = box
+    w, h = x2 - x1, y2 - y1
+    return np.array([x1 + w / 2, y1 + h / 2, w * h, w / max(h, 1e-6)], dtype=np.float64)
+
+
+def _x_to_box(x):
+    cx, cy, s, r = x[:4]
+    w = np.sqrt(max(s * r, 0.0))
+    h = s / w if w > 0 else 0.0
+    return (cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2)
+
+
+class KalmanBox:
+    """상태 [cx, cy, s, r, vcx, vcy, vs] (SORT와 동일한 등속 모델)"""
+    def __init__(self, box):
+        self.F = np.eye(7)
+        self.F[0, 4] = self.F[1, 5] = self.F[2, 6] = 1.0
+        self.H = np.eye(4, 7)
+        self.R = np.diag([1.0, 1.0, 10.0, 10.0])
+        self.Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.0001])
+        self.P = np.diag([10.0, 10.0, 10.0, 10.0, 1e4, 1e4, 1e4])
+        self.x = np.zeros(7)
+        self.x[:4] = _box_to_z(box)
+
+    def predict(self):
+        if self.x[2] + self.x[6] <= 0:
+            self.x[6] = 0.0
+        self.x = self.F @ self.x
+        self.P = self.F @ self.P @ self.F.T + self.Q
+        return _x_to_box(self.x)
+
+    def update(self, box):
+        z = _box_to_z(box)
+        y = z - self.H @ self.x
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(7) - K @ self.H) @ self.P
+
+    @property
+    def box(self):
+        return _x_to_box(self.x)
+
+
+class Track:
+    def __init__(self, track_id, det):
+        self.track_id = track_id
+        self.kf = KalmanBox(det["box"])
+        self.category = det.get("category")
+        self.score = det.get("score", 0.0)
+        self.hits = 1
+        self.time_since_update = 0
+        self.prev_cx = None
+        self.cx = (det["box"][0] + det["box"][2]) / 2
+        self.votes = {}          # fine_label -> confidence 합
+        self.vote_counts = {}    # fine_label -> 투표 수
+        self.best_conf = 0.0
+        self.num_classified = 0
+        self.captured = False
+
+    def update(self, det):
+        self.kf.update(det["box"])
+        self.category = det.get("category", self.category)
+        self.score = det.get("score", self.score)
+        self.hits += 1
+        self.time_since_update = 0
+        self.prev_cx, self.cx = self.cx, (det["box"][0] + det["box"][2]) / 2
+
+    def add_vote(self, fine_label, fine_conf):
+        self.votes[fine_label] = self.votes.get(fine_label, 0.0) + fine_conf
+        self.vote_counts[fine_label] = self.vote_counts.get(fine_label, 0) + 1
+        self.best_conf = max(self.best_conf, fine_conf)
+        self.num_classified += 1
+
+    @property
+    def fine_label(self):
+        if not self.votes:
+            return None
+        return max(self.votes, key=self.votes.get)
+
+    @property
+    def fine_conf(self):
+        """투표 1등 라벨의 평균 confidence"""
+        if not self.votes:
+            return 0.0
+        label = self.fine_label
+        return self.votes[label] / self.vote_counts[label]
+
+    def needs_classification(self, conf_threshold, max_votes=5):
+        if self.num_classified == 0:
+            return True
+        return self.fine_conf < conf_threshold and self.num_classified < max_votes
+
+    def crossed_center(self, frame_w, tol=20):
+        """박스 중심이 중앙선 근처(tol px)에 있거나 이번 프레임에 중앙선을 넘었으면 True"""
+        center = frame_w / 2
+        if abs(self.cx - center) < tol:
+            return True
+        return self.prev_cx is not None and (self.prev_cx - center) * (self.cx - center) < 0
+
+    @property
+    def box(self):
+        return self.kf.box
+
+
+class MultiObjectTracker:
+    """
+    update(detections) 호출마다 [(det, track), ...]를 검출 순서대로 반환
+    detections: [{"box": (x1,y1,x2,y2), "category": ..., "score": ...}, ...]
+    """
+    def __init__(self, iou_threshold=0.3, max_age=10, match_category=True):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.match_category = match_category
+        self.tracks = []
+        self._next_id = 1
+
+    def update(self, detections):
+        predicted = [t.kf.predict() for t in self.tracks]
+        for t in self.tracks:
+            t.time_since_update += 1
+
+        iou = iou_matrix(predicted, [d["box"] for d in detections])
+        if self.match_category and iou.size:
+            for ti, t in enumerate(self.tracks):
+                for di, d in enumerate(detections):
+                    if d.get("category") != t.category:
+                        iou[ti, di] = 0.0
+
+        # IoU 큰 순서대로 greedy 매칭
+        matched_det = {}
+        used_tracks = set()
+        if iou.size:
+            order = np.argsort(-iou, axis=None)
+            for flat in order:
+                ti, di = divmod(int(flat), iou.shape[1])
+                if iou[ti, di] < self.iou_threshold:
+                    break
+                if ti in used_tracks or di in matched_det:
+                    continue
+                used_tracks.add(ti)
+                matched_det[di] = self.tracks[ti]
+                self.tracks[ti].update(detections[di])
+
+        results = []
+        for di, det in enumerate(detections):
+            track = matched_det.get(di)
+            if track is None:
+                track = Track(self._next_id, det)
+                self._next_id += 1
+                self.tracks.append(track)
+            results.append((det, track))
+
+        self.tracks = [t for t in self.tracks if t.time_since_update <= self.max_age]
+        return results
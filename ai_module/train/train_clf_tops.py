@@ -1,11 +1,24 @@
 # train_clf_tops.py
 import os
+import sys
 import torch
 import torchvision
 import torch.nn as nn
 import torch.optim as optim
 from torchvision import transforms, datasets
 
+# ai_module/multihead.py 사용
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from multihead import MultiHeadClassifier, save_multihead
+
+# multi-head 학습 시 대분류 → 데이터 폴더 (각 폴더 안에 train/<class>, val/<class>)
+MULTIHEAD_DATA_DIRS = {
+    "상의": "datasets/fine_tops",
+    "하의": "datasets/fine_bottoms",
+    "아우터": "datasets/fine_outer",
+    "치마": "datasets/fine_skirt",
+}
+
 def train_clf_tops(data_dir="datasets/fine_tops", epochs=10, lr=0.001, out="model_files/effb3_tops.pth"):
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     train_tf = transforms.Compose([
@@ -81,5 +94,116 @@ def train_clf_tops(data_dir="datasets/fine_tops", epochs=10, lr=0.001, out="mode
     torch.save(savedict, out)
     print(f"Saved => {out}")
 
+
+class _HeadDataset(torch.utils.data.Dataset):
+    """ImageFolder 샘플에 head 번호를 붙여서 반환 → (img, label, head_idx)"""
+    def __init__(self, ds, head_idx):
+        self.ds = ds
+        self.head_idx = head_idx
+
+    def __len__(self):
+        return len(self.ds)
+
+    def __getitem__(self, idx):
+        img, label = self.ds[idx]
+        return img, label, self.head_idx
+
+
+def _multihead_step(model, criterion, imgs, labels, head_ids, head_cats):
+    """backbone 한 번 통과 후 head별 loss를 샘플 수 비율로 합산"""
+    emb = model.embed(imgs)
+    loss = 0.0
+    correct = 0
+    for h, cat in enumerate(head_cats):
+        mask = head_ids == h
+        n = int(mask.sum().item())
+        if n == 0:
+            continue
+        outs = model.head_logits(emb[mask], cat)
+        loss = loss + criterion(outs, labels[mask]) * (n / labels.size(0))
+        correct += (outs.argmax(dim=1) == labels[mask]).sum().item()
+    return loss, correct
+
+
+def train_clf_multihead(data_dirs=None, epochs=10, lr=0.001, batch_size=32, out="model_files/effb3_multihead.pth"):
+    """
+    backbone 하나 + 대분류별 head를 같이 학습
+    data_dirs: {"상의": "datasets/fine_tops", ...} (기본값 MULTIHEAD_DATA_DIRS)
+    """
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    data_dirs = data_dirs or MULTIHEAD_DATA_DIRS
+    train_tf = transforms.Compose([
+        transforms.Resize((300,300)),
+        transforms.RandomHorizontalFlip(),
+        transforms.ToTensor(),
+        transforms.Normalize([0.485,0.456,0.406],[0.229,0.224,0.225])
+    ])
+    val_tf = transforms.Compose([
+        transforms.Resize((300,300)),
+        transforms.ToTensor(),
+        transforms.Normalize([0.485,0.456,0.406],[0.229,0.224,0.225])
+    ])
+
+    head_cats, head_classes = [], {}
+    train_sets, val_sets = [], []
+    for cat, data_dir in data_dirs.items():
+        if not os.path.isdir(os.path.join(data_dir, "train")):
+            print(f"[SKIP] {cat}: {data_dir}/train 없음")
+            continue
+        h = len(head_cats)
+        tr = datasets.ImageFolder(os.path.join(data_dir,"train"), transform=train_tf)
+        va = datasets.ImageFolder(os.path.join(data_dir,"val"),   transform=val_tf)
+        head_cats.append(cat)
+        head_classes[cat] = tr.classes
+        train_sets.append(_HeadDataset(tr, h))
+        val_sets.append(_HeadDataset(va, h))
+        print(f"Head {cat}: {tr.classes}")
+
+    if not head_cats:
+        raise ValueError("No training data found for any head.")
+
+    train_loader = torch.utils.data.DataLoader(torch.utils.data.ConcatDataset(train_sets), batch_size=batch_size, shuffle=True)
+    val_loader   = torch.utils.data.DataLoader(torch.utils.data.ConcatDataset(val_sets),   batch_size=batch_size, shuffle=False)
+
+    model = MultiHeadClassifier(head_classes, pretrained=True)
+    model.to(device)
+
+    criterion = nn.CrossEntropyLoss()
+    optimizer = optim.Adam(model.parameters(), lr=lr)
+
+    for epoch in range(epochs):
+        model.train()
+        total_loss, correct, total = 0, 0, 0
+        for imgs, labels, head_ids in train_loader:
+            imgs, labels, head_ids = imgs.to(device), labels.to(device), head_ids.to(device)
+            optimizer.zero_grad()
+            loss, batch_correct = _multihead_step(model, criterion, imgs, labels, head_ids, head_cats)
+            loss.backward()
+            optimizer.step()
+
+            total_loss += loss.item()
+            correct += batch_correct
+            total   += labels.size(0)
+
+        print(f"[Train] epoch={epoch+1}, loss={total_loss/len(train_loader):.3f}, acc={correct/total:.3f}")
+
+        # validation
+        model.eval()
+        val_loss, val_correct, val_total = 0, 0, 0
+        with torch.no_grad():
+            for vimgs, vlabels, vheads in val_loader:
+                vimgs, vlabels, vheads = vimgs.to(device), vlabels.to(device), vheads.to(device)
+                vloss, vcorrect = _multihead_step(model, criterion, vimgs, vlabels, vheads, head_cats)
+                val_loss += vloss.item()
+                val_correct += vcorrect
+                val_total   += vlabels.size(0)
+        print(f"[Val] epoch={epoch+1}, loss={val_loss/len(val_loader):.3f}, acc={val_correct/val_total:.3f}")
+
+    save_multihead(model, out)
+    print(f"Saved => {out}")
+
 if __name__=="__main__":
-    train_clf_tops()
+    if len(sys.argv) > 1 and sys.argv[1] == "multihead":
+        train_clf_multihead()
+    else:
+        train_clf_tops()
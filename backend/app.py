@@ -1,8 +1,9 @@
 from fastapi import FastAPI, UploadFile, File, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 import base64
 import io
-from ai_module.inference import classify_image
+from ai_module.inference import classify_image, get_batch_metrics
 
 app = FastAPI()
 
@@ -22,9 +23,14 @@ def root():
 @app.post("/classify")
 async def classify_item(file: UploadFile = File(...)):
     image_bytes = await file.read()
-    label, confidence = classify_image(image_bytes)
+    # 스레드풀에서 실행해야 동시 요청들이 마이크로 배치로 묶임
+    label, confidence = await run_in_threadpool(classify_image, image_bytes)
     return {"label": label, "confidence": round(confidence, 3)}
 
+@app.get("/metrics/batching")
+def batching_metrics():
+    return get_batch_metrics()
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
@@ -45,7 +51,7 @@ async def websocket_endpoint(websocket: WebSocket):
             continue
 
         try:
-            label, confidence = classify_image(image_bytes)
+            label, confidence = await run_in_threadpool(classify_image, image_bytes)
             result = {"label": label, "confidence": round(confidence, 3)}
         except Exception as e:
             # 예외 발생 시 에러 메시지를 전송하여 프론트엔드에서 확인할 수 있도록 함
@@ -1,7 +1,15 @@
-import paho.mqtt.client as mqtt
+import os
+import sys
 import time
 
-MQTT_BROKER = "192.168.0.98"  # 라즈베리파이 IP 주소로 변경
+import paho.mqtt.client as mqtt
+
+# 브로커 설정은 ai_module/settings.py 공용 (MQTT_BROKER/MQTT_PORT 환경 변수, "local"이면 LocalBroker)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "ai_module"))
+from settings import make_mqtt_client, mqtt_broker, mqtt_port
+
+MQTT_BROKER = mqtt_broker("192.168.0.98")  # 라즈베리파이 IP 주소 (MQTT_BROKER 환경 변수로 변경)
+MQTT_PORT = mqtt_port()
 MQTT_TOPIC_PUB = "from/pc"
 MQTT_TOPIC_SUB = "from/pi"
 
@@ -10,9 +18,9 @@ def on_message(client, userdata, msg):
     message = msg.payload.decode()
     print(f"[라즈베리파이로부터 수신한 메시지]: {message}")
 
-client = mqtt.Client()
+client = make_mqtt_client(MQTT_BROKER, protocol=mqtt.MQTTv311)
 client.on_message = on_message
-client.connect(MQTT_BROKER, 1883, 60)
+client.connect(MQTT_BROKER, MQTT_PORT, 60)
 
 client.subscribe(MQTT_TOPIC_SUB)
 client.loop_start()
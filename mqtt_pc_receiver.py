@@ -1,22 +1,29 @@
-import paho.mqtt.client as mqtt
+import os
+import queue
+import sys
+
 import cv2
 import numpy as np
-import queue
 
-MQTT_BROKER = "172.30.1.98"  # 라즈베리파이 IP로 변경
+# 브로커 설정은 ai_module/settings.py 공용 (MQTT_BROKER/MQTT_PORT 환경 변수, "local"이면 LocalBroker)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "ai_module"))
+from settings import make_mqtt_client, mqtt_broker, mqtt_port
+
+MQTT_BROKER = mqtt_broker("172.30.1.98")  # 라즈베리파이 IP (MQTT_BROKER 환경 변수로 변경)
+MQTT_PORT = mqtt_port()
 MQTT_TOPIC_FRAME = "camera/frame"
 
 frame_queue = queue.Queue(maxsize=1)
 
-# MQTT v5로 업데이트 (DeprecationWarning 제거)
+# MQTT v5 (make_mqtt_client 기본값, paho 2.x에서는 VERSION2 콜백 API)
 def on_message(client, userdata, msg):
     if frame_queue.full():
         frame_queue.get_nowait()
     frame_queue.put_nowait(msg.payload)
 
-client = mqtt.Client(mqtt.CallbackAPIVersion.VERSION2, protocol=mqtt.MQTTv5)
+client = make_mqtt_client(MQTT_BROKER)
 client.on_message = on_message
-client.connect(MQTT_BROKER, 1883, 60)
+client.connect(MQTT_BROKER, MQTT_PORT, 60)
 client.subscribe(MQTT_TOPIC_FRAME)
 client.loop_start()
 
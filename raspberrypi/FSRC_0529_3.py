@@ -10,11 +10,16 @@ import tty
 import busio
 import digitalio
 import board
-import paho.mqtt.client as mqtt
 import json
+import os
 from adafruit_mcp3xxx.mcp3008 import MCP3008
 from adafruit_mcp3xxx.analog_in import AnalogIn
 
+# 명령 수신 확인(지연 추적)은 서버와 같은 모듈 사용 (ai_module/latency_trace.py, 파이에는 옆에 복사해도 됨)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_module"))
+from latency_trace import ack_command, install_echo
+from settings import make_mqtt_client, mqtt_broker, mqtt_port
+
 # GPIO 설정
 PUL_PIN = 18
 DIR_PIN = 27
@@ -58,19 +63,21 @@ def restore_terminal(): termios.tcsetattr(fd, termios.TCSADRAIN, original_term_s
 # MQTT 설정
 cmd = "off"
 DEVICE_ID = "raspi-01"
-MQTT_BROKER = "172.30.1.88"
-MQTT_PORT = 1883
+MQTT_BROKER = mqtt_broker("172.30.1.88")
+MQTT_PORT = mqtt_port()
 MQTT_TOPIC = f"camera/frame/{DEVICE_ID}"
 MQTT_TOPIC_SUBSCRIBE = f"image/command/{DEVICE_ID}"
 
-client = mqtt.Client(protocol=mqtt.MQTTv5)
+client = make_mqtt_client(MQTT_BROKER)
 client.connect(MQTT_BROKER, MQTT_PORT, 60)
 client.subscribe(MQTT_TOPIC_SUBSCRIBE)
+install_echo(client, DEVICE_ID)   # 서버의 시계 차이 추정용 ping에 응답
 client.loop_start()
 
 def on_message(client, userdata, msg):
     global cmd
     if msg.topic.endswith(DEVICE_ID):
+        ack_command(client, DEVICE_ID, msg)   # 명령 수신 시각을 서버로 (지연 추적)
         cmd = msg.payload.decode()
         print(f"[MQTT 명령 수신] → {cmd}")
 
@@ -1,16 +1,21 @@
-import sys, select, tty, termios, time
+import os, sys, select, tty, termios, time
 import cv2
 from picamera2 import Picamera2
-import paho.mqtt.client as mqtt
 import numpy as np
-import base64
 import serial
-import json
 import threading
 
+# 서버와 같은 프레임 포맷 모듈 사용 (ai_module/frame_codec.py, 파이에는 이 스크립트 옆에 복사해도 됨)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_module"))
+from frame_codec import encode_frame
+from latency_trace import Trace, install_echo, trace_properties
+from settings import make_mqtt_client, mqtt_broker, mqtt_port
+
 # MQTT 설정
-MQTT_BROKER = "172.30.1.88"  # ⚠️ Pi Zero에서는 서버의 IP로 변경 필요
-MQTT_TOPIC_FRAME = "camera/frame/raspi-cam-01"
+MQTT_BROKER = mqtt_broker("172.30.1.88")  # ⚠️ Pi Zero에서는 서버의 IP로 변경 필요
+MQTT_PORT = mqtt_port()
+DEVICE_ID = "raspi-cam-01"
+MQTT_TOPIC_FRAME = f"camera/frame/{DEVICE_ID}"
 
 # 카메라 및 거리 초기값
 ExTime = 3000
@@ -19,8 +24,9 @@ latest_distance = 0
 user_stop_requested = False
 
 # MQTT 초기화
-client = mqtt.Client(protocol=mqtt.MQTTv5)
-client.connect(MQTT_BROKER, 1883, 60)
+client = make_mqtt_client(MQTT_BROKER)
+client.connect(MQTT_BROKER, MQTT_PORT, 60)
+install_echo(client, DEVICE_ID)   # 서버의 시계 차이 추정용 ping에 응답
 client.loop_start()
 
 # 카메라 초기화
@@ -33,20 +39,25 @@ print("📸 카메라 시작됨")
 
 # 카메라 프레임 송신 스레드
 def camera_realtime():
+    seq = 0
     while not user_stop_requested:
         frame = picam2.capture_array()
+        trace = Trace.start(DEVICE_ID, seq)   # 캡처 → 서버 명령까지 지연 추적 (MQTT v5 user property)
+        captured_at = trace.marks["capture"][1]
         ret, jpeg = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), 80])
         if not ret:
             continue
-        b64_jpeg = base64.b64encode(jpeg.tobytes()).decode('utf-8')
-
-        payload = {
-            "distance": latest_distance,
-            "current_speed": "0",
-            "move_state": False,
-            "frame": b64_jpeg
-        }
-        client.publish(MQTT_TOPIC_FRAME, json.dumps(payload))
+        trace.mark("encode")
+
+        # binary 헤더(디바이스/seq/캡처시각/센서값) + JPEG 원본 (base64/JSON 없음)
+        payload = encode_frame(DEVICE_ID, seq, jpeg,
+                               distance=latest_distance,
+                               current_speed=0,
+                               move_state=False,
+                               capture_ts=captured_at)
+        seq += 1
+        trace.mark("publish")
+        client.publish(MQTT_TOPIC_FRAME, payload, properties=trace_properties(trace))
         time.sleep(0.01)  # 약 100 FPS
 
 # 거리 센서 스레드
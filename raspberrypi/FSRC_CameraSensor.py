@@ -10,11 +10,15 @@ import tty
 import busio
 import digitalio
 import board
-import paho.mqtt.client as mqtt
-import json
-import base64
+import os
 from picamera2 import Picamera2
 
+# 서버와 같은 프레임 포맷 모듈 사용 (ai_module/frame_codec.py, 파이에는 이 스크립트 옆에 복사해도 됨)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ai_module"))
+from frame_codec import encode_frame
+from latency_trace import Trace, ack_command, install_echo, trace_properties
+from settings import make_mqtt_client, mqtt_broker, mqtt_port
+
 ExTime = 3000
 AnGain = 7
 
@@ -25,20 +29,22 @@ cs = digitalio.DigitalInOut(board.D5)
 def on_message(client, userdata, msg):
     global cmd
     if msg.topic.endswith(DEVICE_ID):
+        ack_command(client, DEVICE_ID, msg)   # 명령 수신 시각을 서버로 (지연 추적)
         cmd = msg.payload.decode()
 
 #MQTT 설정
 DEVICE_ID = "raspi-01"
-MQTT_BROKER = "172.30.1.21"  # 서버의 IP 주소로 변경하세요
-MQTT_PORT = 1883
+MQTT_BROKER = mqtt_broker("172.30.1.21")  # 서버의 IP 주소로 변경하세요
+MQTT_PORT = mqtt_port()
 MQTT_TOPIC = f"camera/frame/{DEVICE_ID}"
 MQTT_TOPIC_SUBSCRIBE = f"image/command/{DEVICE_ID}"
 
 # MQTT 연결
-client = mqtt.Client(protocol=mqtt.MQTTv5)
+client = make_mqtt_client(MQTT_BROKER)
 client.on_message = on_message
 client.connect(MQTT_BROKER, MQTT_PORT, 60)
 client.subscribe(MQTT_TOPIC_SUBSCRIBE)
+install_echo(client, DEVICE_ID)   # 서버의 시계 차이 추정용 ping에 응답
 client.loop_start()
 
 # 카메라 초기화
@@ -53,25 +59,28 @@ print("📡 실시간 영상 전송 시작...")
 
 #실시간 영상 전송 스레드
 def camera_realtime():
+        seq = 0
         try:
             while True:
                 # 프레임 캡처
                 frame = picam2.capture_array()
+                trace = Trace.start(DEVICE_ID, seq)   # 캡처 → 서버 명령까지 지연 추적 (MQTT v5 user property)
+                captured_at = trace.marks["capture"][1]
                 ret, jpeg = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), 90])
                 if not ret:
                         continue
+                trace.mark("encode")
+
+                # binary 헤더(디바이스/seq/캡처시각/센서값) + JPEG 원본 (base64/JSON 없음)
+                payload = encode_frame(DEVICE_ID, seq, jpeg,
+                                       distance=latest_distance,
+                                       current_speed=current_speed,
+                                       move_state=move_state,
+                                       capture_ts=captured_at)
+                seq += 1
 
-                # JPEG 바이트 -> Base64 인코딩
-                b64_jpeg = base64.b64encode(jpeg.tobytes()).decode('utf-8')
-                # JSON 메세지 구성
-                payload = {
-                        "distance": latest_distance,
-                        "current_speed":current_speed,
-                        "move_state":move_state,
-                        "frame" : b64_jpeg
-                }
-
-                client.publish(MQTT_TOPIC, json.dumps(payload))
+                trace.mark("publish")
+                client.publish(MQTT_TOPIC, payload, properties=trace_properties(trace))
                 time.sleep(0.01)  # 약 20 FPS
 
         except KeyboardInterrupt:
@@ -2,6 +2,7 @@ import cv2
 import time
 import os
 from ai_module.detection_inference import detect_objects_opencv
+from ai_module.tracker import MultiObjectTracker
 
 def run_realtime_detection():
     cap = cv2.VideoCapture(0)  # 웹캠 (index=0)
@@ -10,6 +11,8 @@ def run_realtime_detection():
         return
 
     os.makedirs("result_detections", exist_ok=True)
+    # 같은 물체는 track id로 묶어서 중앙선 통과 시 한 번만 캡처
+    tracker = MultiObjectTracker(iou_threshold=0.3, max_age=10, match_category=False)
 
     while True:
         ret, frame = cap.read()
@@ -21,27 +24,26 @@ def run_realtime_detection():
 
         # 2) draw bounding boxes
         h, w, _ = frame.shape
-        center_screen_x = w / 2
 
-        for det in detections:
+        for det, track in tracker.update(detections):
             (x1, y1, x2, y2) = det["box"]
             label = det["label"]
             score = det["score"]
 
             # draw rectangle
             cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0,255,0), 2)
-            text = f"{label} {score:.2f}"
+            text = f"#{track.track_id} {label} {score:.2f}"
             cv2.putText(frame, text, (int(x1), int(y1)-5),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0,255,0), 2)
 
             # 3) check if bounding box is horizontally at center
-            #    e.g. bounding box center within +/- 20px of screen center
-            box_center_x = (x1 + x2) / 2
-            if abs(box_center_x - center_screen_x) < 20:
-                # => we consider that "centered"
+            #    e.g. bounding box center within +/- 20px of screen center (or crossed it this frame)
+            #    → capture once per track
+            if not track.captured and track.crossed_center(w, tol=20):
+                track.captured = True
                 # 4) capture & save with detection result
                 timestamp = time.strftime("%Y%m%d_%H%M%S")
-                filename = f"{timestamp}_{label}_conf{score:.2f}.jpg"
+                filename = f"{timestamp}_{label}_conf{score:.2f}_id{track.track_id}.jpg"
                 save_path = os.path.join("result_detections", filename)
                 cv2.imwrite(save_path, frame)
                 print(f"[CAPTURE] saved {save_path}")
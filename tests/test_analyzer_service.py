@@ -0,0 +1,218 @@
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ai_module"))
+
+from analyzer import AnalyzerService, from_preset
+from analyzer.actuate import Actuator
+from analyzer.decide import Decider
+from analyzer.detect import Detector
+from analyzer.persist import Persister
+from detections import Detections
+from frame_codec import encode_frame
+from image_writer import ImageWriter
+from local_broker import LocalBroker, LocalClient
+
+
+def _jpeg(value=120):
+    return cv2.imencode(".jpg", np.full((48, 64, 3), value, np.uint8))[1].tobytes()
+
+
+def _wait(pred, timeout=3.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if pred():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _fixed(labels):
+    return Detections([[1, 2, 30, 40]] * len(labels), [s for _, s in labels], None, [l for l, _ in labels])
+
+
+def _start(config, labels, broker, detect=None):
+    detect = detect or (lambda frames: [_fixed(labels) for _ in frames])
+    writer = ImageWriter(workers=1)
+    service = AnalyzerService(config, detector=Detector(config, detect=detect), persister=Persister(config, writer))
+    server = LocalClient(broker=broker)
+    server.connect()
+    service.start(server)
+
+    pi = LocalClient(broker=broker)
+    got = []
+    pi.on_message = lambda c, u, msg: got.append((msg.topic, msg.payload.decode()))
+    pi.connect()
+    pi.subscribe("image/#")
+    pi.loop_start()
+    return service, writer, pi, got
+
+
+def test_conveyor_detect_and_proximity_modes(tmp_path):
+    broker = LocalBroker()
+    config = from_preset("fsrc_server", save_root=str(tmp_path), motion_gate=False, latency_trace=False, headless=True)
+    service, writer, pi, got = _start(config, [("청바지", 0.5), ("cell phone", 0.9375)], broker)
+    try:
+        jpeg = _jpeg()
+        pi.publish("camera/frame/raspi-cam-01", encode_frame("raspi-cam-01", 1, jpeg, distance=12, move_state=False))
+        assert _wait(lambda: ("image/command/raspi-01", "on") in got)
+        # 같은 명령은 다시 보내지 않고, 물체가 멀어지면 분석 생략 (명령 없음), 움직이면 off
+        pi.publish("camera/frame/raspi-cam-01", encode_frame("raspi-cam-01", 2, jpeg, distance=10, move_state=False))
+        pi.publish("camera/frame/raspi-cam-01", encode_frame("raspi-cam-01", 3, jpeg, distance=80, move_state=False))
+        time.sleep(0.1)
+        pi.publish("camera/frame/raspi-cam-01", encode_frame("raspi-cam-01", 4, jpeg, distance=80, move_state=True))
+        assert _wait(lambda: ("image/command/raspi-01", "off") in got)
+        assert [c for t, c in got if t == "image/command/raspi-01"] == ["on", "off"]
+
+        # raspi-02는 proximity 모드: 검출 없이 거리만으로 판단, 저장은 proximity 폴더
+        pi.publish("camera/frame/raspi-cam-02", encode_frame("raspi-cam-02", 1, jpeg, distance=5))
+        assert _wait(lambda: ("image/command/raspi-02", "on") in got)
+        writer.flush(timeout=2)
+        assert len(list((tmp_path / "cell phone").glob("raspi-cam-01_*_93.jpg"))) == 1
+        assert len(list((tmp_path / "proximity").glob("raspi-cam-02_*.jpg"))) == 1
+        assert service.stats()["gate"]["skipped"] >= 2
+        assert service.snapshot()["raspi-cam-01"]["distance"] == 80
+    finally:
+        pi.loop_stop()
+        service.stop()
+        writer.close()
+
+
+def test_conveyor_moving_clears_cached_detections(tmp_path):
+    # 컨베이어가 움직인 뒤 멈춘 다른 옷이 비슷해 보여도 직전 옷의 검출 결과를 물려받으면 안 됨
+    broker = LocalBroker()
+    config = from_preset("fsrc_server", save_root=str(tmp_path), gate_warmup=1, latency_trace=False, headless=True)
+    garments = {"A": _fixed([("cell phone", 0.9375)]), "B": Detections()}
+    on_belt = ["A"]
+    calls = []
+    detect = lambda frames: [calls.append(on_belt[0]) or garments[on_belt[0]] for _ in frames]
+    service, writer, pi, got = _start(config, [], broker, detect=detect)
+    state = lambda: service.snapshot().get("raspi-cam-01", {})
+    try:
+        for seq in (1, 2, 3):
+            pi.publish("camera/frame/raspi-cam-01", encode_frame("raspi-cam-01", seq, _jpeg(), distance=12))
+            assert _wait(lambda: state().get("seq") == seq)
+        assert len(calls) < 3   # 정지 화면은 motion gate가 직전 결과 재사용
+        pi.publish("camera/frame/raspi-cam-01", encode_frame("raspi-cam-01", 4, _jpeg(), distance=12,
+                                                             move_state=True))
+        assert _wait(lambda: state().get("seq") == 4)
+
+        on_belt[0] = "B"
+        pi.publish("camera/frame/raspi-cam-01", encode_frame("raspi-cam-01", 5, _jpeg(125), distance=12))
+        assert _wait(lambda: state().get("seq") == 5)
+        assert calls[-1] == "B"
+        assert len(state()["detections"]) == 0
+        time.sleep(0.05)
+        assert [c for t, c in got if t == "image/command/raspi-01"] == ["on", "off"]
+    finally:
+        pi.loop_stop()
+        service.stop()
+        writer.close()
+
+
+def test_request_mode_publishes_best_result_and_action(tmp_path):
+    broker = LocalBroker()
+    config = from_preset("analyzer_server", save_root=str(tmp_path), latency_trace=False)
+    service, writer, pi, got = _start(config, [("하의", 0.625), ("상의", 0.9375)], broker)
+    try:
+        pi.publish("image/request/dev-1", _jpeg())
+        time.sleep(0.05)
+        assert not any(t.startswith("image/result") for t, _ in got)   # 요청 전에는 분석 안 함
+        pi.publish("image/command/dev-1", "capture")
+        assert _wait(lambda: ("image/action/dev-1", "start") in got)
+        result = json.loads(next(p for t, p in got if t == "image/result/dev-1"))
+        assert result == {"category": "상의", "score": 0.9375, "box": [1, 2, 30, 40]}
+        writer.flush(timeout=2)
+        assert len(list((tmp_path / "상의").glob("상의_93_*.jpg"))) == 1
+        assert len(list((tmp_path / "미분류").glob("하의_62_*.jpg"))) == 1
+    finally:
+        pi.loop_stop()
+        service.stop()
+        writer.close()
+
+
+def test_every_request_runs_the_detector(tmp_path):
+    # 비슷해 보이는 다른 옷이 연달아 요청돼도 motion gate 때문에 직전 결과를 다시 보내면 안 됨
+    broker = LocalBroker()
+    config = from_preset("analyzer_server", save_root=str(tmp_path), latency_trace=False, motion_gate=True,
+                         gate_warmup=1)
+    queued = [_fixed([("상의", 0.9375)]), _fixed([("상의", 0.9375)]), _fixed([("하의", 0.9375)])]
+    detect = lambda frames: [queued.pop(0) for _ in frames]
+    service, writer, pi, got = _start(config, [], broker, detect=detect)
+    try:
+        for n, jpeg in enumerate([_jpeg(), _jpeg(), _jpeg(125)], 1):
+            pi.publish("image/request/dev-1", jpeg)
+            pi.publish("image/command/dev-1", "capture")
+            assert _wait(lambda: sum(t == "image/result/dev-1" for t, _ in got) == n)
+        results = [json.loads(p)["category"] for t, p in got if t == "image/result/dev-1"]
+        assert results == ["상의", "상의", "하의"]
+        writer.flush(timeout=2)
+        assert len(list((tmp_path / "하의").glob("하의_93_*.jpg"))) == 1
+    finally:
+        pi.loop_stop()
+        service.stop()
+        writer.close()
+
+
+def test_saves_in_the_same_second_get_distinct_names(tmp_path):
+    config = from_preset("analyzer_server", save_root=str(tmp_path))
+    writer = ImageWriter(workers=1)
+    persister = Persister(config, writer)
+    when = datetime(2026, 10, 18, 9, 30, 0, 250000)
+    saves = [("상의", "상의", 0.9375), ("미분류", "하의", 0.625)]
+    first, second = persister.paths("dev-1", saves, when), persister.paths("dev-1", saves, when)
+    assert first[0].name.startswith("상의_93_20261018_093000_250_")
+    assert not set(first) & set(second)
+
+    writer.submit(first[0], data=b"frame-1", links=first[1:])
+    writer.submit(second[0], data=b"frame-2", links=second[1:])
+    writer.close()
+    assert [p.read_bytes() for p in first + second] == [b"frame-1"] * 2 + [b"frame-2"] * 2
+
+
+def test_pusher_preset_skips_analysis_after_a_hit():
+    config = from_preset("pusher", latency_trace=False)
+    service = AnalyzerService(config, detector=Detector(config, detect=lambda frames: [Detections() for _ in frames]))
+    data = {"distance": 10, "move_state": False}
+    assert service.mode_of("raspi-cam-01") == "detect" and config.is_cam("raspi-01")
+    assert service.gate.admit("raspi-01", data, "detect", now=100.0)
+    service.gate.hit("raspi-01", 100.0)
+    assert not service.gate.admit("raspi-01", data, "detect", now=102.0)
+    assert service.gate.admit("raspi-01", data, "detect", now=103.5)
+    service.stop()
+
+
+class _Published(list):
+    def publish(self, topic, payload, properties=None):
+        self.append((topic, payload))
+
+
+def test_receiver_0529_matches_the_old_script():
+    # FSRC_receiver_0529: cooldown은 detect 명령에만, 거리값 없는 프레임은 건너뜀
+    config = from_preset("receiver_0529", latency_trace=False)
+    actuator, sent = Actuator(config), _Published()
+    actuator.bind(sent)
+    assert actuator.command("raspi-cam-01", "on", mode="detect")
+    assert not actuator.command("raspi-cam-01", "off", mode="detect")   # 0.5초 안
+    assert actuator.command("raspi-cam-02", "on", mode="proximity")
+    assert actuator.command("raspi-cam-02", "off", mode="proximity")
+    assert sent == [("image/command/raspi-01", "on"), ("image/command/raspi-02", "on"),
+                    ("image/command/raspi-02", "off")]
+
+    decider = Decider(config)
+    assert decider.conveyor("raspi-cam-02", "proximity", {"distance": None}, None).command is None
+    assert decider.conveyor("raspi-cam-02", "proximity", {"distance": 80}, None).command == "off"
+
+
+def test_result_box_follows_the_preset():
+    detections = _fixed([("상의", 0.9375)])
+    with_box = Decider(from_preset("analyzer_server")).request(detections).result
+    without_box = Decider(from_preset("analyzer_server_v2")).request(detections).result
+    assert with_box == {"category": "상의", "score": 0.9375, "box": [1, 2, 30, 40]}
+    assert without_box == {"category": "상의", "score": 0.9375}
@@ -0,0 +1,87 @@
+import os
+import sys
+import threading
+import time
+
+# batch_scheduler는 ai_module 스크립트들과 같은 flat import를 사용
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ai_module"))
+
+from batch_scheduler import DeviceBatchScheduler
+
+
+def test_one_batched_call_across_devices_and_newest_frame_wins():
+    calls = []
+    release = threading.Event()
+
+    def predict(frames):
+        release.wait(timeout=2)
+        calls.append(list(frames))
+        return [f"det:{f}" for f in frames]
+
+    sched = DeviceBatchScheduler(predict, max_batch_size=8, max_wait_ms=50)
+    busy = sched.submit("cam-0", "warmup")      # 워커가 이 배치를 처리하는 동안 나머지가 쌓임
+    time.sleep(0.05)
+    old = sched.submit("cam-1", "a0")
+    new = sched.submit("cam-1", "a1")            # 같은 디바이스 → 이전 프레임 대체
+    others = [sched.submit("cam-2", "b0"), sched.submit("cam-3", "c0")]
+    release.set()
+
+    assert busy.result(timeout=2) == "det:warmup"
+    assert old.result(timeout=2) is None
+    assert [f.result(timeout=2) for f in [new] + others] == ["det:a1", "det:b0", "det:c0"]
+    assert calls == [["warmup"], ["a1", "b0", "c0"]]
+    assert sched.stats()["superseded"] == 1
+    assert sched.stats()["served"] == {"cam-0": 1, "cam-1": 1, "cam-2": 1, "cam-3": 1}
+    sched.close()
+
+
+def test_round_robin_does_not_starve_devices():
+    calls = []
+
+    def predict(frames):
+        calls.append(list(frames))
+        time.sleep(0.01)
+        return frames
+
+    sched = DeviceBatchScheduler(predict, max_batch_size=2, max_wait_ms=5)
+    stop = threading.Event()
+
+    def device(name):
+        i = 0
+        while not stop.is_set():
+            sched.predict(name, f"{name}:{i}", timeout=2)
+            i += 1
+
+    threads = [threading.Thread(target=device, args=(d,)) for d in ("cam-1", "cam-2", "cam-3")]
+    for t in threads:
+        t.start()
+    time.sleep(0.5)
+    stop.set()
+    for t in threads:
+        t.join()
+    sched.close()
+
+    served = sched.stats()["served"]
+    assert min(served.values()) >= 0.5 * max(served.values())
+    assert all(len(batch) <= 2 for batch in calls)
+    # 한 배치에 같은 디바이스 프레임이 두 장 들어가지 않음
+    assert all(len({f.split(":")[0] for f in batch}) == len(batch) for batch in calls)
+
+
+def test_frames_past_deadline_are_dropped():
+    gate = threading.Event()
+
+    def predict(frames):
+        gate.wait(timeout=2)
+        return frames
+
+    sched = DeviceBatchScheduler(predict, max_batch_size=1, max_wait_ms=0, deadline_ms=50)
+    first = sched.submit("cam-1", "x")
+    time.sleep(0.02)                       # cam-1 처리 중 (predict가 막혀 있음)
+    late = sched.submit("cam-2", "y")
+    time.sleep(0.1)
+    gate.set()
+    assert first.result(timeout=2) == "x"
+    assert late.result(timeout=2) is None
+    assert sched.stats()["expired"] == 1
+    sched.close()
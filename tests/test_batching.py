@@ -0,0 +1,58 @@
+import threading
+import time
+
+from ai_module.batching import MicroBatcher
+
+
+def test_concurrent_requests_share_one_batch():
+    calls = []
+
+    def batch_fn(items):
+        calls.append(list(items))
+        return [x * 2 for x in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=200)
+    futures = [batcher.submit(i) for i in range(4)]
+    assert [f.result(timeout=2) for f in futures] == [0, 2, 4, 6]
+    assert calls == [[0, 1, 2, 3]]
+
+    snap = batcher.metrics.snapshot()
+    assert snap["batches"] == 1
+    assert snap["batch_size_hist"] == {4: 1}
+    batcher.close()
+
+
+def test_single_request_flushes_after_max_wait():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=8, max_wait_ms=5)
+    start = time.perf_counter()
+    assert batcher.submit("a").result(timeout=2) == "a"
+    assert time.perf_counter() - start < 1.0
+    batcher.close()
+
+
+def test_batch_error_propagates_to_every_caller():
+    def batch_fn(items):
+        raise ValueError("boom")
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=2, max_wait_ms=50)
+    futures = [batcher.submit(i) for i in range(2)]
+    for f in futures:
+        assert isinstance(f.exception(timeout=2), ValueError)
+    batcher.close()
+
+
+def test_results_follow_submission_order_across_threads():
+    batcher = MicroBatcher(lambda items: [x + 100 for x in items], max_batch_size=3, max_wait_ms=2)
+    results = {}
+
+    def worker(i):
+        results[i] = batcher.submit(i).result(timeout=2)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {i: i + 100 for i in range(10)}
+    assert max(batcher.metrics.snapshot()["batch_size_hist"]) <= 3
+    batcher.close()
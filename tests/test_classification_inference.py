@@ -0,0 +1,62 @@
+# classify_fine_bgr_batch: 대분류가 섞인 crop을 모델별로 묶어 forward 한 번씩, 결과는 입력 순서
+import os
+import sys
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+pytest.importorskip("cv2")
+
+# classification_inference는 ai_module 스크립트들과 같은 flat import를 사용
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ai_module"))
+
+import classification_inference as ci
+
+LEVELS = [0, 60, 120, 180, 240]
+
+
+def _crop(level, h=90, w=70):
+    return np.full((h, w, 3), level, dtype=np.uint8)
+
+
+class StubModel:
+    """crop 밝기(전처리 후 평균)가 가장 가까운 레벨을 그 레벨의 클래스로 분류, 호출마다 batch 크기 기록"""
+
+    def __init__(self, prefix):
+        self.classes = [f"{prefix}{level}" for level in LEVELS]
+        self.centers = ci.CropPreprocessor(size=300)([_crop(v) for v in LEVELS]).mean(dim=(1, 2, 3)).clone()
+        self.batches = []
+
+    def __call__(self, x):
+        self.batches.append(len(x))
+        return -(x.mean(dim=(1, 2, 3))[:, None] - self.centers[None, :]).abs()
+
+
+def test_groups_crops_by_model_and_keeps_input_order(monkeypatch):
+    shared, bottoms = StubModel("top"), StubModel("bottom")
+    # 상의/아우터는 같은 체크포인트 → registry가 같은 모델 객체를 돌려줌, 치마는 모델 없음
+    models = {"상의": shared, "아우터": shared, "하의": bottoms}
+    monkeypatch.setattr(ci, "get_multihead_model", lambda: None)
+    monkeypatch.setattr(ci, "get_clf_model",
+                        lambda cat: (models[cat], models[cat].classes) if cat in models else (None, None))
+
+    cats = ["하의", "상의", "치마", "아우터", "하의", "상의"]
+    levels = [240, 0, 60, 180, 60, 120]
+    crops = [_crop(v, h=80 + 15 * i) for i, v in enumerate(levels)]
+    results = ci.classify_fine_bgr_batch(crops, cats)
+
+    assert [label for label, _ in results] == ["bottom240", "top0", "치마", "top180", "bottom60", "top120"]
+    assert results[2] == ("치마", 1.0)
+    assert all(0.0 < conf <= 1.0 for _, conf in results)
+    # 모델마다 forward 한 번 (상의+아우터 3개, 하의 2개)
+    assert shared.batches == [3]
+    assert bottoms.batches == [2]
+
+
+def test_empty_and_unknown_categories(monkeypatch):
+    monkeypatch.setattr(ci, "get_multihead_model", lambda: None)
+    monkeypatch.setattr(ci, "get_clf_model", lambda cat: (None, None))
+    assert ci.classify_fine_bgr_batch([], []) == []
+    assert ci.classify_fine_bgr_batch([_crop(0), _crop(60)], ["모자", "치마"]) == [("모자", 1.0), ("치마", 1.0)]
@@ -0,0 +1,59 @@
+import os
+import pickle
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ai_module"))
+
+from detections import Detections
+
+
+class _Boxes:
+    def __init__(self, data):
+        self.data = np.asarray(data, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.data)
+
+
+class _Result:
+    """ultralytics Results 흉내: boxes.data (N x 6) + names"""
+
+    def __init__(self, data, names):
+        self.boxes = _Boxes(np.reshape(data, (-1, 6)))
+        self.names = names
+
+
+NAMES = {0: "상의", 1: "하의", 2: "아우터"}
+
+
+def test_from_ultralytics_reads_all_boxes_at_once():
+    dets = Detections.from_ultralytics(_Result([[0, 0, 10, 20, 0.5, 1], [5, 5, 15, 10, 0.75, 0]], NAMES))
+    assert len(dets) == 2
+    assert dets.labels.tolist() == ["하의", "상의"]
+    assert dets.class_ids.tolist() == [1, 0]
+    assert dets.areas().tolist() == [200.0, 50.0]
+    assert dets.best() == 1
+    assert dets.to_dicts("category") == [
+        {"category": "하의", "score": 0.5, "box": [0, 0, 10, 20]},
+        {"category": "상의", "score": 0.75, "box": [5, 5, 15, 10]},
+    ]
+
+    empty = Detections.from_ultralytics(_Result([], NAMES))
+    assert not empty and empty.best() is None and empty.to_dicts() == []
+
+
+def test_filter_and_pickle_round_trip():
+    dets = Detections.from_dicts([
+        {"label": "상의", "score": 0.25, "box": [0, 0, 1, 1]},
+        {"label": "상의", "score": 0.875, "box": [0, 0, 2, 2]},
+        {"label": "치마", "score": 0.9375, "box": [0, 0, 3, 3]},
+    ])
+    hits = dets.filter(min_score=0.5, labels=("상의",))
+    assert len(hits) == 1 and hits.to_dict(0) == {"label": "상의", "score": 0.875, "box": [0, 0, 2, 2]}
+    assert len(dets[dets.areas() > 1]) == 2
+
+    copy = pickle.loads(pickle.dumps(dets))
+    assert copy.labels.tolist() == dets.labels.tolist()
+    assert np.array_equal(copy.xyxy, dets.xyxy) and np.array_equal(copy.scores, dets.scores)
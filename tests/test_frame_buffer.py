@@ -0,0 +1,25 @@
+import threading
+
+from ai_module.frame_buffer import LatestFrameBuffer
+
+
+def test_consumer_only_sees_newest_item():
+    buf = LatestFrameBuffer()
+    for i in range(5):
+        buf.put(i)
+    seq, item = buf.get(0, timeout=1)
+    assert (seq, item) == (5, 4)
+    assert buf.dropped == 4
+    # 새 항목이 없으면 timeout 후 None
+    assert buf.get(seq, timeout=0.05) == (seq, None)
+
+
+def test_close_wakes_waiting_consumer():
+    buf = LatestFrameBuffer()
+    out = []
+    t = threading.Thread(target=lambda: out.append(buf.get(0, timeout=5)))
+    t.start()
+    buf.close()
+    t.join(timeout=2)
+    assert out == [(0, None)]
+    assert buf.closed
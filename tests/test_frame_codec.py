@@ -0,0 +1,54 @@
+import base64
+import json
+
+import numpy as np
+import pytest
+
+from ai_module.frame_codec import (HEADER_SIZE, FrameDecodeError, decode_frame, encode_frame,
+                                   jpeg_array)
+
+JPEG = bytes(range(256)) * 40
+
+
+def test_roundtrip_and_zero_copy():
+    payload = encode_frame("raspi-cam-01", 42, JPEG, distance=27, current_speed="3.5",
+                           move_state=False, capture_ts=1700000000.25)
+    assert len(payload) == HEADER_SIZE + len(JPEG)
+
+    packet = decode_frame(payload, "ignored")
+    assert (packet.device_id, packet.seq, packet.capture_ts) == ("raspi-cam-01", 42, 1700000000.25)
+    assert packet.sensors() == {"distance": 27.0, "current_speed": 3.5, "move_state": False}
+    assert bytes(packet.jpeg) == JPEG
+
+    arr = jpeg_array(packet)
+    assert arr.dtype == np.uint8 and arr.size == len(JPEG)
+    assert np.shares_memory(arr, np.frombuffer(payload, dtype=np.uint8))
+
+
+def test_missing_sensor_fields_and_numpy_jpeg():
+    jpeg = np.frombuffer(JPEG, dtype=np.uint8)
+    packet = decode_frame(encode_frame("raspi-01", 2**32 + 1, jpeg))
+    assert packet.seq == 1
+    assert packet.sensors() == {"distance": None, "current_speed": None, "move_state": None}
+    assert bytes(packet.jpeg) == JPEG
+
+
+def test_legacy_json_is_still_accepted():
+    legacy = json.dumps({"distance": 12, "current_speed": "0", "move_state": True,
+                         "frame": base64.b64encode(JPEG).decode()}).encode()
+    packet = decode_frame(legacy, "raspi-01")
+    assert packet.version == 0 and packet.device_id == "raspi-01" and packet.seq is None
+    assert packet.sensors() == {"distance": 12, "current_speed": "0", "move_state": True}
+    assert bytes(packet.jpeg) == JPEG
+
+    # 모터/센서 전용 JSON (frame 없음)
+    sensor_only = decode_frame(json.dumps({"current_speed": 5, "move_state": False}).encode(), "raspi-02")
+    assert not sensor_only.has_frame and sensor_only.current_speed == 5
+
+
+def test_corrupt_payloads_raise():
+    payload = encode_frame("raspi-01", 1, JPEG)
+    with pytest.raises(FrameDecodeError):
+        decode_frame(payload[:-10])
+    with pytest.raises(FrameDecodeError):
+        decode_frame(b"\x00garbage")
@@ -0,0 +1,90 @@
+import threading
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from ai_module.image_writer import ImageWriter
+
+
+def _img():
+    return np.full((32, 32, 3), 128, dtype=np.uint8)
+
+
+def test_writes_into_new_dirs_and_flushes_on_close(tmp_path):
+    writer = ImageWriter(workers=2, max_queue=16)
+    paths = [tmp_path / f"label{i % 3}" / f"{i}.jpg" for i in range(10)]
+    for p in paths:
+        assert writer.submit(p, _img())
+    writer.submit(tmp_path / "raw" / "x.jpg", data=b"jpegbytes")
+    writer.close()
+    assert all(p.exists() for p in paths)
+    assert (tmp_path / "raw" / "x.jpg").read_bytes() == b"jpegbytes"
+    assert writer.stats()["written"] == 11
+
+
+class _SlowWriter(ImageWriter):
+    def __init__(self, gate, **kwargs):
+        self.gate = gate
+        super().__init__(workers=1, **kwargs)
+
+    def _write(self, *args):
+        self.gate.wait(timeout=5)
+        super()._write(*args)
+
+
+@pytest.mark.parametrize("policy", ["drop", "drop_oldest", "spill"])
+def test_full_queue_follows_policy(tmp_path, policy):
+    gate = threading.Event()
+    writer = _SlowWriter(gate, max_queue=2, policy=policy)
+    results = [writer.submit(tmp_path / f"{i}.jpg", _img()) for i in range(6)]
+    gate.set()
+    writer.close()
+    stats = writer.stats()
+    written = sorted(int(p.stem) for p in tmp_path.glob("*.jpg"))
+
+    if policy == "spill":
+        assert all(results) and stats["spilled"] >= 1 and stats["dropped"] == 0
+        assert written == list(range(6))
+    else:
+        assert stats["dropped"] >= 1
+        assert stats["written"] + stats["dropped"] == 6
+        if policy == "drop_oldest":
+            assert written[-1] == 5
+        else:
+            assert results[-1] is False
+
+
+def test_encoded_frame_saves_original_bytes_once_and_links(tmp_path):
+    import cv2
+    from ai_module.encoded_frame import EncodedFrame
+
+    ok, buf = cv2.imencode(".jpg", _img())
+    encoded = EncodedFrame(buf.tobytes())
+    assert encoded.image.shape == (32, 32, 3)
+
+    writer = ImageWriter(workers=1)
+    paths = [tmp_path / "상의" / "a.jpg", tmp_path / "미분류" / "a.jpg"]
+    assert encoded.save(writer, paths)
+    writer.close()
+
+    assert [p.read_bytes() for p in paths] == [encoded.jpeg] * 2
+    assert paths[0].stat().st_ino == paths[1].stat().st_ino
+    assert writer.stats()["written"] == 1
+
+
+def test_rewriting_a_path_leaves_earlier_links_intact(tmp_path):
+    # 같은 초에 같은 이름으로 두 번 저장돼도 먼저 저장한 파일의 link(다른 라벨 폴더 사본)는 그대로
+    writer = ImageWriter(workers=1)
+    a, b = tmp_path / "상의" / "a.jpg", tmp_path / "미분류" / "a.jpg"
+    writer.submit(a, data=b"first", links=[b])
+    writer.flush(timeout=2)
+    writer.submit(a, data=b"second")
+    writer.submit(tmp_path / "img.jpg", _img())
+    writer.close()
+
+    assert a.read_bytes() == b"second"
+    assert b.read_bytes() == b"first"
+    assert (tmp_path / "img.jpg").exists()
+    assert not list(tmp_path.rglob("*.tmp"))
@@ -0,0 +1,43 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+
+import ai_module.inference as inference
+import ai_module.quantize as quantize
+
+
+def test_concurrent_first_requests_load_the_model_once(monkeypatch):
+    loads = []
+
+    def slow_load_int8(path):
+        loads.append(path)
+        time.sleep(0.05)   # 로드 중에 다른 요청이 들어오도록
+        return object(), ["상의", "하의"]
+
+    monkeypatch.setattr(quantize, "load_int8", slow_load_int8)
+    monkeypatch.setattr(inference, "CLF_BACKEND", "int8")
+    monkeypatch.setattr(inference, "model", None)
+    monkeypatch.setattr(inference, "loaded_classes", None)
+    monkeypatch.setattr(inference, "device", inference.device)
+
+    seen = []
+    start = threading.Barrier(8)
+
+    def request():
+        start.wait()
+        inference.load_model_once()
+        seen.append((inference.model, inference.loaded_classes))
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+
+    assert len(loads) == 1
+    assert len(seen) == 8
+    assert all(m is seen[0][0] and classes == ["상의", "하의"] for m, classes in seen)
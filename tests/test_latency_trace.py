@@ -0,0 +1,80 @@
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ai_module"))
+
+from latency_trace import (ClockOffsetEstimator, LatencyRecorder, Trace, ack_command, command_properties,
+                           trace_from_message, trace_properties)
+
+
+class _FakeClient:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, topic, payload, properties=None):
+        self.published.append((topic, payload, properties))
+
+
+def test_clock_offset_uses_lowest_delay_sample():
+    est = ClockOffsetEstimator()
+    offset = 2.5   # 파이 시계가 2.5초 빠름
+    # (서버→파이 지연, 파이→서버 지연): 비대칭이 큰 샘플은 오차가 큼
+    for t1, up, down in [(100.0, 0.050, 0.002), (101.0, 0.003, 0.003), (102.0, 0.001, 0.040)]:
+        t2 = t1 + up + offset
+        t3 = t2 + 0.001
+        t4 = t3 - offset + down
+        est.add(t1, t2, t3, t4)
+    assert est.offset == pytest.approx(offset, abs=1e-9)
+    assert est.delay == pytest.approx(0.006)
+
+
+def test_trace_roundtrip_and_recorder_corrects_pi_clock():
+    pi_offset = 10.0
+    trace = Trace("raspi-cam-01:7", "raspi-cam-01", host="raspi-cam-01")
+    now = 1000.0
+    trace.marks = {"capture": ("raspi-cam-01", now + pi_offset),
+                   "encode": ("raspi-cam-01", now + pi_offset + 0.004),
+                   "publish": ("raspi-cam-01", now + pi_offset + 0.005)}
+    msg = SimpleNamespace(properties=trace_properties(trace))
+
+    received = trace_from_message(msg, "raspi-cam-01")
+    assert received.trace_id == "raspi-cam-01:7"
+    assert received.marks["encode"] == ("raspi-cam-01", pytest.approx(now + pi_offset + 0.004))
+    # 서버 쪽 단계는 서버 시계 (receive는 수신 시 자동)
+    received.marks["receive"] = ("server", now + 0.015)
+    received.marks["decode"] = ("server", now + 0.018)
+    received.marks["command"] = ("server", now + 0.040)
+
+    rec = LatencyRecorder()
+    rec.add_clock_sample("raspi-cam-01", 0.0, 0.001 + pi_offset, 0.001 + pi_offset, 0.002)
+    rec.observe(received)
+    p = rec.percentiles("raspi-cam-01")["raspi-cam-01"]
+    assert p["capture->encode"]["p50"] == pytest.approx(4.0, abs=0.01)
+    assert p["publish->receive"]["p50"] == pytest.approx(10.0, abs=0.01)
+    assert p["capture->command"]["p50"] == pytest.approx(40.0, abs=0.01)
+    assert rec.histogram("raspi-cam-01", "publish->receive") == [0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0]
+
+    # 명령 → 액추에이터 파이 ack (액추에이터 시계는 서버보다 1초 느림)
+    rec.expect_ack(received)
+    cmd_msg = SimpleNamespace(properties=command_properties(received))
+    client = _FakeClient()
+    ack_command(client, "raspi-01", cmd_msg, received=now + 0.045 - 1.0)
+    topic, payload, _ = client.published[0]
+    assert topic == "trace/ack/raspi-01"
+    ack = json.loads(payload)
+    rec.on_ack("raspi-01", ack, received=ack["t3"] + 1.0 + 0.005)
+    p = rec.percentiles("raspi-cam-01")["raspi-cam-01"]
+    assert p["command->ack"]["p50"] == pytest.approx(5.0, abs=0.5)
+    assert p["capture->ack"]["p50"] == pytest.approx(45.0, abs=0.5)
+    assert "clock raspi-01" in rec.report()
+
+
+def test_messages_without_trace_properties_are_ignored():
+    assert trace_from_message(SimpleNamespace(properties=None), "raspi-cam-01") is None
+    client = _FakeClient()
+    ack_command(client, "raspi-01", SimpleNamespace())
+    assert client.published == []
@@ -0,0 +1,26 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ai_module"))
+
+from load_generator import NEAR_CM, ConveyorScenario, load_frames
+
+
+def test_conveyor_scenario_cycles_between_moving_and_stopped_windows():
+    scenario = ConveyorScenario(random.Random(3), gap=(0.5, 0.5), approach=0.2, dwell=(0.4, 0.4))
+    samples = [scenario.at(i / 100) for i in range(0, 400)]
+    windows = [w for _, _, w in samples if w is not None]
+    assert sorted(set(windows)) == [0, 1, 2]
+    for distance, moving, window in samples:
+        if window is None:
+            assert moving
+        else:
+            assert not moving and distance < NEAR_CM   # 서버가 분석하는 구간
+    assert scenario.window_start(1) == 0.5 + 0.2 + 0.4 + 0.5 + 0.2
+
+
+def test_load_frames_falls_back_to_noise_without_images(tmp_path):
+    frames = load_frames([str(tmp_path / "missing")], size=(64, 48), quality=50)
+    assert list(frames) == ["noise"]
+    assert all(jpeg[:2] == b"\xff\xd8" for jpeg in frames["noise"])
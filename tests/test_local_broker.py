@@ -0,0 +1,100 @@
+import os
+import sys
+import threading
+import time
+
+import paho.mqtt.client as mqtt
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ai_module"))
+
+from latency_trace import Trace, trace_from_message, trace_properties
+from local_broker import BrokerServer, LocalBroker, LocalClient, topic_matches
+from settings import make_mqtt_client
+
+
+def _wait(pred, timeout=3.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end:
+        if pred():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_topic_wildcards():
+    assert topic_matches("camera/frame/#", "camera/frame/raspi-cam-01")
+    assert topic_matches("camera/frame/#", "camera/frame")
+    assert topic_matches("image/+/raspi-01", "image/command/raspi-01")
+    assert not topic_matches("image/+", "image/command/raspi-01")
+    assert not topic_matches("camera/frame/+", "camera/frame")
+    assert not topic_matches("#", "$SYS/broker/uptime")
+    assert topic_matches("$SYS/#", "$SYS/broker/uptime")
+
+
+def test_local_client_callbacks_and_retain():
+    broker = LocalBroker()
+    server, device = LocalClient(broker=broker), LocalClient(broker=broker)
+    got, commands = [], []
+    server.on_message = lambda c, u, msg: got.append((msg.topic, msg.payload))
+    device.message_callback_add("image/command/#", lambda c, u, msg: commands.append(msg.payload))
+    device.on_message = lambda c, u, msg: got.append(("unexpected", msg.topic))
+    for c in (server, device):
+        c.connect("ignored", 1883, 60)
+        c.loop_start()
+
+    device.publish("image/status/raspi-01", "ready", retain=True)
+    server.subscribe([("camera/frame/#", 0), ("image/status/+", 0)])   # retain은 구독 시 전달
+    device.subscribe("image/command/raspi-01")
+    device.publish("camera/frame/raspi-cam-01", b"\xff\xd8")
+    server.publish("image/command/raspi-01", "on")
+    assert _wait(lambda: len(got) == 2 and commands == [b"on"])
+    assert got == [("image/status/raspi-01", b"ready"), ("camera/frame/raspi-cam-01", b"\xff\xd8")]
+    assert broker.stats()["retained"] == 1
+
+    device.disconnect()
+    server.publish("image/command/raspi-01", "off")
+    time.sleep(0.05)
+    assert commands == [b"on"]
+    for c in (server, device):
+        c.loop_stop()
+
+
+def test_tcp_server_with_paho_client_keeps_user_properties():
+    broker = LocalBroker()
+    server = BrokerServer(broker, port=0)
+    local = LocalClient(broker=broker)
+    got = []
+    local.on_message = lambda c, u, msg: got.append(msg)
+    local.connect()
+    local.subscribe("camera/frame/#")
+    local.loop_start()
+
+    # 실제 paho 클라이언트 (파이 쪽) → TCP → 프로세스 안 수신부, 그리고 반대 방향
+    pi = mqtt.Client(client_id="raspi-cam-01", protocol=mqtt.MQTTv5)
+    commands = []
+    subscribed = threading.Event()
+    pi.on_message = lambda c, u, msg: commands.append(msg.payload)
+    pi.on_subscribe = lambda *a: subscribed.set()
+    pi.connect("127.0.0.1", server.port, 60)
+    pi.loop_start()
+    pi.subscribe("image/command/+")
+    assert subscribed.wait(3)
+
+    trace = Trace.start("raspi-cam-01", 7)
+    pi.publish("camera/frame/raspi-cam-01", b"jpeg", qos=1, properties=trace_properties(trace))
+    assert _wait(lambda: got)
+    assert got[0].payload == b"jpeg"
+    assert trace_from_message(got[0], "raspi-cam-01").trace_id == trace.trace_id
+
+    local.publish("image/command/raspi-01", "on")
+    assert _wait(lambda: commands == [b"on"])
+    pi.loop_stop()
+    pi.disconnect()
+    local.loop_stop()
+    server.close()
+
+
+def test_settings_selects_local_client(monkeypatch):
+    monkeypatch.delenv("MQTT_LOCAL_PORT", raising=False)
+    assert isinstance(make_mqtt_client("local"), LocalClient)
+    assert isinstance(make_mqtt_client("127.0.0.1"), mqtt.Client)
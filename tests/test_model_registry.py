@@ -0,0 +1,46 @@
+from ai_module.model_registry import ModelRegistry
+
+
+def _make_loader(calls):
+    def loader(path):
+        calls.append(path)
+        return object(), ["a", "b"]
+    return loader
+
+
+def test_identical_checkpoints_load_once(tmp_path):
+    p1 = tmp_path / "tops.pth"
+    p2 = tmp_path / "bottoms.pth"
+    p1.write_bytes(b"same-weights")
+    p2.write_bytes(b"same-weights")
+
+    calls = []
+    reg = ModelRegistry(_make_loader(calls), size_fn=lambda m: 10)
+    m1, _ = reg.get(str(p1))
+    m2, _ = reg.get(str(p2))
+    m3, _ = reg.get(str(p1))
+
+    assert m1 is m2 is m3
+    assert len(calls) == 1
+    assert reg.stats()["loaded"] == 1
+
+
+def test_lru_eviction_under_budget(tmp_path):
+    paths = []
+    for i in range(3):
+        p = tmp_path / f"m{i}.pth"
+        p.write_bytes(f"weights-{i}".encode())
+        paths.append(str(p))
+
+    calls = []
+    reg = ModelRegistry(_make_loader(calls), memory_budget_bytes=25, size_fn=lambda m: 10)
+    reg.get(paths[0])
+    reg.get(paths[1])
+    reg.get(paths[0])      # m0 최근 사용 → m1이 LRU
+    reg.get(paths[2])      # 30 bytes > 25 → m1 evict
+
+    assert reg.stats()["evictions"] == 1
+    reg.get(paths[0])
+    assert len(calls) == 3
+    reg.get(paths[1])      # 다시 로드
+    assert len(calls) == 4
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from ai_module.motion_gate import MotionGate
+
+
+def _scene(x=None):
+    frame = np.full((240, 320, 3), 90, dtype=np.uint8)
+    if x is not None:
+        frame[80:160, x:x + 60] = 230
+    return frame
+
+
+def test_static_scene_is_skipped():
+    gate = MotionGate(warmup=5, max_skip=1000)
+    results = [gate.check(_scene()) for _ in range(50)]
+    assert all(results[:5])
+    assert not any(results[10:])
+    stats = gate.stats()
+    assert stats["inferences_saved"] >= 40
+    assert stats["frames"] == 50
+
+
+def test_moving_object_passes_and_max_skip_forces_refresh():
+    gate = MotionGate(warmup=5, max_skip=10)
+    for _ in range(30):
+        gate.check(_scene())
+    assert all(gate.check(_scene(x)) for x in range(20, 200, 20))
+
+    gate = MotionGate(warmup=1, max_skip=10)
+    results = [gate.check(_scene()) for _ in range(40)]
+    # 정지 화면이라도 max_skip마다 한 번은 통과
+    assert sum(results[1:]) >= 3
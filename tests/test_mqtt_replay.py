@@ -0,0 +1,57 @@
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ai_module"))
+
+from mqtt_replay import Replayer, TrafficLog, TrafficRecorder
+
+
+def _msg(topic, payload):
+    return SimpleNamespace(topic=topic, payload=payload, properties=None)
+
+
+def _record(path, n=5, gap=0.05):
+    rec = TrafficRecorder(path, flush_every=2)
+    for i in range(n):
+        rec.record(_msg(f"camera/frame/raspi-cam-0{i % 2 + 1}", bytes([i]) * (i + 1)), ts=100.0 + i * gap)
+    rec.close()
+
+
+def test_log_roundtrip_index_and_recovery(tmp_path):
+    path = tmp_path / "traffic.log"
+    _record(path)
+    log = TrafficLog(path)
+    assert len(log) == 5
+    assert log[3].topic == "camera/frame/raspi-cam-02" and log[3].payload == b"\x03" * 4
+    assert [r.ts for r in log.between(100.05, 100.15)] == [100.05, 100.1]
+    assert log.info()["topics"] == {"camera/frame/raspi-cam-01": 3, "camera/frame/raspi-cam-02": 2}
+    log.close()
+
+    # 비정상 종료: 마지막 레코드가 잘리고 인덱스도 없음 → 다시 만들고 이어 쓰기 가능
+    os.truncate(path, os.path.getsize(path) - 2)
+    os.remove(str(path) + ".idx")
+    rec = TrafficRecorder(path)
+    rec.record(_msg("camera/frame/raspi-cam-09", b"new"), ts=200.0)
+    rec.close()
+    log = TrafficLog(path)
+    assert len(log) == 5
+    assert log[4].payload == b"new"
+    log.close()
+
+
+def test_replay_inject_keeps_order_and_timing(tmp_path):
+    path = tmp_path / "traffic.log"
+    _record(path, n=4, gap=0.05)
+    log = TrafficLog(path)
+
+    received = []
+    stats = Replayer(log, speed=0, loops=2).inject(lambda c, u, msg: received.append((msg.topic, msg.payload)))
+    assert stats["messages"] == 8
+    assert received[:4] == received[4:] == [(r.topic, r.payload) for r in log]
+
+    stats = Replayer(log, speed=1.0).inject(lambda c, u, msg: None)
+    assert stats["elapsed_s"] >= 0.15                      # 녹화된 간격(3 x 50ms) 유지
+    stats = Replayer(log, speed=5.0).inject(lambda c, u, msg: None)
+    assert stats["elapsed_s"] < 0.1
+    log.close()
@@ -0,0 +1,83 @@
+# backbone 공유 multi-head 세분류: head 라우팅, 저장/로드, classify_fine_batch 순서 확인
+import os
+import sys
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+
+import numpy as np
+from PIL import Image
+
+# classification_inference는 ai_module 스크립트들과 같은 flat import를 사용
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ai_module"))
+
+import classification_inference as ci
+from model_registry import ModelRegistry
+from multihead import MultiHeadClassifier, build_multihead_from_checkpoint, save_multihead
+
+HEAD_CLASSES = {
+    "상의": ["셔츠", "티셔츠", "니트"],
+    "하의": ["청바지", "슬랙스"],
+}
+
+
+@pytest.fixture(scope="module")
+def model():
+    torch.manual_seed(0)
+    return MultiHeadClassifier(HEAD_CLASSES).eval()
+
+
+def _images(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [Image.fromarray(rng.integers(0, 256, (60 + 20 * i, 80, 3), dtype=np.uint8)) for i in range(n)]
+
+
+def test_mixed_batch_is_routed_to_each_crops_head(model):
+    torch.manual_seed(1)
+    x = torch.randn(4, 3, 64, 64)
+    cats = ["하의", "상의", "모자", "상의"]
+    results = model.classify(x, cats)
+
+    assert len(results) == 4
+    assert results[2] == ("모자", 1.0)   # head가 없는 대분류는 그대로
+    with torch.no_grad():
+        for i in (0, 1, 3):
+            probs = torch.softmax(model(x[i:i + 1], cats[i]), dim=1)[0]
+            label, conf = results[i]
+            assert label in HEAD_CLASSES[cats[i]]
+            assert label == HEAD_CLASSES[cats[i]][int(probs.argmax())]
+            assert conf == pytest.approx(float(probs.max()), abs=1e-5)
+
+
+def test_save_load_round_trip(model, tmp_path):
+    path = tmp_path / "effb3_multihead.pth"
+    save_multihead(model, path)
+    loaded = build_multihead_from_checkpoint(torch.load(path, map_location="cpu"), "cpu")
+
+    assert loaded.head_classes == HEAD_CLASSES
+    assert loaded.state_dict().keys() == model.state_dict().keys()
+    x = torch.randn(2, 3, 64, 64)
+    with torch.no_grad():
+        assert torch.equal(loaded(x, "상의"), model(x, "상의"))
+        assert torch.equal(loaded(x, "하의"), model(x, "하의"))
+
+
+def test_classify_fine_batch_returns_one_result_per_crop_in_order(model, tmp_path, monkeypatch):
+    path = str(tmp_path / "effb3_multihead.pth")
+    save_multihead(model, path)
+    monkeypatch.setattr(ci, "CLF_MULTIHEAD_PATH", path)
+    monkeypatch.setattr(ci, "clf_registry", ModelRegistry(ci.load_model))
+
+    images = _images(4)
+    cats = ["상의", "치마", "하의", "상의"]
+    results = ci.classify_fine_batch(images, cats)
+
+    assert len(results) == len(images)
+    x = torch.stack([ci.clf_transform(img) for img in images])
+    expected = model.classify(x, cats)
+    assert [label for label, _ in results] == [label for label, _ in expected]
+    assert [conf for _, conf in results] == pytest.approx([conf for _, conf in expected], abs=1e-5)
+    assert results[1] == ("치마", 1.0)
+    assert ci.classify_fine_batch([], []) == []
@@ -0,0 +1,101 @@
+# ONNX Runtime 백엔드가 PyTorch 경로와 같은 결과를 내는지 data/val 이미지로 확인
+from pathlib import Path
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+
+import torch.nn as nn
+import torchvision
+from PIL import Image
+
+from ai_module.data_utils import val_transform
+from ai_module.export_onnx import build_effb3, export_checkpoint
+from ai_module.onnx_backend import OnnxClassifier
+
+ROOT = Path(__file__).resolve().parent.parent
+CKPT_PATH = ROOT / "model_files" / "model_effb3.pth"
+VAL_DIR = ROOT / "data" / "val"
+MAX_IMAGES = 8
+LOGITS_ATOL = 1e-3
+
+
+def _val_batch():
+    paths = sorted(p for p in VAL_DIR.rglob("*") if p.suffix.lower() in (".jpg", ".jpeg", ".png"))
+    if not paths:
+        pytest.skip("data/val has no images")
+    # 클래스 폴더마다 골고루 뽑기
+    by_class = {}
+    for p in paths:
+        by_class.setdefault(p.parent.name, []).append(p)
+    picked = []
+    while len(picked) < MAX_IMAGES and any(by_class.values()):
+        for files in by_class.values():
+            if files and len(picked) < MAX_IMAGES:
+                picked.append(files.pop(0))
+    return torch.stack([val_transform(Image.open(p).convert("RGB")) for p in picked])
+
+
+@pytest.fixture(scope="module")
+def checkpoint(tmp_path_factory):
+    if CKPT_PATH.exists():
+        return str(CKPT_PATH)
+    # 학습된 체크포인트가 없으면 임의 가중치로 export 경로만 검증
+    torch.manual_seed(0)
+    net = torchvision.models.efficientnet_b3(weights=None)
+    net.classifier[1] = nn.Linear(net.classifier[1].in_features, 6)
+    path = tmp_path_factory.mktemp("ckpt") / "model_effb3.pth"
+    torch.save({"model_state": net.state_dict(), "classes": [f"c{i}" for i in range(6)]}, path)
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def onnx_path(checkpoint, tmp_path_factory):
+    return export_checkpoint(checkpoint, str(tmp_path_factory.mktemp("onnx") / "model_effb3.onnx"))
+
+
+def test_onnx_matches_torch_on_val(checkpoint, onnx_path):
+    net, classes = build_effb3(torch.load(checkpoint, map_location="cpu"))
+    ort_model = OnnxClassifier(onnx_path)
+    assert ort_model.classes == classes
+
+    x = _val_batch()
+    with torch.no_grad():
+        ref = net(x)
+    out = ort_model(x)
+
+    assert out.shape == ref.shape
+    assert torch.allclose(out, ref, atol=LOGITS_ATOL, rtol=1e-3)
+
+    # top-1이 애매한(1/2등 차이가 오차 범위 안) 샘플은 제외하고 비교
+    top2 = ref.topk(2, dim=1).values
+    decisive = (top2[:, 0] - top2[:, 1]) > 2 * LOGITS_ATOL
+    assert torch.equal(out.argmax(dim=1)[decisive], ref.argmax(dim=1)[decisive])
+
+
+def test_onnx_dynamic_batch_axis(onnx_path):
+    ort_model = OnnxClassifier(onnx_path)
+    for n in (1, 3):
+        assert ort_model(torch.zeros(n, 3, 300, 300)).shape[0] == n
+
+
+def test_missing_classes_metadata_fails_at_load_time(onnx_path, tmp_path, monkeypatch):
+    import onnx
+
+    import ai_module.inference as inference
+
+    model = onnx.load(onnx_path)
+    del model.metadata_props[:]
+    bare = str(tmp_path / "no_classes.onnx")
+    onnx.save(model, bare)
+
+    monkeypatch.setattr(inference, "CLF_BACKEND", "onnx")
+    monkeypatch.setattr(inference, "ONNX_MODEL_PATH", bare)
+    monkeypatch.setattr(inference, "model", None)
+    monkeypatch.setattr(inference, "loaded_classes", None)
+    with pytest.raises(ValueError, match="classes"):
+        inference.load_model_once()
+    assert inference.model is None
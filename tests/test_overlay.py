@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from ai_module.overlay import OverlayRenderer
+
+# 폰트 파일이 없으면 PIL 기본 폰트로 대체되므로 영문 라벨로 확인
+FONT = "missing-font-for-test.ttf"
+
+
+def _changed(before, after):
+    return np.any(before != after, axis=2)
+
+
+def test_draw_only_touches_box_and_label_areas():
+    renderer = OverlayRenderer(FONT)
+    frame = np.full((200, 240, 3), 40, dtype=np.uint8)
+    before = frame.copy()
+    box, pos, size = (20, 30, 120, 110), (30, 140), 20
+    out = renderer.draw(frame, [{"box": box, "color": (0, 255, 0),
+                                 "texts": [("shirt 0.93", pos, (0, 0, 255), size)]}])
+    assert out is frame   # in-place
+    changed = _changed(before, frame)
+
+    x1, y1, x2, y2 = box
+    border = np.zeros_like(changed)
+    border[y1 - 1:y2 + 2, x1 - 1:x2 + 2] = True
+    border[y1 + 2:y2 - 1, x1 + 2:x2 - 1] = False           # 박스 안쪽은 그대로
+    alpha = renderer.label_alpha("shirt 0.93", size)
+    label = np.zeros_like(changed)
+    label[pos[1]:pos[1] + alpha.shape[0], pos[0]:pos[0] + alpha.shape[1]] = True
+
+    assert changed[border].any()
+    assert changed[label].any()
+    assert not changed[~(border | label)].any()
+    assert np.all(frame[y1, x1 + 10] == (0, 255, 0))
+    # 라벨 픽셀은 배경과 글자색 사이로만 섞임 (B/G는 배경보다 커지지 않음)
+    assert frame[label][:, 2].max() > 40 and frame[label][:, :2].max() <= 40
+
+
+def test_labels_partly_off_screen_are_clipped():
+    renderer = OverlayRenderer(FONT)
+    frame = np.zeros((40, 60, 3), dtype=np.uint8)
+    renderer.draw(frame, [{"box": None, "texts": [("outer", (-10, -5), (255, 255, 255), 20),
+                                                  ("far", (500, 500), (255, 255, 255), 20)]}])
+    assert frame.any()
+
+
+def test_repeated_labels_reuse_cached_bitmaps():
+    renderer = OverlayRenderer(FONT, max_labels=2)
+    first = renderer.label_alpha("top 0.90", 20)
+    assert renderer.label_alpha("top 0.90", 20) is first
+    glyphs = len(renderer._glyphs)
+
+    frame = np.zeros((60, 120, 3), dtype=np.uint8)
+    for _ in range(3):
+        renderer.draw(frame, [{"box": None, "texts": [("top 0.90", (0, 0), (0, 255, 0), 20)]}])
+    assert renderer.label_alpha("top 0.90", 20) is first
+    # 같은 글자로 된 다른 라벨은 glyph만 재사용해서 새로 조립
+    renderer.label_alpha("pot 0.09", 20)
+    assert len(renderer._glyphs) == glyphs
+
+    # max_labels를 넘으면 가장 오래 안 쓴 라벨부터 버림
+    renderer.label_alpha("new", 20)
+    assert list(renderer._labels) == [("pot 0.09", 20), ("new", 20)]
+    assert renderer.label_alpha("top 0.90", 20) is not first
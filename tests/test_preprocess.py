@@ -0,0 +1,81 @@
+# CropPreprocessor가 예전 PIL 경로 (T.Resize + ToTensor + Normalize)와 허용 오차 안에서 같은지 확인
+# 확대는 bilinear끼리라 거의 같고, 축소는 INTER_AREA(box) vs PIL antialias(triangle) 차이로 가장자리에서 벌어짐
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+cv2 = pytest.importorskip("cv2")
+
+import torchvision.transforms as T
+from PIL import Image
+
+from ai_module.preprocess import CropPreprocessor
+
+VAL_DIR = Path(__file__).resolve().parent.parent / "data" / "val"
+
+pil_transform = T.Compose([
+    T.Resize((300, 300)),
+    T.ToTensor(),
+    T.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225]),
+])
+
+
+def _reference(crop_bgr):
+    return pil_transform(Image.fromarray(cv2.cvtColor(crop_bgr, cv2.COLOR_BGR2RGB)))
+
+
+def _crop(h, w, seed=0):
+    """그라데이션 + 부드러운 무늬 (옷 crop처럼 완만한 영역 위주)"""
+    rng = np.random.default_rng(seed)
+    yy, xx = np.mgrid[0:h, 0:w]
+    base = np.stack([xx * 255 / w, yy * 255 / h, (xx + yy) * 127 / (w + h)], axis=-1)
+    blobs = rng.integers(0, 256, (max(2, h // 16), max(2, w // 16), 3), dtype=np.uint8)
+    img = 0.5 * base + 0.5 * cv2.resize(blobs, (w, h), interpolation=cv2.INTER_CUBIC)
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+@pytest.mark.parametrize("shape, mean_tol, max_tol", [
+    ((120, 90), 0.01, 0.05),     # 확대
+    ((200, 160), 0.01, 0.05),
+    ((640, 480), 0.02, 0.1),     # 축소
+    ((900, 700), 0.02, 0.1),
+    ((150, 500), 0.02, 0.1),     # 한 축만 축소
+])
+def test_matches_pil_path(shape, mean_tol, max_tol):
+    crop = _crop(*shape, seed=shape[0])
+    diff = (CropPreprocessor()([crop])[0] - _reference(crop)).abs()
+    assert diff.mean().item() < mean_tol
+    assert diff.max().item() < max_tol
+
+
+def test_matches_pil_path_on_val_images():
+    paths = sorted(p for p in VAL_DIR.rglob("*") if p.suffix.lower() in (".jpg", ".jpeg", ".png"))[:20]
+    if not paths:
+        pytest.skip("data/val has no images")
+    prep = CropPreprocessor()
+    means = []
+    for path in paths:
+        crop = cv2.imread(str(path))
+        diff = (prep([crop])[0] - _reference(crop)).abs()
+        means.append(diff.mean().item())
+        # 질감이 촘촘한 옷은 box/triangle 필터 차이가 커짐 (가장자리 픽셀은 0.9까지도 벌어짐)
+        assert means[-1] < 0.15, path
+    assert np.mean(means) < 0.03
+
+
+def test_buffer_grows_beyond_max_batch():
+    prep = CropPreprocessor(size=64, max_batch=2)
+    crops = [_crop(80 + 10 * i, 60, seed=i) for i in range(5)]
+    out = prep(crops)
+    assert out.shape == (5, 3, 64, 64)
+    expected = torch.stack([CropPreprocessor(size=64, max_batch=1)([c])[0] for c in crops])
+    assert torch.equal(out, expected)
+
+    # 커진 버퍼를 계속 재사용 (작은 batch는 같은 메모리의 view)
+    small = prep(crops[:1])
+    assert small.shape == (1, 3, 64, 64)
+    assert small.data_ptr() == out.data_ptr()
+    assert torch.equal(small[0], expected[0])
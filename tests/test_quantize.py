@@ -0,0 +1,62 @@
+# quantize.py: 작은 모델로 static INT8 변환 → save_int8/load_int8 왕복 확인
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+
+import numpy as np
+import torch.nn as nn
+from PIL import Image
+
+from ai_module.quantize import list_val_images, load_int8, quantize_static, save_int8, split_samples
+
+CLASSES = ["상의", "하의", "아우터"]
+
+
+def _tiny_net():
+    torch.manual_seed(0)
+    net = nn.Sequential(
+        nn.Conv2d(3, 8, 3, stride=4), nn.ReLU(),
+        nn.AdaptiveAvgPool2d(1), nn.Flatten(),
+        nn.Linear(8, len(CLASSES)),
+    )
+    return net.eval()
+
+
+@pytest.fixture
+def val_dir(tmp_path):
+    rng = np.random.default_rng(0)
+    for cls in CLASSES:
+        (tmp_path / cls).mkdir()
+        for i in range(3):
+            pixels = rng.integers(0, 256, (40 + 10 * i, 60, 3), dtype=np.uint8)
+            Image.fromarray(pixels).save(tmp_path / cls / f"{i}.jpg")
+    return tmp_path
+
+
+def test_calibration_and_eval_images_do_not_overlap(val_dir):
+    samples = list_val_images(str(val_dir), CLASSES)
+    assert len(samples) == 9
+    calib, held_out = split_samples(samples, 4, seed=1)
+    assert len(calib) == 4 and len(held_out) == 5
+    assert not {p for p, _ in calib} & {p for p, _ in held_out}
+    assert split_samples(samples, 4, seed=1) == (calib, held_out)
+
+
+def test_quantize_round_trip(val_dir, tmp_path):
+    net = _tiny_net()
+    calib, _ = split_samples(list_val_images(str(val_dir), CLASSES), 4)
+    qnet = quantize_static(net, [p for p, _ in calib])
+
+    out_path = str(tmp_path / "tiny_int8.pt")
+    save_int8(qnet, CLASSES, out_path)
+    loaded, classes = load_int8(out_path)
+    assert classes == CLASSES
+
+    x = torch.rand(2, 3, 300, 300)
+    with torch.no_grad():
+        out = loaded(x)
+        ref = net(x)
+    assert out.shape == (2, len(CLASSES))
+    assert out.dtype == torch.float32
+    assert torch.allclose(out, ref, atol=0.1)
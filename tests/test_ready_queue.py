@@ -0,0 +1,43 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ai_module"))
+
+from ready_queue import DeviceReadyQueue
+
+
+def test_wakes_only_when_frame_and_request_are_both_present():
+    q = DeviceReadyQueue()
+    q.put_frame("cam-1", "f0")
+    q.put_frame("cam-1", "f1")            # 요청 전 프레임은 최신 것만 유지
+    assert q.get(timeout=0.05) is None
+    assert q.dropped == 1
+
+    q.request("cam-2", "req-2")           # 프레임 없이 요청만
+    assert q.pending() == ["cam-2"]
+    q.request("cam-1", "req-1")
+    assert q.get(timeout=0.05) == ("cam-1", "f1", "req-1")
+    assert q.get(timeout=0.05) is None    # 요청 하나당 한 번
+
+    q.put_frame("cam-2", "g0")
+    assert q.get(timeout=0.05) == ("cam-2", "g0", "req-2")
+
+
+def test_blocked_consumer_is_woken_immediately():
+    q = DeviceReadyQueue()
+    got = []
+    t = threading.Thread(target=lambda: got.append((q.get(timeout=2), time.perf_counter())))
+    t.start()
+    time.sleep(0.05)
+    q.request("cam-1")
+    start = time.perf_counter()
+    q.put_frame("cam-1", "f")
+    t.join()
+    (item, woke), = got
+    assert item == ("cam-1", "f", True)
+    assert woke - start < 0.1
+
+    q.close()
+    assert q.get() is None
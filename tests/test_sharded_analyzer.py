@@ -0,0 +1,64 @@
+import os
+import sys
+
+import cv2
+import numpy as np
+
+# sharded_analyzer는 ai_module 스크립트들과 같은 flat import를 사용
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ai_module"))
+
+from sharded_analyzer import HashRing, ShardedAnalyzer
+
+
+def test_hash_ring_is_stable_and_mostly_keeps_routes_when_growing():
+    devices = [f"raspi-cam-{i:02d}" for i in range(200)]
+    ring3 = HashRing(range(3))
+    assert [ring3.node_for(d) for d in devices] == [HashRing(range(3)).node_for(d) for d in devices]
+    assert set(ring3.node_for(d) for d in devices) == {0, 1, 2}
+
+    ring4 = HashRing(range(4))
+    moved = sum(ring3.node_for(d) != ring4.node_for(d) for d in devices)
+    # worker를 하나 늘리면 대략 1/4만 옮겨감 (modulo 해시면 ~3/4)
+    assert moved < len(devices) * 0.45
+
+
+def test_worker_processes_decode_and_return_per_frame_results():
+    jpeg = cv2.imencode(".jpg", np.zeros((48, 64, 3), dtype=np.uint8))[1].tobytes()
+    analyzer = ShardedAnalyzer(2, detector="cpu:1", torch_threads=1, start_timeout=60)
+    try:
+        assert len(analyzer.predict("raspi-cam-01", jpeg, timeout=30)) == 0
+        assert len(analyzer.predict("raspi-cam-02", jpeg, timeout=30)) == 0
+        # 디코딩 실패한 프레임은 None
+        assert analyzer.predict("raspi-cam-01", b"not a jpeg", timeout=30) is None
+        stats = analyzer.stats()
+        assert stats["workers"] == 2
+        assert stats["routes"]["raspi-cam-01"] == analyzer.ring.node_for("raspi-cam-01")
+    finally:
+        analyzer.close()
+
+
+def test_shm_transport_reads_decoded_frames_from_shared_memory():
+    frame = np.zeros((48, 64, 3), dtype=np.uint8)
+    analyzer = ShardedAnalyzer(1, detector="cpu:1", torch_threads=1, start_timeout=60,
+                               transport="shm", max_devices=4, frame_shape=(48, 64, 3))
+    try:
+        assert len(analyzer.predict("raspi-cam-01", frame, timeout=30)) == 0
+        assert analyzer.stats()["frames"]["raspi-cam-01"]["written"] == 1
+    finally:
+        analyzer.close()
+
+
+def test_shm_transport_sends_oversize_frames_through_the_pipe():
+    # 슬롯보다 큰 프레임이 섞여도 batch 전체가 실패하지 않음 (그 프레임만 pipe로)
+    analyzer = ShardedAnalyzer(1, detector="cpu:1", torch_threads=1, start_timeout=60, max_wait_ms=200,
+                               transport="shm", max_devices=4, frame_shape=(48, 64, 3))
+    try:
+        small = analyzer.submit("raspi-cam-01", np.zeros((48, 64, 3), dtype=np.uint8))
+        large = analyzer.submit("raspi-cam-02", np.zeros((96, 128, 3), dtype=np.uint8))
+        assert len(small.result(30)) == 0
+        assert len(large.result(30)) == 0
+        stats = analyzer.stats()
+        assert stats["pipe_frames"] == 1
+        assert "raspi-cam-02" not in stats["frames"]
+    finally:
+        analyzer.close()
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import numpy as np
+
+# shm_ring은 ai_module 스크립트들과 같은 flat import를 사용
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ai_module"))
+
+from shm_ring import SharedFrameRing
+
+
+def _frame(value, shape=(48, 64, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_reader_in_other_mapping_sees_latest_frame_without_copy():
+    ring = SharedFrameRing(max_devices=4, frame_shape=(48, 64, 3), create=True)
+    reader = SharedFrameRing(ring.name)
+    try:
+        assert reader.read("raspi-cam-01") is None
+        ring.write("raspi-cam-01", _frame(1), capture_ts=123.0)
+        ring.write("raspi-cam-02", _frame(7, (24, 32)))
+
+        ref = reader.read("raspi-cam-01")
+        assert ref.version == 1 and ref.capture_ts == 123.0
+        assert ref.image.shape == (48, 64, 3) and (ref.image == 1).all()
+        assert not ref.image.flags.owndata   # 공유 메모리 view
+        assert reader.read("raspi-cam-01", after_version=ref.version) is None
+        assert reader.read("raspi-cam-02").image.shape == (24, 32)
+        assert reader.devices() == ["raspi-cam-01", "raspi-cam-02"]
+    finally:
+        reader.close()
+        ring.close()
+
+
+def test_overwrite_keeps_latest_and_invalidates_outstanding_view():
+    ring = SharedFrameRing(max_devices=2, frame_shape=(48, 64, 3), create=True)
+    try:
+        ring.write("cam", _frame(1))
+        ref = ring.read("cam")
+        assert ring.is_valid(ref)
+
+        ring.write("cam", _frame(2))          # 읽기 전에 덮어써짐 → overwritten
+        ring.write("cam", _frame(3))
+        assert not ring.is_valid(ref)
+
+        latest = ring.read_copy("cam", after_version=ref.version)
+        assert latest.version == 3 and (latest.image == 3).all()
+        assert latest.image.flags.owndata
+        assert ring.stats()["cam"] == {"version": 3, "written": 3, "overwritten": 1}
+    finally:
+        ring.close()
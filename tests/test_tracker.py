@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from ai_module.tracker import MultiObjectTracker, Track, iou_matrix
+
+
+def _det(x1, y1=10, w=40, h=60, category="상의", score=0.9):
+    return {"box": (x1, y1, x1 + w, y1 + h), "category": category, "score": score}
+
+
+def test_iou_matrix():
+    iou = iou_matrix([(0, 0, 10, 10), (100, 100, 110, 110)], [(0, 0, 10, 10), (5, 0, 15, 10)])
+    assert iou.shape == (2, 2)
+    assert iou[0, 0] == pytest.approx(1.0)
+    assert iou[0, 1] == pytest.approx(50 / 150)
+    assert np.all(iou[1] == 0)
+    assert iou_matrix([], [(0, 0, 1, 1)]).shape == (0, 1)
+
+
+def test_moving_objects_keep_their_ids():
+    tracker = MultiObjectTracker()
+    ids = []
+    for step in range(8):
+        # 컨베이어 위 두 벌이 같은 속도로 이동, 검출 순서는 프레임마다 바뀜
+        dets = [_det(20 + 5 * step), _det(200 + 5 * step, category="하의")]
+        if step % 2:
+            dets.reverse()
+        out = tracker.update(dets)
+        assert [d for d, _ in out] == dets   # 결과는 검출 순서대로
+        ids.append({d["category"]: t.track_id for d, t in out})
+    assert all(i == ids[0] for i in ids)
+    assert ids[0]["상의"] != ids[0]["하의"]
+    assert len(tracker.tracks) == 2
+
+
+def test_category_mismatch_starts_new_track():
+    tracker = MultiObjectTracker()
+    (_, first), = tracker.update([_det(20)])
+    (_, second), = tracker.update([_det(20, category="아우터")])
+    assert second.track_id != first.track_id
+    assert MultiObjectTracker(match_category=False).update([_det(20)])[0][1].track_id == 1
+
+
+def test_tracks_age_out_and_ids_are_not_reused():
+    tracker = MultiObjectTracker(max_age=2)
+    (_, track), = tracker.update([_det(20)])
+    for _ in range(2):
+        tracker.update([])
+    assert tracker.tracks == [track]          # max_age 프레임까지는 유지
+    (_, same), = tracker.update([_det(20)])
+    assert same is track and same.time_since_update == 0
+
+    for _ in range(3):
+        tracker.update([])
+    assert tracker.tracks == []
+    (_, new), = tracker.update([_det(20)])
+    assert new.track_id == track.track_id + 1
+
+
+def test_votes_average_only_the_winning_label():
+    track = Track(1, _det(20))
+    assert track.needs_classification(0.6)
+    for label, conf in [("셔츠", 0.9), ("티셔츠", 0.85), ("셔츠", 0.9), ("티셔츠", 0.5), ("셔츠", 0.9)]:
+        track.add_vote(label, conf)
+    assert track.fine_label == "셔츠"
+    assert track.fine_conf == pytest.approx(0.9)
+    assert track.best_conf == pytest.approx(0.9)
+    assert track.num_classified == 5
+
+
+def test_needs_classification_until_confident_or_out_of_votes():
+    track = Track(1, _det(20))
+    track.add_vote("셔츠", 0.4)
+    assert track.needs_classification(0.6)
+    track.add_vote("셔츠", 0.9)              # 평균 0.65
+    assert not track.needs_classification(0.6)
+
+    low = Track(2, _det(20))
+    for _ in range(3):
+        low.add_vote("셔츠", 0.3)
+    assert low.needs_classification(0.6, max_votes=4)
+    low.add_vote("셔츠", 0.3)
+    assert not low.needs_classification(0.6, max_votes=4)
+
+
+def test_crossed_center():
+    track = Track(1, _det(100, w=40))         # cx = 120
+    assert not track.crossed_center(400)
+    track.update(_det(170, w=40))             # cx 120 → 190: 중앙선(200)까지 10px
+    assert track.crossed_center(400, tol=20)
+    assert not track.crossed_center(400, tol=5)
+    track.update(_det(200, w=40))             # cx 190 → 220: 이번 프레임에 중앙선 통과
+    assert track.crossed_center(400, tol=5)
+    track.update(_det(240, w=40))             # 이미 지나감
+    assert not track.crossed_center(400, tol=5)